@@ -0,0 +1,143 @@
+import threading
+import time
+from collections import deque
+
+
+class _BatchJob:
+    """One request's views waiting in the scheduler queue."""
+
+    def __init__(self, images, full_views=()):
+        self.images = images
+        self.full_views = list(full_views)
+        self.result = None
+        self.error = None
+        self.enqueued_at = time.monotonic()
+        self.done = threading.Event()
+
+
+class BatchScheduler:
+    """
+    Cross-request micro-batching in front of the detector ensemble.
+    - Concurrent requests submit their views and block until their slice is ready.
+    - A single worker thread merges queued views into one batch, bounded by
+      `max_batch_size` views or `max_wait_ms` of waiting, whichever comes first.
+    - `run_batch(images, full_views)` is called once per merged batch and must return
+      one entry per image; each request gets back the entries for its own views.
+      `full_views` are the requests' own full-view indices, offset into the merged batch.
+    """
+
+    def __init__(self, run_batch, max_batch_size=64, max_wait_ms=15):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue = deque()
+        self._queued_views = 0
+        self._cond = threading.Condition()
+
+        # Metrics
+        self._stats_lock = threading.Lock()
+        self.batches_run = 0
+        self.views_run = 0
+        self.requests_run = 0
+        self.max_queue_depth = 0
+        self.last_fill_ratio = 0.0
+        self.total_wait_ms = 0.0
+
+        self._thread = threading.Thread(target=self._worker, daemon=True)
+        self._thread.start()
+
+    def submit(self, images, full_views=()):
+        """Queues `images` and blocks until the merged batch containing them has run."""
+        job = _BatchJob(list(images), full_views)
+        if not job.images:
+            return []
+
+        with self._cond:
+            self._queue.append(job)
+            self._queued_views += len(job.images)
+            self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+            self._cond.notify()
+
+        job.done.wait()
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def stats(self):
+        with self._cond:
+            queue_depth = len(self._queue)
+            queued_views = self._queued_views
+        with self._stats_lock:
+            batches = self.batches_run
+            return {
+                "queue_depth": queue_depth,
+                "queued_views": queued_views,
+                "max_queue_depth": self.max_queue_depth,
+                "batches_run": batches,
+                "requests_run": self.requests_run,
+                "views_run": self.views_run,
+                "avg_batch_size": round(self.views_run / batches, 2) if batches else 0.0,
+                "avg_fill_ratio": round(self.views_run / (batches * self.max_batch_size), 3) if batches else 0.0,
+                "last_fill_ratio": round(self.last_fill_ratio, 3),
+                "avg_queue_wait_ms": round(self.total_wait_ms / self.requests_run, 2) if self.requests_run else 0.0,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+            }
+
+    def _next_batch(self):
+        """Waits for work, then pops as many queued jobs as fit in one batch."""
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+
+            # Give concurrent requests a short window to join this batch
+            deadline = self._queue[0].enqueued_at + self.max_wait
+            while self._queued_views < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            jobs = [self._queue.popleft()]
+            size = len(jobs[0].images)
+            while self._queue and size + len(self._queue[0].images) <= self.max_batch_size:
+                job = self._queue.popleft()
+                jobs.append(job)
+                size += len(job.images)
+
+            self._queued_views -= size
+            return jobs, size
+
+    def _worker(self):
+        while True:
+            jobs, size = self._next_batch()
+            started = time.monotonic()
+            merged, full_views = [], []
+            for job in jobs:
+                full_views.extend(len(merged) + i for i in job.full_views)
+                merged.extend(job.images)
+
+            try:
+                results = self.run_batch(merged, full_views)
+                if len(results) != len(merged):
+                    raise RuntimeError(f"Batch runner returned {len(results)} results for {len(merged)} views")
+                offset = 0
+                for job in jobs:
+                    n = len(job.images)
+                    job.result = results[offset:offset + n]
+                    offset += n
+            except Exception as e:
+                print(f"BatchScheduler Error: {e}")
+                for job in jobs:
+                    job.error = e
+
+            with self._stats_lock:
+                self.batches_run += 1
+                self.views_run += size
+                self.requests_run += len(jobs)
+                self.last_fill_ratio = size / self.max_batch_size
+                self.total_wait_ms += sum((started - job.enqueued_at) * 1000.0 for job in jobs)
+
+            for job in jobs:
+                job.done.set()
@@ -0,0 +1,76 @@
+import time
+import sys
+import os
+import argparse
+from PIL import Image
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from model_manager import DETECTOR_MODEL_NAMES
+from inference_engine import DirectInferenceEngine
+
+BACKENDS = ["torch", "onnx"]
+
+
+def create_views(num_views=19):
+    base = np.random.RandomState(0).randint(0, 255, (800, 800, 3), dtype=np.uint8)
+    return [Image.fromarray(base)] * num_views
+
+
+def benchmark_model(name, backend, views, iterations, threads):
+    engine = DirectInferenceEngine(backend=backend, intra_threads=threads)
+    t0 = time.perf_counter()
+    engine.load(name)
+    load_s = time.perf_counter() - t0
+
+    pixel_values = engine.preprocess(name, views)
+    engine.predict_ai_probs(name, pixel_values=pixel_values)  # warm-up
+
+    latencies = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        engine.predict_ai_probs(name, pixel_values=pixel_values)
+        latencies.append(time.perf_counter() - t0)
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    return {
+        "load_s": load_s,
+        "p50_ms": p50 * 1000,
+        "throughput": len(views) / p50,
+        "probs": engine.predict_ai_probs(name, pixel_values=pixel_values)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-model latency/throughput: torch vs ONNX Runtime.")
+    parser.add_argument("--models", nargs="*", default=DETECTOR_MODEL_NAMES)
+    parser.add_argument("--views", type=int, default=19)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    import torch
+    torch.set_num_threads(args.threads)
+    views = create_views(args.views)
+
+    print(f"--- Backend Benchmark ({args.views} views/batch, {args.threads} threads) ---")
+    for name in args.models:
+        print(name)
+        results = {}
+        for backend in BACKENDS:
+            try:
+                results[backend] = benchmark_model(name, backend, views, args.iterations, args.threads)
+            except Exception as e:
+                print(f"  {backend:>5}: failed ({e})")
+                continue
+            r = results[backend]
+            print(f"  {backend:>5}: load={r['load_s']:6.2f}s  p50={r['p50_ms']:8.1f} ms/batch  "
+                  f"throughput={r['throughput']:7.1f} views/s")
+        if len(results) == 2:
+            diff = np.max(np.abs(results["torch"]["probs"] - results["onnx"]["probs"]))
+            print(f"  speedup={results['torch']['p50_ms'] / results['onnx']['p50_ms']:.2f}x  "
+                  f"max |d ai_prob|={diff:.2e}")
+    print("-------------------------------")
@@ -0,0 +1,77 @@
+import time
+from PIL import Image
+import numpy as np
+import sys
+import os
+import asyncio
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from model_manager import ModelManager
+from forensic_engine import ForensicEngine
+from resource_governor import CoreGovernor
+
+CONCURRENCY_LEVELS = [1, 4, 16]
+
+
+def create_dummy_image():
+    return Image.fromarray(np.random.randint(0, 255, (800, 800, 3), dtype=np.uint8))
+
+
+def wait_for_models(mm, timeout=600):
+    start = time.time()
+    while time.time() - start < timeout:
+        pending = [n for n, s in mm.loading_status.items() if s in ("Pending", "Loading")]
+        if not pending and mm.clip_status != "Pending":
+            return
+        time.sleep(1)
+    print("WARNING: models still loading, benchmark numbers will be partial.")
+
+
+def run_level(mm, fe, concurrency):
+    images = [create_dummy_image() for _ in range(concurrency)]
+    latencies = []
+
+    async def one_request(img):
+        t0 = time.perf_counter()
+        # Simulate main.py behavior
+        await asyncio.gather(
+            asyncio.to_thread(mm.predict_full_suite, img),
+            asyncio.to_thread(fe.analyze, img)
+        )
+        latencies.append(time.perf_counter() - t0)
+
+    async def run_all():
+        await asyncio.gather(*[one_request(img) for img in images])
+
+    t0 = time.perf_counter()
+    asyncio.run(run_all())
+    wall = time.perf_counter() - t0
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    print(f"  concurrency={concurrency:>2}  wall={wall:7.2f}s  p50={p50:6.2f}s  "
+          f"max={latencies[-1]:6.2f}s  throughput={concurrency / wall:5.2f} req/s")
+
+
+def benchmark(label, mm, fe):
+    print(f"--- {label} ---")
+    wait_for_models(mm)
+    for level in CONCURRENCY_LEVELS:
+        run_level(mm, fe, level)
+    print(f"  runtime stats: {mm.get_runtime_stats()}")
+    print("-------------------------------")
+
+
+if __name__ == "__main__":
+    # Baseline: models one after another, no core split
+    benchmark("Sequential models (no governor)", ModelManager(engine="direct"), ForensicEngine())
+
+    governor = CoreGovernor()
+    print(f"Governor: {governor.summary()}")
+    benchmark(
+        "Parallel models (CoreGovernor)",
+        ModelManager(engine="direct", governor=governor),
+        ForensicEngine(num_threads=governor.forensic_cores)
+    )
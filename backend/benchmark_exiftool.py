@@ -0,0 +1,66 @@
+import time
+import sys
+import os
+import io
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from metadata_engine import MetadataEngine
+
+CONCURRENCY_LEVELS = [1, 32]
+
+
+def create_dummy_jpeg():
+    img = Image.fromarray(np.random.RandomState(0).randint(0, 255, (256, 256, 3), dtype=np.uint8))
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=90)
+    return buf.getvalue()
+
+
+def percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def run_level(engine, content, concurrency, requests):
+    def one_request(_):
+        t0 = time.perf_counter()
+        result = engine.analyze(content)
+        elapsed = time.perf_counter() - t0
+        return elapsed, "error" in result
+
+    # Warm-up (starts pool workers, fills OS caches)
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        list(ex.map(one_request, range(concurrency)))
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        results = list(ex.map(one_request, range(requests)))
+    wall = time.perf_counter() - t0
+
+    latencies = sorted(r[0] for r in results)
+    errors = sum(1 for r in results if r[1])
+    print(f"  concurrency={concurrency:>2}  p50={percentile(latencies, 0.5) * 1000:7.1f} ms  "
+          f"p99={percentile(latencies, 0.99) * 1000:7.1f} ms  throughput={requests / wall:6.1f} req/s  errors={errors}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Metadata latency: one ExifTool process per request vs -stay_open pool.")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=4, help="Pool size / max concurrent ExifTool processes")
+    args = parser.parse_args()
+
+    content = create_dummy_jpeg()
+    for label, use_pool in [("Before: subprocess per request", False), ("After: -stay_open pool", True)]:
+        print(f"--- {label} ---")
+        engine = MetadataEngine(max_concurrent=args.workers, use_pool=use_pool)
+        if not engine.exiftool_path:
+            sys.exit("ExifTool not found")
+        for level in CONCURRENCY_LEVELS:
+            run_level(engine, content, level, args.requests)
+        if use_pool:
+            print(f"  pool: {engine.pool_stats()}")
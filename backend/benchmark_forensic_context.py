@@ -0,0 +1,102 @@
+import time
+import sys
+import os
+import tracemalloc
+import numpy as np
+import cv2
+import pywt
+from PIL import Image
+from skimage.color import rgb2gray, rgb2hsv
+from skimage.feature import canny
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from forensic_engine import ForensicEngine
+from forensic_context import ForensicContext
+
+
+def synthetic_image(width, height, seed=0):
+    # Smooth gradients + texture + sensor-like noise, so every step has work to do
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    base = np.stack([x / width * 200, y / height * 180, (x + y) / (width + height) * 220], axis=2)
+    texture = 25 * np.sin(x / 7.0)[..., None] * np.cos(y / 11.0)[..., None]
+    noise = rng.normal(0, 4, size=(height, width, 3)).astype(np.float32)
+    return Image.fromarray(np.clip(base + texture + noise, 0, 255).astype(np.uint8))
+
+
+def legacy_derived(img_np):
+    """The representations the engine built before ForensicContext (one set per step)."""
+    out = {}
+    gray = cv2.cvtColor(img_np, cv2.COLOR_RGB2GRAY)                       # camera
+    out["noise_std"] = float(np.std(gray - cv2.GaussianBlur(gray, (3, 3), 0)))
+    gray = cv2.cvtColor(img_np, cv2.COLOR_RGB2GRAY)                       # frequency
+    mag = 20 * np.log(np.abs(np.fft.fftshift(np.fft.fft2(gray))) + 1e-7)
+    crow, ccol = gray.shape[0] // 2, gray.shape[1] // 2
+    mag[crow - 30:crow + 30, ccol - 30:ccol + 30] = 0
+    out["fft_energy"] = float(np.mean(mag))
+    LL, (LH, HL, HH) = pywt.dwt2(gray, 'haar')
+    e_HH = np.sum(HH ** 2)
+    out["dwt_hh_ratio"] = float(e_HH / (np.sum(LL ** 2) + np.sum(LH ** 2) + np.sum(HL ** 2) + e_HH + 1e-7))
+    sat = rgb2hsv(img_np)[:, :, 1]                                        # color
+    out["sat_mean"], out["sat_std"] = float(np.mean(sat)), float(np.std(sat))
+    gray = cv2.cvtColor(img_np, cv2.COLOR_RGB2GRAY)                       # physical
+    sx = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=5)
+    sy = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=5)
+    np.sqrt(sx ** 2 + sy ** 2)
+    edges = canny(rgb2gray(img_np), sigma=2.0)                            # structure
+    out["edge_density"] = float(np.sum(edges) / edges.size)
+    return out
+
+
+def context_derived(pil_image):
+    engine = ForensicEngine()
+    ctx = ForensicContext(pil_image)
+    cam = engine._metric_camera(ctx)
+    fft = engine._metric_fft(ctx)
+    dwt = engine._metric_dwt(ctx)
+    sat_mean, sat_std = ctx.saturation_stats
+    struct = engine._metric_edges(ctx)
+    out = {
+        "noise_std": cam["noise_level"], "fft_energy": fft["fft_energy"], "dwt_hh_ratio": dwt["dwt_hh_ratio"],
+        "sat_mean": sat_mean, "sat_std": sat_std,
+        "edge_density": struct["edge_density"]
+    }
+    return out, ctx
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+if __name__ == "__main__":
+    width, height = (int(v) for v in sys.argv[1:3]) if len(sys.argv) > 2 else (4000, 3000)
+    print(f"--- Forensic derived representations, {width}x{height} ({width * height / 1e6:.1f} MP) ---")
+    pil_image = synthetic_image(width, height)
+    img_np = np.array(pil_image)
+
+    legacy, legacy_s, legacy_peak = measure(legacy_derived, img_np)
+    (shared, ctx), shared_s, shared_peak = measure(context_derived, pil_image)
+
+    print(f"Per-step conversions : {legacy_s:6.2f} s | peak {legacy_peak / 2**20:7.1f} MiB")
+    print(f"ForensicContext      : {shared_s:6.2f} s | peak {shared_peak / 2**20:7.1f} MiB")
+    print(f"Saved                : {legacy_s - shared_s:6.2f} s | {(legacy_peak - shared_peak) / 2**20:7.1f} MiB "
+          f"({legacy_s / shared_s:.2f}x faster)")
+
+    print("\nBuilt once per request:")
+    sizes = ctx.memory_bytes()
+    for name, seconds in ctx.build_times.items():
+        print(f"  {name:14s} {seconds * 1000:8.1f} ms  {sizes.get(name, 0) / 2**20:7.1f} MiB")
+
+    print("\nMetric parity (legacy vs shared):")
+    for key in legacy:
+        a, b = legacy[key], shared[key]
+        rel = abs(a - b) / max(abs(a), 1e-12)
+        print(f"  {key:14s} {a:.6g} vs {b:.6g} (rel diff {rel:.1e})")
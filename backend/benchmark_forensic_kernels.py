@@ -0,0 +1,76 @@
+import time
+import sys
+import os
+import json
+import resource
+import subprocess
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+MEGAPIXELS = [2, 12, 24]
+KERNELS = ["skimage", "opencv"]
+
+
+def source_image(mp):
+    # test_v2.jpg upscaled in uint8 (real edges, no float temporaries inflating the baseline)
+    import cv2
+    import numpy as np
+    from PIL import Image
+    from benchmark_forensic_parallel import dimensions
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_v2.jpg")
+    with Image.open(path) as img:
+        rgb = np.array(img.convert("RGB"))
+    return cv2.resize(rgb, dimensions(mp), interpolation=cv2.INTER_CUBIC)
+
+
+def run_child(kernels, mp):
+    """Saturation stats + edge density in this (fresh) process, so ru_maxrss is their own peak."""
+    import forensic_kernels
+    from forensic_context import ForensicContext
+    from PIL import Image
+
+    ctx = ForensicContext(Image.fromarray(source_image(mp)))
+    ctx.gray_float  # shared input of the opencv edge kernel, built before the baseline
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    t0 = time.perf_counter()
+    if kernels == "skimage":
+        sat_mean, _ = forensic_kernels.legacy_saturation_stats(ctx.rgb)
+        density = forensic_kernels.legacy_edge_density(ctx.rgb)
+    else:
+        sat_mean, _ = forensic_kernels.saturation_stats(ctx.rgb)
+        density = forensic_kernels.edge_density(ctx.gray_float)
+    elapsed = time.perf_counter() - t0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        "seconds": elapsed,
+        "baseline_kib": baseline,
+        "peak_kib": peak,
+        "sat_mean": sat_mean,
+        "edge_density": density
+    }))
+
+
+def measure(kernels, mp):
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", kernels, str(mp)],
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        run_child(sys.argv[2], float(sys.argv[3]))
+        sys.exit(0)
+
+    print("--- Saturation + Canny kernels: time and peak RSS above the shared inputs (fresh process each) ---")
+    for mp in MEGAPIXELS:
+        results = {k: measure(k, mp) for k in KERNELS}
+        for k in KERNELS:
+            r = results[k]
+            grown = (r["peak_kib"] - r["baseline_kib"]) / 1024
+            print(f"{mp:5.1f} MP {k:8s}: {r['seconds']:6.2f} s | peak RSS {r['peak_kib'] / 1024:7.1f} MiB "
+                  f"(+{grown:7.1f} MiB) | sat_mean {r['sat_mean']:.6f} | edge_density {r['edge_density']:.5f}")
+        old, new = results["skimage"], results["opencv"]
+        print(f"          {old['seconds'] / new['seconds']:.2f}x faster, "
+              f"{(old['peak_kib'] - new['peak_kib']) / 1024:.1f} MiB lower peak")
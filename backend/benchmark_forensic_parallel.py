@@ -0,0 +1,52 @@
+import time
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from forensic_engine import ForensicEngine
+from benchmark_forensic_context import synthetic_image
+
+MEGAPIXELS = [0.5, 2, 8, 12, 24, 50]
+
+
+def dimensions(mp):
+    # 4:3 frame with roughly `mp` megapixels
+    width = int((mp * 1e6 * 4 / 3) ** 0.5)
+    return width, int(width * 3 / 4)
+
+
+def run(engine, image, iterations):
+    best = None
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        report = engine.analyze(image)
+        elapsed = time.perf_counter() - t0
+        if best is None or elapsed < best[0]:
+            best = (elapsed, report)
+    return best
+
+
+def strip_timing(report):
+    return {k: v for k, v in report.items() if k != "timing"}
+
+
+if __name__ == "__main__":
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    sequential = ForensicEngine(step_workers=1)
+    parallel = ForensicEngine(step_workers=workers)
+
+    print(f"--- ForensicEngine.analyze: sequential vs {parallel.step_workers} step workers (best of {iterations}) ---")
+    for mp in MEGAPIXELS:
+        width, height = dimensions(mp)
+        image = synthetic_image(width, height)
+        seq_s, seq_report = run(sequential, image, iterations)
+        par_s, par_report = run(parallel, image, iterations)
+        assert strip_timing(seq_report) == strip_timing(par_report), "parallel report differs from sequential"
+
+        steps = ", ".join(f"{k} {v:.2f}s" for k, v in par_report["timing"]["steps"].items())
+        print(f"{mp:5.1f} MP ({width}x{height}): sequential {seq_s:6.2f} s | parallel {par_s:6.2f} s "
+              f"| {seq_s / par_s:4.2f}x")
+        print(f"          steps: {steps}")
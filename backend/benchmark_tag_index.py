@@ -0,0 +1,62 @@
+import time
+import sys
+import os
+import random
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from tag_index import TagIndex, legacy_get_val
+
+SIZES = [100, 1000, 10000]
+GROUPS = ["IFD0", "ExifIFD", "XMP-xmp", "XMP-xmpMM", "QuickTime", "Track1", "Apple", "ICC_Profile", "Composite"]
+
+# The lookups _process_exiftool_data makes for one report (mostly misses on real files)
+REPORT_LOOKUPS = [
+    ["MIMEType", "FileType"], "FileType", "FileSize", ["ImageWidth", "SourceImageWidth"],
+    ["ImageHeight", "SourceImageHeight"], ["ColorSpace", "ProfileDescription"], ["BitDepth", "BitsPerSample"],
+    ["Make", "Android:Make", "Apple:Make"], ["Model", "Android:Model", "Apple:Model"],
+    ["LensModel", "LensInfo", "LensID"], ["DateTimeOriginal", "CreateDate", "CreationDate"],
+    ["GPSPosition", "GPSLatitude"], "Software", "CreatorTool", "HistorySoftwareAgent", "ProcessingSoftware",
+    "ApplicationRecordVersion", ["CompressorName", "Encoder", "HandlerDescription", "MajorBrand"],
+    "Make", "Model", "ExposureTime", "ISO", "FNumber", "FocalLength", "DateTimeOriginal"
+]
+
+
+def synthetic_tags(n, seed=0):
+    rng = random.Random(seed)
+    tags = {"File:FileType": "MP4", "File:MIMEType": "video/mp4", "System:FileSize": "12 MB"}
+    while len(tags) < n:
+        tags[f"{rng.choice(GROUPS)}:Tag{len(tags)}"] = f"value {rng.random():.6f}"
+    return tags
+
+
+def run(fn, iterations):
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - t0) / iterations
+
+
+def benchmark(n, iterations):
+    raw = synthetic_tags(n)
+
+    def legacy():
+        return [legacy_get_val(raw, keys) for keys in REPORT_LOOKUPS]
+
+    def indexed():
+        index = TagIndex(raw)
+        return [index.get(keys) for keys in REPORT_LOOKUPS]
+
+    assert legacy() == indexed(), "TagIndex disagrees with the linear lookup"
+    legacy_s = run(legacy, iterations)
+    indexed_s = run(indexed, iterations)
+    print(f"  {n:>6} tags: linear {legacy_s * 1000:8.3f} ms | TagIndex (build + lookups) {indexed_s * 1000:7.3f} ms "
+          f"| {legacy_s / indexed_s:6.1f}x")
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print(f"--- {len(REPORT_LOOKUPS)} report lookups per file ---")
+    for size in SIZES:
+        benchmark(size, iterations)
@@ -0,0 +1,100 @@
+import time
+import sys
+import os
+import argparse
+import tracemalloc
+from PIL import Image
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from view_builder import ViewBuilder
+from model_manager import DETECTOR_MODEL_NAMES
+from inference_engine import DirectInferenceEngine
+
+GRID_CELLS = [(r, c, 1) for r in range(4) for c in range(4)]
+
+
+def pil_views(image):
+    """Legacy predict_full_suite view construction."""
+    w, h = image.size
+    views = [image, image.resize((int(w * 0.5), int(h * 0.5))), image.resize((int(w * 0.25), int(h * 0.25)))]
+    pw, ph = w // 4, h // 4
+    for row, col, _ in GRID_CELLS:
+        views.append(image.crop((col * pw, row * ph, col * pw + pw, row * ph + ph)))
+    # crop() is lazy in some Pillow versions; force the copy like a pipeline would
+    for v in views:
+        v.load()
+    return views
+
+
+def array_views(image):
+    builder = ViewBuilder(image)
+    views = [builder.base] + builder.pyramid() + builder.cells(GRID_CELLS)[0]
+    return builder, views
+
+
+def time_it(fn, iterations):
+    latencies = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t0)
+    latencies.sort()
+    return latencies[len(latencies) // 2]
+
+
+def benchmark_build(image, iterations):
+    pil_s = time_it(lambda: pil_views(image), iterations)
+    arr_s = time_it(lambda: array_views(image), iterations)
+
+    # PIL stores RGB as 4 bytes/pixel outside the Python allocator, so count it directly
+    pil_bytes = sum(v.size[0] * v.size[1] * 4 for v in pil_views(image))
+
+    tracemalloc.start()
+    builder, views = array_views(image)
+    mem = builder.memory_stats(views)
+    tracemalloc.stop()
+
+    print(f"View build ({len(views)} views): PIL {pil_s * 1000:.1f} ms | array {arr_s * 1000:.1f} ms")
+    print(f"  PIL view memory:   {pil_bytes / 1e6:.1f} MB")
+    print(f"  array owned:       {mem['owned_bytes'] / 1e6:.1f} MB "
+          f"(views would be {mem['view_bytes'] / 1e6:.1f} MB as copies, {mem['zero_copy_views']} zero-copy)")
+    if "traced_peak_bytes" in mem:
+        print(f"  array traced peak: {mem['traced_peak_bytes'] / 1e6:.1f} MB")
+
+
+def benchmark_preprocess(name, image, iterations):
+    """Processor on PIL views vs cv2 native preprocessing on array views, plus ai_prob drift."""
+    engine = DirectInferenceEngine(native_preprocess=True)
+    engine.load(name)
+    if engine.native_plans.get(name) is None:
+        print(f"{name}: processor config not supported by native preprocessing, skipped")
+        return
+
+    pil = pil_views(image)
+    _, arr = array_views(image)
+    pil_s = time_it(lambda: engine.preprocess(name, pil), iterations)
+    arr_s = time_it(lambda: engine.preprocess(name, arr), iterations)
+    drift = np.abs(engine.predict_ai_probs(name, pil) - engine.predict_ai_probs(name, arr))
+    print(f"{name}: preprocess PIL {pil_s * 1000:.1f} ms | native {arr_s * 1000:.1f} ms | "
+          f"max |d ai_prob| {drift.max():.4f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PIL vs array view construction for predict_full_suite.")
+    parser.add_argument("--image", help="Image file (defaults to random 12MP noise)")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--models", nargs="*", default=[], help=f"Also compare preprocessing, e.g. {DETECTOR_MODEL_NAMES[0]}")
+    args = parser.parse_args()
+
+    if args.image:
+        img = Image.open(args.image).convert("RGB")
+    else:
+        img = Image.fromarray(np.random.RandomState(0).randint(0, 255, (3000, 4000, 3), dtype=np.uint8))
+
+    print(f"Image: {img.size[0]}x{img.size[1]}")
+    benchmark_build(img, args.iterations)
+    for model_name in args.models:
+        benchmark_preprocess(model_name, img, args.iterations)
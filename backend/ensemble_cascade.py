@@ -0,0 +1,114 @@
+import threading
+
+
+class EnsembleCascade:
+    """
+    Early-exit ordering and stopping rule for the detector ensemble.
+    - Models run cheapest/most reliable first: ordered by historical agreement with
+      the final verdict divided by measured latency per view.
+    - After each model, a view is "decided" once the weighted AI probability can no
+      longer cross 0.5 whatever the remaining models return (or fail to return).
+    - margin=0 guarantees the same consensus as running every model; margin>0 also
+      stops when the worst case would cross 0.5 by less than `margin`.
+    - Only the consensus is preserved: votes and average confidence of an exited view
+      cover the models that ran. Views fusion reads in full are never exited early.
+    - `confidence_thresholds` (percent, compared as `confidence > t`) are cut points
+      downstream rules apply to a view's average confidence; a view is only decided
+      once its reported confidence cannot cross any of them either.
+    """
+
+    def __init__(self, margin=0.0, ema_alpha=0.2, confidence_thresholds=()):
+        self.margin = margin
+        self.confidence_thresholds = tuple(confidence_thresholds)
+        self.ema_alpha = ema_alpha
+        self._lock = threading.Lock()
+
+        self.latency = {}     # name -> EMA seconds per view
+        self.agreement = {}   # name -> [agreed, total]
+
+        # Metrics
+        self.batches = 0
+        self.views = 0
+        self.views_exited_early = 0
+        self.pairs_skipped = 0
+        self.time_saved_s = 0.0
+
+    def order(self, model_names):
+        with self._lock:
+            known = [v for v in self.latency.values() if v > 0]
+            default_latency = sorted(known)[len(known) // 2] if known else 1.0
+
+            def priority(name):
+                agreed, total = self.agreement.get(name, [0, 0])
+                rate = (agreed + 1) / (total + 2)  # Laplace-smoothed
+                return rate / max(self.latency.get(name, default_latency), 1e-6)
+
+            return sorted(model_names, key=priority, reverse=True)
+
+    def is_decided(self, weighted_sum, weight, remaining_weight):
+        """
+        True if the final consensus (and every confidence threshold) can no longer flip.
+        Bounds cover every outcome: each remaining model adds a score in [0, 1]
+        or drops out (error), so the final prob lies between these extremes.
+        """
+        if weight <= 0:
+            return False
+        current = weighted_sum / weight
+        lower = min(current, weighted_sum / (weight + remaining_weight))
+        upper = max(current, (weighted_sum + remaining_weight) / (weight + remaining_weight))
+
+        if current > 0.5:
+            decided = lower > 0.5 - self.margin
+        else:
+            decided = upper <= 0.5 + self.margin
+        if not decided:
+            return False
+
+        # Same rounding as the reported average_confidence; rounding is monotonic
+        low, high = round(lower * 100, 2), round(upper * 100, 2)
+        return all((low > t) == (high > t) for t in self.confidence_thresholds)
+
+    def record_latency(self, name, seconds, num_views):
+        if num_views <= 0:
+            return
+        per_view = seconds / num_views
+        with self._lock:
+            prev = self.latency.get(name)
+            self.latency[name] = per_view if prev is None else (1 - self.ema_alpha) * prev + self.ema_alpha * per_view
+
+    def record_batch(self, agreements, skipped_pairs, num_views, views_exited_early):
+        """
+        agreements: list of (model, agreed_bool) for every model/view pair that ran.
+        skipped_pairs: list of model names, one entry per skipped model/view pair.
+        """
+        with self._lock:
+            for name, agreed in agreements:
+                stats = self.agreement.setdefault(name, [0, 0])
+                stats[0] += int(agreed)
+                stats[1] += 1
+            saved = sum(self.latency.get(name, 0.0) for name in skipped_pairs)
+
+            self.batches += 1
+            self.views += num_views
+            self.views_exited_early += views_exited_early
+            self.pairs_skipped += len(skipped_pairs)
+            self.time_saved_s += saved
+
+        if views_exited_early:
+            print(f"Cascade: {views_exited_early}/{num_views} views decided early, "
+                  f"{len(skipped_pairs)} model runs skipped (~{saved:.2f}s saved)")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "margin": self.margin,
+                "confidence_thresholds": list(self.confidence_thresholds),
+                "batches": self.batches,
+                "views": self.views,
+                "views_exited_early": self.views_exited_early,
+                "early_exit_rate": round(self.views_exited_early / self.views, 3) if self.views else 0.0,
+                "model_runs_skipped": self.pairs_skipped,
+                "est_time_saved_s": round(self.time_saved_s, 3),
+                "latency_ms_per_view": {k: round(v * 1000, 2) for k, v in self.latency.items()},
+                "agreement_rate": {k: round(a / t, 3) for k, (a, t) in self.agreement.items() if t}
+            }
@@ -0,0 +1,192 @@
+import re
+import queue
+import atexit
+import threading
+import subprocess
+
+_READY_RE = re.compile(rb"^\{ready(\d+)\}\s*$")
+
+
+def read_rchar(pid):
+    """Bytes the process has read so far (/proc/<pid>/io), or None where unavailable."""
+    try:
+        with open(f"/proc/{pid}/io") as f:
+            for line in f:
+                if line.startswith("rchar:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+class _ExifToolWorker:
+    """
+    One long-lived `exiftool -stay_open True -@ -` process.
+    Arguments go to stdin one per line, terminated by `-execute<N>`; ExifTool answers
+    on stdout and ends each answer with `{ready<N>}`, which frames the response.
+    """
+
+    def __init__(self, exiftool_path, worker_id):
+        self.exiftool_path = exiftool_path
+        self.worker_id = worker_id
+        self.proc = None
+        self.seq = 0
+        self.restarts = 0
+        self._responses = queue.Queue()
+        self._stderr = []
+        self._stderr_lock = threading.Lock()
+
+    def start(self):
+        self.proc = subprocess.Popen(
+            [self.exiftool_path, "-stay_open", "True", "-@", "-"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        self._responses = queue.Queue()
+        # Readers are bound to this process; they exit when its pipes close
+        threading.Thread(target=self._read_stdout, args=(self.proc, self._responses), daemon=True).start()
+        threading.Thread(target=self._read_stderr, args=(self.proc,), daemon=True).start()
+
+    def alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def _read_stdout(self, proc, responses):
+        buf = []
+        for line in iter(proc.stdout.readline, b""):
+            m = _READY_RE.match(line)
+            if m:
+                responses.put((int(m.group(1)), b"".join(buf)))
+                buf = []
+            else:
+                buf.append(line)
+        responses.put((None, b""))  # process exited
+
+    def _read_stderr(self, proc):
+        for line in iter(proc.stderr.readline, b""):
+            with self._stderr_lock:
+                self._stderr.append(line)
+                del self._stderr[:-50]
+
+    def _take_stderr(self):
+        with self._stderr_lock:
+            text = b"".join(self._stderr)
+            self._stderr = []
+        return text.decode("utf-8", errors="ignore")
+
+    def execute(self, args, timeout):
+        """
+        Returns (stdout, stderr, bytes_read) for one request; bytes_read is None off Linux.
+        Raises TimeoutError or RuntimeError (the worker is restarted).
+        """
+        if self.proc is None:
+            self.start()
+        elif not self.alive():
+            self.restart()
+
+        self.seq += 1
+        seq = self.seq
+        self._take_stderr()
+        rchar_before = read_rchar(self.proc.pid)
+        payload = "".join(f"{a}\n" for a in args) + f"-execute{seq}\n"
+        try:
+            self.proc.stdin.write(payload.encode("utf-8"))
+            self.proc.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            self.restart()
+            raise RuntimeError(f"ExifTool worker {self.worker_id} died: {e}")
+
+        while True:
+            try:
+                got, out = self._responses.get(timeout=timeout)
+            except queue.Empty:
+                self.restart()
+                raise TimeoutError(f"ExifTool worker {self.worker_id} timed out after {timeout}s")
+            if got is None:
+                self.restart()
+                raise RuntimeError(f"ExifTool worker {self.worker_id} exited: {self._take_stderr()}")
+            if got == seq:
+                rchar_after = read_rchar(self.proc.pid)
+                bytes_read = rchar_after - rchar_before if None not in (rchar_before, rchar_after) else None
+                return out.decode("utf-8", errors="ignore"), self._take_stderr(), bytes_read
+            # Stale answer from an earlier, timed-out request: skip it
+
+    def restart(self):
+        self.stop(graceful=False)
+        self.restarts += 1
+        print(f"Restarting ExifTool worker {self.worker_id}", flush=True)
+        self.start()
+
+    def stop(self, graceful=True):
+        proc, self.proc = self.proc, None
+        if proc is None or proc.poll() is not None:
+            return
+        try:
+            if graceful:
+                proc.stdin.write(b"-stay_open\nFalse\n")
+                proc.stdin.flush()
+                proc.wait(timeout=2)
+                return
+        except Exception:
+            pass
+        proc.kill()
+        proc.wait()
+
+
+class ExifToolPool:
+    """
+    Fixed-size pool of persistent ExifTool processes.
+    - Workers start lazily on first use and are reused across requests.
+    - Each call has a timeout; hung or crashed workers are killed and restarted.
+    - run() returns the same stdout a one-shot `exiftool <args> <file>` would print.
+    """
+
+    def __init__(self, exiftool_path, size=2, timeout=30):
+        self.exiftool_path = exiftool_path
+        self.size = max(1, size)
+        self.timeout = timeout
+        self._idle = queue.Queue()
+        self._workers = []
+        for i in range(self.size):
+            worker = _ExifToolWorker(exiftool_path, i)
+            self._workers.append(worker)
+            self._idle.put(worker)
+
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.timeouts = 0
+        self.failures = 0
+        atexit.register(self.close)
+
+    def run(self, args):
+        """Returns (stdout, stderr, bytes_read) for one ExifTool invocation."""
+        worker = self._idle.get()
+        try:
+            with self._lock:
+                self.calls += 1
+            try:
+                return worker.execute(args, self.timeout)
+            except TimeoutError:
+                with self._lock:
+                    self.timeouts += 1
+                raise
+            except RuntimeError:
+                with self._lock:
+                    self.failures += 1
+                raise
+        finally:
+            self._idle.put(worker)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": self.size,
+                "idle": self._idle.qsize(),
+                "alive": sum(1 for w in self._workers if w.alive()),
+                "calls": self.calls,
+                "timeouts": self.timeouts,
+                "failures": self.failures,
+                "restarts": sum(w.restarts for w in self._workers)
+            }
+
+    def close(self):
+        for worker in self._workers:
+            worker.stop()
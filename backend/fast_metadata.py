@@ -0,0 +1,666 @@
+import io
+import re
+import struct
+import zlib
+import xml.etree.ElementTree as ET
+
+# Decompressed PNG text / ICC chunks larger than this go to ExifTool
+MAX_INFLATE_BYTES = 16 * 1024 * 1024
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+RDF = "{http://www.w3.org/1999/02/22-rdf-syntax-ns#}"
+
+
+class Unsupported(Exception):
+    """
+    The input needs ExifTool: unknown format, C2PA/JUMBF, extended XMP, a corrupt structure,
+    or any tag, segment or chunk the tables below do not cover (nothing is dropped silently,
+    so AI signatures in uncommon tags still reach the signature matcher).
+    """
+
+
+def _uncovered(where):
+    return Unsupported(f"uncovered tag: {where}")
+
+
+def parse(data, stats=None):
+    """
+    Reads metadata segments straight from the file bytes (no pixel decoding) and returns
+    the flattened {"Group:Tag": value} dict that `exiftool -json -G -a -u -g1` yields
+    after flattening. Files holding anything this module does not cover raise Unsupported.
+    stats: optional dict, receives "bytes_read" (bytes of the file actually examined).
+    Raises Unsupported when the file has to go through ExifTool instead.
+    """
+    tags = {"System:FileSize": _file_size(len(data))}
+    try:
+        if data[:3] == b"\xff\xd8\xff":
+            _file_type(tags, "JPEG", "jpg", "image/jpeg")
+            bytes_read = _parse_jpeg(data, tags)
+        elif data[:8] == PNG_SIGNATURE:
+            _file_type(tags, "PNG", "png", "image/png")
+            bytes_read = _parse_png(data, tags)
+        elif data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+            _file_type(tags, "WEBP", "webp", "image/webp")
+            bytes_read = _parse_webp(data, tags)
+        else:
+            raise Unsupported("format not covered by the fast path")
+    except (struct.error, IndexError, ValueError, TypeError, zlib.error, ET.ParseError) as e:
+        raise Unsupported(f"corrupt or unexpected structure: {e}")
+    if stats is not None:
+        stats["bytes_read"] = min(bytes_read, len(data))
+    return {k: _json_value(v) for k, v in tags.items()}
+
+
+def _file_type(tags, file_type, ext, mime):
+    tags["File:FileType"] = file_type
+    tags["File:FileTypeExtension"] = ext
+    tags["File:MIMEType"] = mime
+
+
+def _file_size(n):
+    # Same (decimal) units as ExifTool's ConvertFileSize
+    if n < 2000:
+        return f"{n} bytes"
+    if n < 10000:
+        return f"{n / 1000:.1f} kB"
+    if n < 2000000:
+        return f"{n / 1000:.0f} kB"
+    if n < 10000000:
+        return f"{n / 1000000:.1f} MB"
+    if n < 2000000000:
+        return f"{n / 1000000:.0f} MB"
+    if n < 10000000000:
+        return f"{n / 1000000000:.1f} GB"
+    return f"{n / 1000000000:.0f} GB"
+
+
+_JSON_NUMBER = re.compile(r"^-?(\d|[1-9]\d{1,14})(\.\d{1,16})?([eE][-+]?\d{1,3})?$")
+
+
+def _json_value(v):
+    """ExifTool -json writes number-looking values as JSON numbers."""
+    if isinstance(v, list):
+        return [_json_value(x) for x in v]
+    if isinstance(v, str) and _JSON_NUMBER.match(v):
+        return float(v) if any(c in v for c in ".eE") else int(v)
+    return v
+
+
+def _num(x):
+    if isinstance(x, float):
+        if x.is_integer():
+            return int(x)
+        return float(f"{x:.10g}")
+    return x
+
+
+def _inflate(data):
+    d = zlib.decompressobj()
+    out = d.decompress(data, MAX_INFLATE_BYTES)
+    if d.unconsumed_tail:
+        raise Unsupported("compressed chunk too large")
+    return out
+
+
+def _add(tags, key, value):
+    """Repeated tags (e.g. IPTC Keywords) become lists, like ExifTool -a."""
+    if key in tags:
+        prev = tags[key]
+        tags[key] = (prev if isinstance(prev, list) else [prev]) + [value]
+    else:
+        tags[key] = value
+
+
+# ---------------------------------------------------------------- EXIF (TIFF)
+
+_TIFF_TYPES = {1: (1, "B"), 2: (1, None), 3: (2, "H"), 4: (4, "I"), 5: (8, None), 6: (1, "b"), 7: (1, None),
+               8: (2, "h"), 9: (4, "i"), 10: (8, None), 11: (4, "f"), 12: (8, "d")}
+
+IFD0_TAGS = {
+    0x0100: "ImageWidth", 0x0101: "ImageHeight", 0x0102: "BitsPerSample", 0x010e: "ImageDescription",
+    0x010f: "Make", 0x0110: "Model", 0x0112: "Orientation", 0x011a: "XResolution", 0x011b: "YResolution",
+    0x0128: "ResolutionUnit", 0x0131: "Software", 0x0132: "ModifyDate", 0x013b: "Artist",
+    0x8298: "Copyright", 0x000b: "ProcessingSoftware", 0xa430: "OwnerName", 0x013c: "HostComputer",
+    0x0213: "YCbCrPositioning", 0x9c9b: "XPTitle", 0x9c9c: "XPComment", 0x9c9d: "XPAuthor",
+    0x9c9e: "XPKeywords", 0x9c9f: "XPSubject"
+}
+EXIF_IFD_TAGS = {
+    0x829a: "ExposureTime", 0x829d: "FNumber", 0x8822: "ExposureProgram", 0x8827: "ISO",
+    0x9000: "ExifVersion", 0x9003: "DateTimeOriginal", 0x9004: "CreateDate", 0x9010: "OffsetTime",
+    0x9011: "OffsetTimeOriginal", 0x920a: "FocalLength", 0x9286: "UserComment", 0xa001: "ColorSpace",
+    0xa002: "ExifImageWidth", 0xa003: "ExifImageHeight", 0xa405: "FocalLengthIn35mmFormat",
+    0xa420: "ImageUniqueID", 0xa430: "OwnerName", 0xa431: "SerialNumber", 0xa433: "LensMake",
+    0xa434: "LensModel", 0xa000: "FlashpixVersion", 0x9101: "ComponentsConfiguration"
+}
+GPS_TAGS = {
+    0x01: "GPSLatitudeRef", 0x02: "GPSLatitude", 0x03: "GPSLongitudeRef", 0x04: "GPSLongitude",
+    0x05: "GPSAltitudeRef", 0x06: "GPSAltitude", 0x1d: "GPSDateStamp"
+}
+# Sub-IFD pointers: followed, not reported (ExifTool lists the tags they point to)
+IFD_POINTERS = {0x8769: "ExifIFD", 0x8825: "GPS"}
+
+_ORIENTATION = {1: "Horizontal (normal)", 2: "Mirror horizontal", 3: "Rotate 180", 4: "Mirror vertical",
+                5: "Mirror horizontal and rotate 270 CW", 6: "Rotate 90 CW",
+                7: "Mirror horizontal and rotate 90 CW", 8: "Rotate 270 CW"}
+_EXPOSURE_PROGRAM = {0: "Not Defined", 1: "Manual", 2: "Program AE", 3: "Aperture-priority AE",
+                     4: "Shutter speed priority AE", 5: "Creative (Slow speed)", 6: "Action (High speed)",
+                     7: "Portrait", 8: "Landscape"}
+
+
+def _exposure_time(v):
+    if 0 < v < 0.25001:
+        return f"1/{int(0.5 + 1 / v)}"
+    return re.sub(r"\.0$", "", f"{v:.1f}")
+
+
+def _fnumber(v):
+    return f"{v:.2g}" if v < 1 else f"{v:.1f}"
+
+
+def _dms(v):
+    if not isinstance(v, list) or len(v) != 3:
+        return v
+    dec = v[0] + v[1] / 60 + v[2] / 3600
+    deg = int(dec)
+    minutes = int((dec - deg) * 60)
+    seconds = ((dec - deg) * 60 - minutes) * 60
+    return f"{deg} deg {minutes}' {seconds:.2f}\""
+
+
+def _xp_text(v):
+    # Windows XP* tags: UCS-2 little-endian in a BYTE array
+    if isinstance(v, int):
+        v = [v]
+    return bytes(v).decode("utf-16-le", errors="replace").rstrip("\x00")
+
+
+def _components(v):
+    v = v if isinstance(v, (bytes, list)) else [v]
+    return ", ".join({0: "-", 1: "Y", 2: "Cb", 3: "Cr", 4: "R", 5: "G", 6: "B"}.get(c, str(c)) for c in v)
+
+
+def _user_comment(v):
+    if not isinstance(v, bytes):
+        return v
+    charset, text = v[:8], v[8:]
+    if charset.startswith(b"UNICODE"):
+        enc = "utf-16-be" if text[:1] == b"\x00" else "utf-16-le"
+        return text.decode(enc, errors="replace").rstrip("\x00 ")
+    return text.decode("utf-8", errors="replace").rstrip("\x00 ")
+
+
+_PRINT_CONV = {
+    "ExposureTime": _exposure_time,
+    "FNumber": _fnumber,
+    "FocalLength": lambda v: f"{v:.1f} mm",
+    "Orientation": _ORIENTATION.get,
+    "ExposureProgram": _EXPOSURE_PROGRAM.get,
+    "ResolutionUnit": {1: "None", 2: "inches", 3: "cm"}.get,
+    "ColorSpace": {1: "sRGB", 2: "Adobe RGB", 0xffff: "Uncalibrated"}.get,
+    "ExifVersion": lambda v: v.decode("ascii", errors="replace") if isinstance(v, bytes) else v,
+    "FlashpixVersion": lambda v: v.decode("ascii", errors="replace") if isinstance(v, bytes) else v,
+    "ComponentsConfiguration": _components,
+    "YCbCrPositioning": {1: "Centered", 2: "Co-sited"}.get,
+    "XPTitle": _xp_text,
+    "XPComment": _xp_text,
+    "XPAuthor": _xp_text,
+    "XPKeywords": _xp_text,
+    "XPSubject": _xp_text,
+    "UserComment": _user_comment,
+    "GPSLatitude": _dms,
+    "GPSLongitude": _dms,
+    "GPSLatitudeRef": {"N": "North", "S": "South"}.get,
+    "GPSLongitudeRef": {"E": "East", "W": "West"}.get,
+    "GPSAltitudeRef": {0: "Above Sea Level", 1: "Below Sea Level"}.get,
+    "GPSAltitude": lambda v: f"{_num(v)} m",
+    "GPSDateStamp": lambda v: v
+}
+
+
+def _decode_value(typ, count, raw, endian):
+    if typ == 2:
+        return raw.split(b"\x00")[0].decode("utf-8", errors="replace").strip()
+    if typ == 7:
+        return raw
+    if typ in (5, 10):
+        fmt = endian + ("II" if typ == 5 else "ii")
+        values = []
+        for i in range(count):
+            num, den = struct.unpack_from(fmt, raw, 8 * i)
+            values.append(num / den if den else 0.0)
+    else:
+        size, fmt = _TIFF_TYPES[typ]
+        values = list(struct.unpack_from(f"{endian}{count}{fmt}", raw))
+    values = [_num(x) for x in values]
+    return values[0] if count == 1 else values
+
+
+def _read_ifd(tiff, offset, endian):
+    """Returns ({tag_id: value}, next IFD offset)."""
+    count = struct.unpack_from(endian + "H", tiff, offset)[0]
+    entries = {}
+    for i in range(count):
+        pos = offset + 2 + 12 * i
+        tag, typ, n = struct.unpack_from(endian + "HHI", tiff, pos)
+        if typ not in _TIFF_TYPES or n > 1 << 20:
+            raise Unsupported(f"TIFF entry 0x{tag:04x} with type {typ}, count {n}")
+        total = _TIFF_TYPES[typ][0] * n
+        data_off = pos + 8 if total <= 4 else struct.unpack_from(endian + "I", tiff, pos + 8)[0]
+        raw = tiff[data_off:data_off + total]
+        if len(raw) < total:
+            raise Unsupported(f"TIFF entry 0x{tag:04x} points outside the block")
+        entries[tag] = _decode_value(typ, n, raw, endian)
+    next_ifd = struct.unpack_from(endian + "I", tiff, offset + 2 + 12 * count)[0]
+    return entries, next_ifd
+
+
+def _emit(tags, group, entries, table):
+    for tag_id in entries:
+        if tag_id not in table and tag_id not in IFD_POINTERS:
+            raise _uncovered(f"{group} 0x{tag_id:04x}")
+    for tag_id, name in table.items():
+        if tag_id not in entries:
+            continue
+        value = entries[tag_id]
+        conv = _PRINT_CONV.get(name)
+        if conv is not None:
+            converted = conv(value)
+            value = value if converted is None else converted
+        if isinstance(value, bytes):
+            raise _uncovered(f"{group}:{name} (binary value)")
+        if isinstance(value, list):
+            value = " ".join(str(x) for x in value)
+        tags[f"{group}:{name}"] = value if isinstance(value, (int, float)) else str(value)
+
+
+def _parse_tiff(tiff, tags):
+    if tiff[:6] == b"Exif\x00\x00":
+        tiff = tiff[6:]
+    endian = {b"II": "<", b"MM": ">"}.get(tiff[:2])
+    if endian is None or struct.unpack_from(endian + "H", tiff, 2)[0] != 42:
+        raise Unsupported("bad TIFF header")
+
+    ifd0, next_ifd = _read_ifd(tiff, struct.unpack_from(endian + "I", tiff, 4)[0], endian)
+    if next_ifd:
+        raise _uncovered("IFD1 (thumbnail)")
+    _emit(tags, "IFD0", ifd0, IFD0_TAGS)
+    for pointer, group, table in ((0x8769, "ExifIFD", EXIF_IFD_TAGS), (0x8825, "GPS", GPS_TAGS)):
+        if pointer in ifd0:
+            entries, _ = _read_ifd(tiff, ifd0[pointer], endian)
+            if any(tag in IFD_POINTERS for tag in entries):
+                raise _uncovered(f"{group} sub-IFD pointer")
+            _emit(tags, group, entries, table)
+
+
+# ---------------------------------------------------------------- XMP
+
+# ExifTool names XMP groups after the standard prefix of each namespace
+XMP_PREFIXES = {
+    "http://ns.adobe.com/xap/1.0/": "xmp",
+    "http://ns.adobe.com/xap/1.0/mm/": "xmpMM",
+    "http://ns.adobe.com/xap/1.0/rights/": "xmpRights",
+    "http://purl.org/dc/elements/1.1/": "dc",
+    "http://ns.adobe.com/photoshop/1.0/": "photoshop",
+    "http://ns.adobe.com/tiff/1.0/": "tiff",
+    "http://ns.adobe.com/exif/1.0/": "exif",
+    "http://ns.adobe.com/exif/1.0/aux/": "aux",
+    "http://cipa.jp/exif/1.0/": "exifEX",
+    "http://ns.adobe.com/camera-raw-settings/1.0/": "crs",
+    "http://ns.adobe.com/pdf/1.3/": "pdf",
+    "http://iptc.org/std/Iptc4xmpCore/1.0/xmlns/": "Iptc4xmpCore",
+    "http://iptc.org/std/Iptc4xmpExt/2008-02-29/": "Iptc4xmpExt",
+    "http://ns.useplus.org/ldf/xmp/1.0/": "plus"
+}
+
+
+def _split(qname):
+    uri, _, local = qname[1:].partition("}") if qname.startswith("{") else ("", "", qname)
+    return uri, local
+
+
+def _ucfirst(s):
+    return s[:1].upper() + s[1:]
+
+
+def _xmp_items(el):
+    """Values of one XMP property: [str | {field: value}] plus the container kind."""
+    for container in el:
+        if container.tag in (RDF + "Seq", RDF + "Bag", RDF + "Alt"):
+            items = [_xmp_node(li) for li in container if li.tag == RDF + "li"]
+            return items, container.tag[len(RDF):]
+    return [_xmp_node(el)], None
+
+
+def _xmp_node(el):
+    """str for simple values, dict for structures."""
+    fields = {}
+    for attr, value in el.attrib.items():
+        uri, local = _split(attr)
+        if uri and not attr.startswith(RDF) and uri != "http://www.w3.org/XML/1998/namespace":
+            fields[local] = value
+    children = [c for c in el if c.tag != RDF + "Description"] + \
+               [g for c in el if c.tag == RDF + "Description" for g in c]
+    for c in el:
+        if c.tag == RDF + "Description":
+            for attr, value in c.attrib.items():
+                uri, local = _split(attr)
+                if uri and not attr.startswith(RDF):
+                    fields[local] = value
+    if not children and not fields:
+        return el.get(RDF + "resource", (el.text or "").strip())
+    for child in children:
+        _, local = _split(child.tag)
+        items, _ = _xmp_items(child)
+        fields[local] = items[0] if len(items) == 1 else items
+    return fields
+
+
+def _flatten_xmp(prefix_name, value, out):
+    """Structures flatten to ParentField keys, with one list entry per item (ExifTool style)."""
+    if isinstance(value, dict):
+        for field, v in value.items():
+            _flatten_xmp(prefix_name + _ucfirst(field), v, out)
+    elif isinstance(value, list):
+        for v in value:
+            _flatten_xmp(prefix_name, v, out)
+    else:
+        out.setdefault(prefix_name, []).append(value)
+
+
+def _parse_xmp(packet, tags):
+    packet = packet.strip(b"\x00 \r\n\t")
+    doc_prefixes = {}
+    for _, (prefix, uri) in ET.iterparse(io.BytesIO(packet), events=("start-ns",)):
+        doc_prefixes.setdefault(uri, prefix)
+    root = ET.fromstring(packet)
+
+    for desc in root.iter(RDF + "Description"):
+        props = []
+        for attr, value in desc.attrib.items():
+            uri, local = _split(attr)
+            if uri and not attr.startswith(RDF):
+                props.append((uri, local, [value], None))
+        for el in desc:
+            uri, local = _split(el.tag)
+            if uri and not el.tag.startswith(RDF):
+                items, kind = _xmp_items(el)
+                props.append((uri, local, items, kind))
+
+        for uri, local, items, kind in props:
+            group = "XMP-" + XMP_PREFIXES.get(uri, doc_prefixes.get(uri, "unknown"))
+            flat = {}
+            if kind == "Alt":
+                items = items[:1]  # x-default
+            for item in items:
+                _flatten_xmp(_ucfirst(local), item, flat)
+            for name, values in flat.items():
+                tags[f"{group}:{name}"] = values[0] if len(values) == 1 else values
+
+    # Nested rdf:Description nodes are visited twice by root.iter(); values above are
+    # idempotent per key, so that only costs time on unusual packets.
+
+
+# ---------------------------------------------------------------- IPTC / ICC
+
+IPTC_TAGS = {
+    0: "ApplicationRecordVersion", 5: "ObjectName", 25: "Keywords", 40: "SpecialInstructions",
+    55: "DateCreated", 60: "TimeCreated", 65: "OriginatingProgram", 70: "ProgramVersion",
+    80: "By-line", 85: "By-lineTitle", 90: "City", 101: "Country-PrimaryLocationName",
+    105: "Headline", 110: "Credit", 115: "Source", 116: "CopyrightNotice", 120: "Caption-Abstract",
+    122: "Writer-Editor"
+}
+
+
+def _parse_iptc(data, tags):
+    pos, utf8 = 0, False
+    while pos + 5 <= len(data) and data[pos] == 0x1C:
+        record, dataset, size = data[pos + 1], data[pos + 2], struct.unpack_from(">H", data, pos + 3)[0]
+        if size & 0x8000:
+            raise Unsupported("extended IPTC dataset")
+        value = data[pos + 5:pos + 5 + size]
+        pos += 5 + size
+        if record == 1 and dataset == 90 and value == b"\x1b%G":
+            utf8 = True
+            _add(tags, "IPTC:CodedCharacterSet", "UTF8")
+            continue
+        if record != 2 or dataset not in IPTC_TAGS:
+            raise _uncovered(f"IPTC {record}:{dataset}")
+        name = IPTC_TAGS[dataset]
+        if name == "ApplicationRecordVersion":
+            _add(tags, f"IPTC:{name}", int.from_bytes(value, "big"))
+            continue
+        text = value.decode("utf-8" if utf8 else "latin-1", errors="replace")
+        if name == "DateCreated" and len(text) == 8:
+            text = f"{text[:4]}:{text[4:6]}:{text[6:]}"
+        _add(tags, f"IPTC:{name}", text)
+
+
+def _parse_photoshop_irb(data, tags):
+    pos = 0
+    while pos + 12 <= len(data) and data[pos:pos + 4] == b"8BIM":
+        res_id = struct.unpack_from(">H", data, pos + 4)[0]
+        name_len = data[pos + 6]
+        pos += 6 + ((name_len + 2) & ~1)
+        size = struct.unpack_from(">I", data, pos)[0]
+        body = data[pos + 4:pos + 4 + size]
+        pos += 4 + size + (size & 1)
+        if res_id != 0x0404:
+            raise _uncovered(f"Photoshop resource 0x{res_id:04x}")
+        _parse_iptc(body, tags)
+
+
+def _icc_text(profile, offset, size):
+    sig = profile[offset:offset + 4]
+    if sig == b"desc":
+        n = struct.unpack_from(">I", profile, offset + 8)[0]
+        return profile[offset + 12:offset + 12 + n].split(b"\x00")[0].decode("latin-1")
+    if sig == b"mluc":
+        length, rec_off = struct.unpack_from(">II", profile, offset + 20)
+        return profile[offset + rec_off:offset + rec_off + length].decode("utf-16-be", errors="replace").rstrip("\x00")
+    if sig == b"text":
+        return profile[offset + 8:offset + size].split(b"\x00")[0].decode("latin-1")
+    return None
+
+
+# Text-valued ICC tags; the header and the numeric/curve tags carry no text
+ICC_TEXT_TAGS = {b"desc": "ProfileDescription", b"cprt": "ProfileCopyright", b"dmnd": "DeviceMfgDesc",
+                 b"dmdd": "DeviceModelDesc", b"vued": "ViewingCondDesc"}
+
+
+def _parse_icc(profile, tags):
+    count = struct.unpack_from(">I", profile, 128)[0]
+    if count > 256:
+        raise Unsupported("ICC tag table too large")
+    for i in range(count):
+        sig, off, size = struct.unpack_from(">4sII", profile, 132 + 12 * i)
+        text = _icc_text(profile, off, size)
+        if text is None:
+            continue
+        if sig not in ICC_TEXT_TAGS:
+            raise _uncovered(f"ICC text tag {sig!r}")
+        tags[f"ICC_Profile:{ICC_TEXT_TAGS[sig]}"] = text.strip()
+
+
+# ---------------------------------------------------------------- containers
+
+def _parse_jfif(seg, tags):
+    major, minor, units, xdens, ydens, thumb_w, thumb_h = struct.unpack_from(">BBBHHBB", seg, 5)
+    if thumb_w or thumb_h:
+        raise _uncovered("JFIF thumbnail")
+    tags["JFIF:JFIFVersion"] = f"{major}.{minor:02d}"
+    tags["JFIF:ResolutionUnit"] = {0: "None", 1: "inches", 2: "cm"}.get(units, str(units))
+    tags["JFIF:XResolution"] = xdens
+    tags["JFIF:YResolution"] = ydens
+
+
+def _parse_jpeg(data, tags):
+    icc_chunks = {}
+    pos = 2
+    while pos + 4 <= len(data):
+        if data[pos] != 0xFF:
+            raise Unsupported("corrupt JPEG marker")
+        marker = data[pos + 1]
+        if marker == 0xFF:
+            pos += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            pos += 2
+            continue
+        if marker in (0xD9, 0xDA):
+            break  # end of image / start of scan: everything after is pixel data
+        length = struct.unpack_from(">H", data, pos + 2)[0]
+        seg = data[pos + 4:pos + 2 + length]
+        pos += 2 + length
+
+        if marker == 0xE0 and seg.startswith(b"JFIF\x00"):
+            _parse_jfif(seg, tags)
+        elif marker == 0xE1 and seg.startswith(b"Exif\x00\x00"):
+            _parse_tiff(seg[6:], tags)
+        elif marker == 0xE1 and seg.startswith(b"http://ns.adobe.com/xap/1.0/\x00"):
+            _parse_xmp(seg[29:], tags)
+        elif marker == 0xE1 and seg.startswith(b"http://ns.adobe.com/xmp/extension/\x00"):
+            raise Unsupported("extended XMP")
+        elif marker == 0xE2 and seg.startswith(b"ICC_PROFILE\x00"):
+            icc_chunks[seg[12]] = seg[14:]
+        elif marker == 0xEB:
+            raise Unsupported("JUMBF / C2PA (APP11)")
+        elif marker == 0xED and seg.startswith(b"Photoshop 3.0\x00"):
+            _parse_photoshop_irb(seg[14:], tags)
+        elif marker == 0xFE:
+            tags["File:Comment"] = seg.rstrip(b"\x00").decode("utf-8", errors="replace")
+        elif 0xE0 <= marker <= 0xEF:
+            raise _uncovered(f"JPEG APP{marker - 0xE0} {seg[:12]!r}")
+        elif 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            bits, height, width, comps = struct.unpack_from(">BHHB", seg, 0)
+            tags["File:ImageWidth"] = width
+            tags["File:ImageHeight"] = height
+            tags["File:BitsPerSample"] = bits
+            tags["File:ColorComponents"] = comps
+
+    if icc_chunks:
+        _parse_icc(b"".join(icc_chunks[k] for k in sorted(icc_chunks)), tags)
+    return pos
+
+
+_PNG_COLOR_TYPES = {0: "Grayscale", 2: "RGB", 3: "Palette", 4: "Grayscale with Alpha", 6: "RGB with Alpha"}
+
+
+def _png_text(keyword, text, tags):
+    if keyword == "XML:com.adobe.xmp":
+        _parse_xmp(text.encode("utf-8"), tags)
+        return
+    if keyword.lower().startswith("raw profile type"):
+        # ImageMagick style: "\n<type>\n<length>\n<hex...>"
+        lines = text.strip().split("\n")
+        blob = bytes.fromhex("".join(lines[2:]))
+        kind = keyword.lower().split()[-1]
+        if kind in ("exif", "app1"):
+            _parse_tiff(blob, tags)
+        elif kind == "xmp":
+            _parse_xmp(blob, tags)
+        elif kind == "iptc":
+            _parse_photoshop_irb(blob, tags)
+        return
+    name = re.sub(r"\s+(.)", lambda m: m.group(1).upper(), _ucfirst(keyword))
+    name = re.sub(r"[^-_a-zA-Z0-9]", "", name)
+    _add(tags, f"PNG:{name}", text)
+
+
+def _parse_png(data, tags):
+    pos = bytes_read = 8
+    while pos + 8 <= len(data):
+        length, ctype = struct.unpack_from(">I4s", data, pos)
+        body = data[pos + 8:pos + 8 + length]
+        if len(body) < length:
+            raise Unsupported("truncated PNG chunk")
+        pos += 12 + length
+        # Image data chunks are skipped by length, only their headers are read
+        bytes_read += 8 if ctype == b"IDAT" else 12 + length
+
+        if ctype == b"IHDR":
+            w, h, depth, color, comp, filt, interlace = struct.unpack_from(">IIBBBBB", body)
+            tags["PNG:ImageWidth"] = w
+            tags["PNG:ImageHeight"] = h
+            tags["PNG:BitDepth"] = depth
+            tags["PNG:ColorType"] = _PNG_COLOR_TYPES.get(color, str(color))
+            tags["PNG:Compression"] = "Deflate/Inflate" if comp == 0 else str(comp)
+            tags["PNG:Filter"] = "Adaptive" if filt == 0 else str(filt)
+            tags["PNG:Interlace"] = "Adam7 Interlace" if interlace else "Noninterlaced"
+        elif ctype == b"tEXt":
+            keyword, _, text = body.partition(b"\x00")
+            _png_text(keyword.decode("latin-1"), text.decode("latin-1"), tags)
+        elif ctype == b"zTXt":
+            keyword, _, rest = body.partition(b"\x00")
+            _png_text(keyword.decode("latin-1"), _inflate(rest[1:]).decode("latin-1"), tags)
+        elif ctype == b"iTXt":
+            keyword, _, rest = body.partition(b"\x00")
+            compressed = rest[0]
+            _lang, _, rest = rest[2:].partition(b"\x00")
+            _translated, _, text = rest.partition(b"\x00")
+            if compressed:
+                text = _inflate(text)
+            _png_text(keyword.decode("latin-1"), text.decode("utf-8", errors="replace"), tags)
+        elif ctype == b"eXIf":
+            _parse_tiff(body, tags)
+        elif ctype == b"iCCP":
+            name, _, rest = body.partition(b"\x00")
+            tags["PNG:ProfileName"] = name.decode("latin-1")
+            _parse_icc(_inflate(rest[1:]), tags)
+        elif ctype == b"sRGB":
+            tags["PNG:SRGBRendering"] = {0: "Perceptual", 1: "Relative Colorimetric", 2: "Saturation",
+                                         3: "Absolute Colorimetric"}.get(body[0], str(body[0]))
+        elif ctype == b"tIME":
+            y, mo, d, hh, mm, ss = struct.unpack_from(">HBBBBB", body)
+            tags["PNG:ModifyDate"] = f"{y:04d}:{mo:02d}:{d:02d} {hh:02d}:{mm:02d}:{ss:02d}"
+        elif ctype == b"pHYs":
+            x, y, unit = struct.unpack_from(">IIB", body)
+            tags["PNG-pHYs:PixelsPerUnitX"] = x
+            tags["PNG-pHYs:PixelsPerUnitY"] = y
+            tags["PNG-pHYs:PixelUnits"] = "meters" if unit == 1 else "Unknown"
+        elif ctype == b"caBX":
+            raise Unsupported("C2PA (caBX chunk)")
+        elif ctype == b"IEND":
+            break
+        elif ctype != b"IDAT":
+            raise _uncovered(f"PNG chunk {ctype!r}")
+    return bytes_read
+
+
+def _parse_webp(data, tags):
+    pos = bytes_read = 12
+    end = min(len(data), 8 + struct.unpack_from("<I", data, 4)[0])
+    while pos + 8 <= end:
+        fourcc, size = struct.unpack_from("<4sI", data, pos)
+        body = data[pos + 8:pos + 8 + size]
+        pos += 8 + size + (size & 1)
+        # Bitstream chunks: only the frame header (dimensions) is read
+        bytes_read += 8 + (min(size, 10) if fourcc in (b"VP8 ", b"VP8L", b"ALPH", b"ANMF") else size)
+
+        if fourcc == b"VP8X":
+            tags["File:FileType"] = "Extended WEBP"
+            tags["RIFF:ImageWidth"] = 1 + int.from_bytes(body[4:7], "little")
+            tags["RIFF:ImageHeight"] = 1 + int.from_bytes(body[7:10], "little")
+        elif fourcc == b"VP8 ":
+            if "RIFF:ImageWidth" not in tags:
+                w, h = struct.unpack_from("<HH", body, 6)
+                tags["RIFF:ImageWidth"] = w & 0x3FFF
+                tags["RIFF:ImageHeight"] = h & 0x3FFF
+        elif fourcc == b"VP8L":
+            # ExifTool marks files with a lossless bitstream in FileType
+            tags["File:FileType"] += " (lossless)"
+            if "RIFF:ImageWidth" not in tags:
+                bits = struct.unpack_from("<I", body, 1)[0]
+                tags["RIFF:ImageWidth"] = (bits & 0x3FFF) + 1
+                tags["RIFF:ImageHeight"] = ((bits >> 14) & 0x3FFF) + 1
+        elif fourcc == b"EXIF":
+            _parse_tiff(body, tags)
+        elif fourcc == b"XMP ":
+            _parse_xmp(body, tags)
+        elif fourcc == b"ICCP":
+            _parse_icc(body, tags)
+        elif fourcc == b"C2PA":
+            raise Unsupported("C2PA (RIFF chunk)")
+        elif fourcc not in (b"ALPH", b"ANIM", b"ANMF"):
+            # Frame/animation headers only hold numbers (reported in the RIFF group)
+            raise _uncovered(f"RIFF chunk {fourcc!r}")
+    return bytes_read
@@ -0,0 +1,106 @@
+import math
+import cv2
+import numpy as np
+import scipy.fft
+
+
+def legacy_fft_energy(gray, mask_size=30):
+    """The original computation (complex float64 fft2 + fftshift + masked mean), kept for parity checks."""
+    mag = 20 * np.log(np.abs(np.fft.fftshift(np.fft.fft2(gray))) + 1e-7)
+    rows, cols = gray.shape
+    crow, ccol = rows // 2, cols // 2
+    mag[crow - mask_size:crow + mask_size, ccol - mask_size:ccol + mask_size] = 0
+    return float(np.mean(mag))
+
+
+def _hermitian_weights(cols):
+    # rfft2 keeps columns 0..cols//2; each column with a mirror at -l stands for two
+    weights = np.full(cols // 2 + 1, 2.0)
+    weights[0] = 1.0
+    if cols % 2 == 0:
+        weights[-1] = 1.0
+    return weights
+
+
+class FFTEngine:
+    """
+    fft_energy for the frequency step: mean of 20*ln|F| over the full 2D spectrum of the
+    gray image, with the (2*mask_size)^2 box around DC (after fftshift) counted as 0.
+    - Real-input FFT (scipy.fft.rfft2) in float32: the other half of the spectrum follows
+      from symmetry, so it is summed with per-column weights instead of being materialised.
+    - The DC box is read in place at frequencies [-m, m) x [-m, m); nothing is shifted.
+    - max_pixels: bigger images are estimated from evenly spread square tiles (fast FFT
+      length, at most max_pixels in total). For a stationary texture E|F|^2 grows with the
+      pixel count, so full mean = tile mean + 10*ln(N / tile pixels); the DC box comes from
+      an INTER_AREA downscale, whose low frequencies scale with the area ratio.
+    Images smaller than the box use the original computation.
+    """
+
+    def __init__(self, max_pixels=None, mask_size=30, workers=1):
+        self.max_pixels = max_pixels
+        self.mask_size = mask_size
+        self.workers = workers
+
+    def energy(self, gray):
+        """Returns (fft_energy, info) for a 2D uint8/float gray image."""
+        rows, cols = gray.shape
+        if rows < 2 * self.mask_size or cols < 2 * self.mask_size:
+            return legacy_fft_energy(gray, self.mask_size), {"mode": "legacy"}
+        if self.max_pixels and rows * cols > self.max_pixels:
+            return self._tiled(gray)
+        logmag = self._log_spectrum(gray)
+        return (self._spectrum_sum(logmag, cols) - self._box_sum(logmag)) / (rows * cols), {"mode": "exact"}
+
+    def _log_spectrum(self, gray):
+        """20*ln(|rfft2(gray)| + 1e-7) as float32, shape (rows, cols//2 + 1)."""
+        spec = scipy.fft.rfft2(gray.astype(np.float32, copy=False), workers=self.workers)
+        logmag = np.abs(spec)
+        del spec
+        logmag += np.float32(1e-7)
+        np.log(logmag, out=logmag)
+        logmag *= np.float32(20.0)
+        return logmag
+
+    def _spectrum_sum(self, logmag, cols):
+        """Sum over the full (two-sided) spectrum."""
+        return float(logmag.sum(axis=0, dtype=np.float64) @ _hermitian_weights(cols))
+
+    def _box_sum(self, logmag):
+        # Box columns l in [0, m) are stored directly; l in [-m, 0) are the mirrors
+        # of columns 1..m at rows -k, i.e. k in (-m, m]
+        m = self.mask_size
+        rows = logmag.shape[0]
+        rows_a = np.r_[rows - m:rows, 0:m]
+        rows_b = np.r_[rows - m + 1:rows, 0:m + 1]
+        return float(logmag[rows_a, :m].sum(dtype=np.float64) + logmag[rows_b, 1:m + 1].sum(dtype=np.float64))
+
+    def _tiled(self, gray):
+        rows, cols = gray.shape
+        pixels = rows * cols
+        side = min(rows, cols, int(math.sqrt(self.max_pixels)))
+        while scipy.fft.next_fast_len(side, real=True) != side:
+            side -= 1
+        side = max(side, 2 * self.mask_size)
+
+        grid_rows = max(1, min(rows // side, int(math.sqrt(self.max_pixels // (side * side) * rows / cols))))
+        grid_cols = max(1, min(cols // side, self.max_pixels // (side * side) // grid_rows))
+        tile_means = []
+        for y in np.linspace(0, rows - side, grid_rows).astype(int):
+            for x in np.linspace(0, cols - side, grid_cols).astype(int):
+                logmag = self._log_spectrum(gray[y:y + side, x:x + side])
+                tile_means.append(self._spectrum_sum(logmag, side) / (side * side))
+        mean_estimate = float(np.mean(tile_means)) + 10.0 * math.log(pixels / (side * side))
+
+        # DC box: low frequencies of an area downscale are the full ones / area ratio
+        # (a ~512 px short side keeps the box far below the downscaled Nyquist)
+        factor = max(1, min(rows, cols) // 512)
+        small = cv2.resize(gray, (cols // factor, rows // factor), interpolation=cv2.INTER_AREA)
+        small_pixels = small.shape[0] * small.shape[1]
+        box_estimate = (self._box_sum(self._log_spectrum(small))
+                        + (2 * self.mask_size) ** 2 * 20.0 * math.log(pixels / small_pixels))
+
+        return mean_estimate - box_estimate / pixels, {
+            "mode": "tiled",
+            "tile_size": side,
+            "tiles": len(tile_means)
+        }
@@ -0,0 +1,106 @@
+import time
+import threading
+import cv2
+import numpy as np
+import pywt
+import forensic_kernels
+
+# skimage.color.rgb2gray luminance weights (used by the structure step)
+RGB2GRAY_WEIGHTS = np.array([0.2125, 0.7154, 0.0721], dtype=np.float32)
+
+
+class ForensicContext:
+    """
+    Per-request image context for ForensicEngine.analyze.
+    Derived representations are computed on first use and shared by every step:
+    - gray_u8 (cv2 RGB2GRAY), gray_float (float32 luminance in [0, 1])
+    - saturation_stats (HSV S mean/std), hsv / lab (float32)
+    - gradients (Sobel ksize=5, float32), dwt_haar
+    Each representation is built once even when steps run on several threads.
+    """
+
+    def __init__(self, pil_image):
+        if pil_image.mode != 'RGB':
+            pil_image = pil_image.convert('RGB')
+        self.pil = pil_image
+        self.rgb = np.asarray(pil_image)
+        self._values = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+        self.build_times = {}
+
+    def _get(self, name, build):
+        value = self._values.get(name)
+        if value is not None:
+            return value
+        with self._guard:
+            lock = self._locks.setdefault(name, threading.Lock())
+        with lock:
+            value = self._values.get(name)
+            if value is None:
+                t0 = time.perf_counter()
+                value = build()
+                self.build_times[name] = time.perf_counter() - t0
+                self._values[name] = value
+        return value
+
+    @property
+    def shape(self):
+        return self.rgb.shape[:2]
+
+    @property
+    def gray_u8(self):
+        return self._get("gray_u8", lambda: cv2.cvtColor(self.rgb, cv2.COLOR_RGB2GRAY))
+
+    @property
+    def gray_float(self):
+        # Same weights as skimage's rgb2gray, in float32 instead of float64
+        def build():
+            weights = RGB2GRAY_WEIGHTS / np.float32(255.0)
+            gray = np.multiply(self.rgb[..., 0], weights[0], dtype=np.float32)
+            gray += np.multiply(self.rgb[..., 1], weights[1], dtype=np.float32)
+            gray += np.multiply(self.rgb[..., 2], weights[2], dtype=np.float32)
+            return gray
+        return self._get("gray_float", build)
+
+    @property
+    def saturation_stats(self):
+        """(mean, std) of HSV saturation, streamed in row chunks (no full-size plane)."""
+        return self._get("saturation_stats", lambda: forensic_kernels.saturation_stats(self.rgb))
+
+    @property
+    def rgb_float(self):
+        return self._get("rgb_float", lambda: self.rgb.astype(np.float32) * np.float32(1.0 / 255.0))
+
+    @property
+    def hsv(self):
+        # H in degrees, S and V in [0, 1]
+        return self._get("hsv", lambda: cv2.cvtColor(self.rgb_float, cv2.COLOR_RGB2HSV))
+
+    @property
+    def lab(self):
+        return self._get("lab", lambda: cv2.cvtColor(self.rgb_float, cv2.COLOR_RGB2Lab))
+
+    @property
+    def gradients(self):
+        """(sobel_x, sobel_y, magnitude) of gray_u8, float32."""
+        def build():
+            gx = cv2.Sobel(self.gray_u8, cv2.CV_32F, 1, 0, ksize=5)
+            gy = cv2.Sobel(self.gray_u8, cv2.CV_32F, 0, 1, ksize=5)
+            return gx, gy, cv2.magnitude(gx, gy)
+        return self._get("gradients", build)
+
+    @property
+    def dwt_haar(self):
+        """pywt.dwt2(gray_u8, 'haar') -> (LL, (LH, HL, HH))."""
+        return self._get("dwt_haar", lambda: pywt.dwt2(self.gray_u8, 'haar'))
+
+    def memory_bytes(self):
+        """Bytes held by the representations built so far."""
+        def nbytes(v):
+            if isinstance(v, np.ndarray):
+                return v.nbytes
+            if isinstance(v, (tuple, list)):
+                return sum(nbytes(x) for x in v)
+            return 0
+        return {name: nbytes(v) for name, v in self._values.items()}
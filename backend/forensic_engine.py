@@ -3,50 +3,134 @@ import cv2
 import numpy as np
 from PIL import Image, ImageChops
 import io
-import pywt
+import time
 from scipy.stats import entropy
-from skimage.color import rgb2gray, rgb2hsv, rgb2lab
-from skimage.feature import canny
+import forensic_kernels
+from forensic_context import ForensicContext
+from fft_engine import FFTEngine
+
+# Value reported for the fields of metrics that were not computed
+SKIPPED = "not evaluated"
 
 class ForensicEngine:
-    def __init__(self):
-        pass
+    # Forensic metrics and what they need; a request computes only the metrics its output
+    # mode requires (plus their dependencies). Sections are merged in this order.
+    # (name, report section or None for top level, fields, method, depends on)
+    METRICS = [
+        ("camera", "camera", ["prnu_status", "noise_level", "cfa_consistency"], "_metric_camera", []),  # Step 2
+        ("fft", "frequency", ["fft_energy", "fft_verdict", "fft_mode"], "_metric_fft", []),              # Step 5
+        ("dwt", "frequency", ["dwt_hh_ratio", "dwt_verdict"], "_metric_dwt", []),                        # Step 5
+        ("saturation", "color", ["sat_mean", "sat_verdict"], "_metric_saturation", []),                  # Step 6
+        ("ela", "color", ["compression_artifact_level", "compression_verdict"], "_metric_ela", []),      # Step 6
+        ("physics", "physical", ["lighting_physics", "shadow_consistency"], "_metric_physics", []),      # Step 7
+        ("edges", "structural", ["edge_density", "integrity"], "_metric_edges", []),                    # Step 9
+        ("aggregate", None, ["forensic_aggregate_score"], "_metric_aggregate", ["camera", "fft", "saturation"])
+    ]
+    # Output mode -> metrics it asks for
+    # "aggregate": only what forensic_aggregate_score (the fusion input) needs
+    # "full": every metric, for the UI's detailed_steps
+    OUTPUTS = {
+        "aggregate": ["aggregate"],
+        "full": [name for name, *_ in METRICS]
+    }
+
+    def __init__(self, num_threads=None, step_workers=None, fft_max_pixels=None, kernels="opencv", detail="full"):
+        # OpenCV thread pool size (set by the CoreGovernor so ML and forensics share cores)
+        self.num_threads = num_threads
+        if num_threads:
+            cv2.setNumThreads(num_threads)
+
+        # Independent metrics run concurrently (OpenCV / SciPy FFT / PyWavelets release the GIL).
+        # One bounded pool shared by all requests; step_workers <= 1 keeps them sequential.
+        self.step_workers = min(step_workers or 1, len(self.METRICS))
+        self.step_executor = None
+        if self.step_workers > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            self.step_executor = ThreadPoolExecutor(max_workers=self.step_workers, thread_name_prefix="forensic")
+
+        # "opencv": uint8/float32 saturation stats and Canny (forensic_kernels)
+        # "skimage": the original float64 rgb2hsv / rgb2gray + canny
+        self.kernels = kernels
+
+        # Real-input float32 FFT for the frequency step; images above fft_max_pixels use the tiled estimate
+        self.fft = FFTEngine(max_pixels=fft_max_pixels)
 
-    def analyze(self, pil_image):
+        # Default output mode when analyze() is not given one
+        self.detail = self.check_detail(detail)
+
+    def check_detail(self, detail):
+        if detail not in self.OUTPUTS:
+            raise ValueError(f"Unknown forensic detail {detail!r} (expected one of {list(self.OUTPUTS)})")
+        return detail
+
+    def plan(self, detail):
+        """Metric names needed for an output mode, dependencies included, in METRICS order."""
+        deps = {name: needs for name, _, _, _, needs in self.METRICS}
+        needed = set()
+        pending = list(self.OUTPUTS[self.check_detail(detail)])
+        while pending:
+            name = pending.pop()
+            if name not in needed:
+                needed.add(name)
+                pending.extend(deps[name])
+        return [name for name, *_ in self.METRICS if name in needed]
+
+    def analyze(self, pil_image, detail=None):
         """
-        Executes Steps 2, 5, 6, 7, 9 of the pipeline.
-        Returns a dictionary of analysis results.
+        Executes Steps 2, 5, 6, 7, 9 of the pipeline, limited to the metrics `detail` needs
+        ("aggregate" or "full", default self.detail).
+        Returns a dictionary of analysis results; fields of skipped metrics are SKIPPED.
         """
+        detail = detail or self.detail
+        planned = self.plan(detail)
         try:
-            if pil_image.mode != 'RGB':
-                pil_image = pil_image.convert('RGB')
-            img_np = np.array(pil_image)
-            
-            # --- Step 2: Camera Pipeline Forensics ---
-            camera_metrics = self._analyze_camera_pipeline(img_np)
-            
-            # --- Step 5: Frequency-Domain Analysis ---
-            freq_metrics = self._analyze_frequency_domain(img_np)
-            
-            # --- Step 6: Color & Compression Analysis ---
-            color_metrics = self._analyze_color_compression(pil_image, img_np)
-            
-            # --- Step 7: Semantic-Physical Rule Validation ---
-            phys_metrics = self._analyze_physical_rules(img_np)
-            
-            # --- Step 9: Structural/Metadata ---
-            struct_metrics = self._analyze_structure(img_np)
-
-            return {
-                "camera": camera_metrics,
-                "frequency": freq_metrics,
-                "color": color_metrics,
-                "physical": phys_metrics,
-                "structural": struct_metrics,
-                "forensic_aggregate_score": self._aggregate_forensic_score(
-                    camera_metrics, freq_metrics, color_metrics
-                )
+            t_start = time.perf_counter()
+            registry = {name: (method, needs) for name, _, _, method, needs in self.METRICS}
+            # Gray, saturation, spectra... are derived once and shared by the metrics
+            ctx = ForensicContext(pil_image)
+
+            def run_metric(name):
+                method, needs = registry[name]
+                t0 = time.perf_counter()
+                result = getattr(self, method)(ctx, **{dep: results[dep] for dep in needs})
+                return result, time.perf_counter() - t0
+
+            # Waves: every metric whose dependencies are done runs (concurrently) in the next wave
+            results, metric_times = {}, {}
+            remaining = list(planned)
+            while remaining:
+                wave = [name for name in remaining if all(dep in results for dep in registry[name][1])]
+                if self.step_executor is not None and len(wave) > 1:
+                    futures = [self.step_executor.submit(run_metric, name) for name in wave]
+                    outcomes = [f.result() for f in futures]
+                else:
+                    outcomes = [run_metric(name) for name in wave]
+                for name, (result, elapsed) in zip(wave, outcomes):
+                    results[name] = result
+                    metric_times[name] = round(elapsed, 4)
+                remaining = [name for name in remaining if name not in results]
+
+            # Deterministic merge: same keys and order whatever ran or finished first
+            report = {}
+            for name, section, fields, _, _ in self.METRICS:
+                values = results.get(name) or dict.fromkeys(fields, SKIPPED)
+                if section is None:
+                    report.update(values)
+                else:
+                    report.setdefault(section, {}).update(values)
+
+            report["metrics"] = {
+                "detail": detail,
+                "computed": planned,
+                "skipped": [name for name, *_ in self.METRICS if name not in results]
+            }
+            report["timing"] = {
+                "steps": {name: metric_times[name] for name in planned},
+                "derived": {name: round(t, 4) for name, t in ctx.build_times.items()},
+                "total": round(time.perf_counter() - t_start, 4),
+                "step_workers": self.step_workers
             }
+            return report
         except Exception as e:
             print(f"ForensicEngine Error: {e}")
             return {}
@@ -76,13 +160,16 @@ class ForensicEngine:
             
         return min(score / max(count, 1), 1.0)
 
+    def _metric_aggregate(self, ctx, camera, fft, saturation):
+        return {"forensic_aggregate_score": self._aggregate_forensic_score(camera, fft, saturation)}
+
     # ----------------------------------------------------
     # 2. Camera Pipeline
     # ----------------------------------------------------
-    def _analyze_camera_pipeline(self, img_np):
+    def _metric_camera(self, ctx):
         """PRNU simulation and CFA check."""
         # PRNU: Check for high-frequency noise typical of sensors vs smooth synthetic
-        gray = cv2.cvtColor(img_np, cv2.COLOR_RGB2GRAY)
+        gray = ctx.gray_u8
         noise = gray - cv2.GaussianBlur(gray, (3,3), 0)
         noise_std = np.std(noise)
         
@@ -105,26 +192,22 @@ class ForensicEngine:
     # ----------------------------------------------------
     # 5. Frequency Domain
     # ----------------------------------------------------
-    def _analyze_frequency_domain(self, img_np):
-        """FFT and DWT."""
+    def _metric_fft(self, ctx):
         # FFT Check
-        gray = cv2.cvtColor(img_np, cv2.COLOR_RGB2GRAY)
-        f = np.fft.fft2(gray)
-        fshift = np.fft.fftshift(f)
-        mag = 20 * np.log(np.abs(fshift) + 1e-7)
-        
-        # Detect Peaks (Grid artifacts)
-        rows, cols = gray.shape
-        crow, ccol = rows//2, cols//2
-        mask_size = 30
-        mag[crow-mask_size:crow+mask_size, ccol-mask_size:ccol+mask_size] = 0
-        fft_energy = np.mean(mag)
+        # Detect Peaks (Grid artifacts): mean log magnitude outside the 60x60 low-frequency box
+        fft_energy, fft_info = self.fft.energy(ctx.gray_u8)
         
         fft_verdict = "Artificial/Regular" if fft_energy > 175 else "Natural" # Adjusted threshold
-        
+
+        return {
+            "fft_energy": float(fft_energy),
+            "fft_verdict": fft_verdict,
+            "fft_mode": fft_info["mode"]
+        }
+
+    def _metric_dwt(self, ctx):
         # DWT Check
-        coeffs = pywt.dwt2(gray, 'haar')
-        LL, (LH, HL, HH) = coeffs
+        LL, (LH, HL, HH) = ctx.dwt_haar
         e_HH = np.sum(HH**2)
         total = np.sum(LL**2) + np.sum(LH**2) + np.sum(HL**2) + e_HH
         hh_ratio = e_HH / (total + 1e-7)
@@ -132,8 +215,6 @@ class ForensicEngine:
         dwt_verdict = "Synthetic Dropoff" if hh_ratio < 0.0002 else "Natural Detail"
 
         return {
-            "fft_energy": float(fft_energy),
-            "fft_verdict": fft_verdict,
             "dwt_hh_ratio": float(hh_ratio),
             "dwt_verdict": dwt_verdict
         }
@@ -141,12 +222,12 @@ class ForensicEngine:
     # ----------------------------------------------------
     # 6. Color & Compression
     # ----------------------------------------------------
-    def _analyze_color_compression(self, pil_img, img_np):
+    def _metric_saturation(self, ctx):
         # HSV Saturation Analysis
-        hsv = rgb2hsv(img_np)
-        sat = hsv[:,:,1]
-        sat_mean = np.mean(sat)
-        sat_std = np.std(sat)
+        if self.kernels == "skimage":
+            sat_mean, sat_std = forensic_kernels.legacy_saturation_stats(ctx.rgb)
+        else:
+            sat_mean, sat_std = ctx.saturation_stats
         
         # AI often produces oversaturated or unnaturally flat saturation
         if sat_std < 0.05:
@@ -155,8 +236,15 @@ class ForensicEngine:
             sat_verdict = "Oversaturated"
         else:
             sat_verdict = "Natural"
-            
+
+        return {
+            "sat_mean": float(sat_mean),
+            "sat_verdict": sat_verdict
+        }
+
+    def _metric_ela(self, ctx):
         # Compression (ELA) - Single Check for Consistency
+        pil_img = ctx.pil
         buffer = io.BytesIO()
         pil_img.save(buffer, 'JPEG', quality=90)
         buffer.seek(0)
@@ -166,8 +254,6 @@ class ForensicEngine:
         max_diff = max([ex[1] for ex in extrema]) / 255.0
         
         return {
-            "sat_mean": float(sat_mean),
-            "sat_verdict": sat_verdict,
             "compression_artifact_level": float(max_diff),
             "compression_verdict": "Anomalous" if max_diff < 0.02 else "Consistent"
         }
@@ -175,13 +261,8 @@ class ForensicEngine:
     # ----------------------------------------------------
     # 7. Physical Rules (Heuristic)
     # ----------------------------------------------------
-    def _analyze_physical_rules(self, img_np):
-        # Shadow/Light Consistency via Gradient layout
-        gray = cv2.cvtColor(img_np, cv2.COLOR_RGB2GRAY)
-        sobelx = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=5)
-        sobely = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=5)
-        mag = np.sqrt(sobelx**2 + sobely**2)
-        
+    def _metric_physics(self, ctx):
+        # Shadow/Light Consistency via Gradient layout (ctx.gradients, not built until the check exists)
         # Check if lighting direction is chaotic (high variance in grad direction)?
         # This is hard to do deterministically without simple heuristics
         # Metric: Gradient Uniformity
@@ -193,11 +274,12 @@ class ForensicEngine:
     # ----------------------------------------------------
     # 9. Structure
     # ----------------------------------------------------
-    def _analyze_structure(self, img_np):
+    def _metric_edges(self, ctx):
         # Edge analysis
-        gray = rgb2gray(img_np)
-        edges = canny(gray, sigma=2.0)
-        density = np.sum(edges) / edges.size
+        if self.kernels == "skimage":
+            density = forensic_kernels.legacy_edge_density(ctx.rgb, sigma=2.0)
+        else:
+            density = forensic_kernels.edge_density(ctx.gray_float, sigma=2.0)
         return {
             "edge_density": float(density),
             "integrity": "High"
@@ -0,0 +1,77 @@
+import math
+import cv2
+import numpy as np
+
+# Canny gradients are scaled into int16 for cv2.Canny (|sobel| of a [0, 1] image stays below 8)
+_GRADIENT_SCALE = 4096.0
+
+
+def saturation_plane(rgb):
+    """HSV saturation (max - min) / max as float32, 0 for black pixels (same as skimage's rgb2hsv S)."""
+    r, g, b = cv2.split(rgb)
+    hi = cv2.max(cv2.max(r, g), b)
+    lo = cv2.min(cv2.min(r, g), b)
+    # Black pixels have hi - lo == 0, so dividing by max(hi, 1) leaves them at 0
+    return cv2.divide(cv2.subtract(hi, lo), cv2.max(hi, 1), dtype=cv2.CV_32F)
+
+
+def saturation_stats(rgb, chunk_rows=256):
+    """
+    (mean, std) of HSV saturation over a uint8 RGB image, streamed in row chunks:
+    only one chunk of float32 saturation exists at a time, moments are combined in float64.
+    """
+    rows = rgb.shape[0]
+    count, total, total_sq = 0, 0.0, 0.0
+    for start in range(0, rows, chunk_rows):
+        sat = saturation_plane(np.ascontiguousarray(rgb[start:start + chunk_rows]))
+        mean, std = cv2.meanStdDev(sat)
+        n = sat.size
+        count += n
+        total += n * mean[0, 0]
+        total_sq += n * (std[0, 0] ** 2 + mean[0, 0] ** 2)
+    mean = total / count
+    return mean, math.sqrt(max(total_sq / count - mean * mean, 0.0))
+
+
+def canny_edges(gray, sigma=2.0, low=0.1, high=0.2):
+    """
+    OpenCV counterpart of skimage.feature.canny(gray, sigma) for a float32 [0, 1] image:
+    Gaussian (truncated at 4 sigma), 3x3 Sobel, L2 magnitude, hysteresis at low/high,
+    1-pixel border cleared. Non-maximum suppression uses OpenCV's direction sectors
+    instead of skimage's interpolation, so single edge pixels can differ.
+    """
+    radius = int(4.0 * sigma + 0.5)
+    smoothed = cv2.GaussianBlur(gray, (2 * radius + 1, 2 * radius + 1), sigma, borderType=cv2.BORDER_REFLECT)
+    dx = cv2.Sobel(smoothed, cv2.CV_32F, 1, 0, ksize=3, scale=_GRADIENT_SCALE, borderType=cv2.BORDER_REFLECT)
+    dx = dx.astype(np.int16)
+    dy = cv2.Sobel(smoothed, cv2.CV_32F, 0, 1, ksize=3, scale=_GRADIENT_SCALE, borderType=cv2.BORDER_REFLECT)
+    dy = dy.astype(np.int16)
+    del smoothed
+    edges = cv2.Canny(dx, dy, low * _GRADIENT_SCALE, high * _GRADIENT_SCALE, L2gradient=True)
+    edges[0, :] = 0
+    edges[-1, :] = 0
+    edges[:, 0] = 0
+    edges[:, -1] = 0
+    return edges
+
+
+def edge_density(gray, sigma=2.0):
+    """Fraction of pixels on a Canny edge."""
+    edges = canny_edges(gray, sigma=sigma)
+    return cv2.countNonZero(edges) / edges.size
+
+
+# ----------------------------------------------------
+# scikit-image float64 versions (the original implementation)
+# ----------------------------------------------------
+def legacy_saturation_stats(rgb):
+    from skimage.color import rgb2hsv
+    sat = rgb2hsv(rgb)[:, :, 1]
+    return float(np.mean(sat)), float(np.std(sat))
+
+
+def legacy_edge_density(rgb, sigma=2.0):
+    from skimage.color import rgb2gray
+    from skimage.feature import canny
+    edges = canny(rgb2gray(rgb), sigma=sigma)
+    return float(np.sum(edges) / edges.size)
@@ -0,0 +1,275 @@
+# import torch # Lazy loaded (see ModelManager)
+import numpy as np
+import hashlib
+import json
+import threading
+import time
+
+# Label substrings that mark a class as "AI" (same rule the pipeline path uses)
+AI_LABEL_KEYWORDS = ['ai', 'fake', 'artificial', 'generated', 'deepfake', 'synthetic', '0']
+
+
+# Image-processor settings that change the produced pixel tensor
+PREPROCESS_CONFIG_KEYS = [
+    "do_convert_rgb", "do_resize", "size", "resample", "do_center_crop", "crop_size", "crop_pct",
+    "do_rescale", "rescale_factor", "do_normalize", "image_mean", "image_std"
+]
+
+
+def preprocessing_fingerprint(processor):
+    """Short hash of everything that affects a processor's output (incl. its class)."""
+    cfg = processor.to_dict()
+    relevant = {k: cfg.get(k) for k in PREPROCESS_CONFIG_KEYS}
+    relevant["processor_class"] = type(processor).__name__
+    blob = json.dumps(relevant, sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:12]
+
+
+# PIL resample codes -> cv2 interpolation (used when upscaling; downscaling uses INTER_AREA)
+_CV2_INTERPOLATION = {0: "INTER_NEAREST", 1: "INTER_LANCZOS4", 2: "INTER_LINEAR", 3: "INTER_CUBIC"}
+
+
+def native_preprocess_plan(processor):
+    """
+    Resize/rescale/normalize parameters for processors that only do a fixed-size
+    resize (ViT/DeiT/BEiT style). Returns None when the processor has to run as-is.
+    """
+    cfg = processor.to_dict()
+    size = cfg.get("size")
+    if not cfg.get("do_resize", True) or cfg.get("do_center_crop") or cfg.get("crop_pct") is not None:
+        return None
+    if not isinstance(size, dict) or "height" not in size or "width" not in size:
+        return None
+
+    normalize = cfg.get("do_normalize", True)
+    return {
+        "size": (int(size["width"]), int(size["height"])),
+        "resample": cfg.get("resample", 2),
+        "rescale": float(cfg.get("rescale_factor", 1 / 255)) if cfg.get("do_rescale", True) else 1.0,
+        "mean": np.asarray(cfg.get("image_mean") if normalize else [0.0, 0.0, 0.0], dtype=np.float32),
+        "std": np.asarray(cfg.get("image_std") if normalize else [1.0, 1.0, 1.0], dtype=np.float32)
+    }
+
+
+def native_preprocess(plan, images):
+    """
+    (N, 3, H, W) float32 batch straight from uint8 HWC arrays (views may be strided slices).
+    cv2 INTER_AREA stands in for PIL's antialiased downscale, so values drift slightly
+    from the processor path.
+    """
+    import cv2
+    w, h = plan["size"]
+    batch = np.empty((len(images), h, w, 3), dtype=np.uint8)
+    upscale = getattr(cv2, _CV2_INTERPOLATION.get(plan["resample"], "INTER_LINEAR"))
+    for i, img in enumerate(images):
+        shrink = img.shape[0] >= h and img.shape[1] >= w
+        batch[i] = cv2.resize(img, (w, h), interpolation=cv2.INTER_AREA if shrink else upscale)
+
+    x = batch.astype(np.float32)
+    x *= plan["rescale"]
+    x -= plan["mean"]
+    x /= plan["std"]
+    return np.ascontiguousarray(x.transpose(0, 3, 1, 2))
+
+
+def is_ai_label(label):
+    label = str(label).lower()
+    return any(x in label for x in AI_LABEL_KEYWORDS)
+
+
+def ai_prob_from_pipeline_output(preds):
+    """Converts one image's pipeline output (top_k list or dict) to an AI probability."""
+    top = preds[0] if isinstance(preds, list) else preds
+    score = top['score']
+    return score if is_ai_label(top['label']) else (1.0 - score)
+
+
+class DirectInferenceEngine:
+    """
+    Tensor-level inference for the detector ensemble (no transformers.pipeline).
+    - Loads AutoModelForImageClassification + image processor per detector.
+    - Preprocesses a batch of views into one contiguous pixel tensor.
+    - Runs forward under torch.inference_mode() and returns full probability vectors.
+    - Resolves which class indices mean "AI" once at load time.
+    - Per-model precision: "fp32", "int8" (dynamic quantization, cached on disk) or "bf16" (autocast).
+    - Execution backend: "torch" or "onnx" (ONNX Runtime CPU, exports cached on disk).
+    - native_preprocess: numpy views are resized/normalised with cv2 instead of the
+      processor when its config allows (see native_preprocess_plan).
+    """
+
+    def __init__(self, precision="fp32", quant_cache_dir=None, backend="torch", intra_threads=1,
+                 native_preprocess=False):
+        self.backend = backend
+        self.native_preprocess = native_preprocess
+        self.native_plans = {}  # name -> plan dict or None
+        self.intra_threads = intra_threads
+        self.sessions = {}      # name -> onnxruntime.InferenceSession (onnx backend)
+        # A single mode for every model or a {name: mode, "default": mode} dict
+        self.precision = precision
+        self.quant_cache_dir = quant_cache_dir
+        self.precisions = {}    # name -> resolved mode
+        self.models = {}
+        self.processors = {}
+        self.ai_masks = {}      # name -> bool array over class indices
+        self.activations = {}   # name -> "softmax" | "sigmoid"
+        self.labels = {}        # name -> list of label strings
+        self.fingerprints = {}  # name -> preprocessing fingerprint
+
+    def load(self, name, precision=None):
+        from transformers import AutoConfig, AutoModelForImageClassification, AutoImageProcessor
+        import quantization
+
+        mode = precision or quantization.resolve_precision(self.precision, name)
+        cache_dir = self.quant_cache_dir or quantization.DEFAULT_CACHE_DIR
+        processor = AutoImageProcessor.from_pretrained(name)
+
+        model = None
+        if self.backend == "onnx":
+            import onnx_backend
+            config = AutoConfig.from_pretrained(name)
+            if mode != "fp32":
+                print(f"{name}: precision '{mode}' is not applied on the onnx backend, running fp32 graph")
+                mode = "fp32"
+            model = onnx_backend.load_classifier_session(
+                name, processor, getattr(config, "_commit_hash", None), intra_threads=self.intra_threads
+            )
+            self.sessions[name] = model
+        elif mode == "int8":
+            revision = getattr(AutoConfig.from_pretrained(name), "_commit_hash", None)
+            model = quantization.load_cached_int8(name, revision, cache_dir)
+            if model is None:
+                print(f"Quantizing {name} to int8 (first run, will be cached)...", flush=True)
+                fp32_model = AutoModelForImageClassification.from_pretrained(name)
+                fp32_model.eval()
+                model = quantization.quantize_int8(fp32_model, name, revision, cache_dir)
+            config = model.config
+        else:
+            model = AutoModelForImageClassification.from_pretrained(name)
+            model.eval()
+            config = model.config
+
+        num_labels = config.num_labels
+        id2label = config.id2label or {}
+        labels = [str(id2label.get(i, id2label.get(str(i), f"LABEL_{i}"))) for i in range(num_labels)]
+
+        # Mirror the pipeline's postprocessing choice
+        if num_labels == 1 or config.problem_type == "multi_label_classification":
+            activation = "sigmoid"
+        else:
+            activation = "softmax"
+
+        self.processors[name] = processor
+        self.models[name] = model
+        self.labels[name] = labels
+        self.ai_masks[name] = np.array([is_ai_label(l) for l in labels], dtype=bool)
+        self.activations[name] = activation
+        self.fingerprints[name] = preprocessing_fingerprint(processor)
+        self.native_plans[name] = native_preprocess_plan(processor)
+        self.precisions[name] = mode
+        return model
+
+    def preprocess_groups(self):
+        """Loaded models grouped by preprocessing fingerprint."""
+        groups = {}
+        for name, fp in self.fingerprints.items():
+            groups.setdefault(fp, []).append(name)
+        return groups
+
+    def preprocess(self, name, images):
+        """Returns one contiguous (N, C, H, W) tensor (numpy float32 on the onnx backend)."""
+        plan = self.native_plans.get(name)
+        if self.native_preprocess and plan is not None and all(isinstance(im, np.ndarray) for im in images):
+            pixel_values = native_preprocess(plan, images)
+            if self.backend == "onnx":
+                return pixel_values
+            import torch
+            return torch.from_numpy(pixel_values)
+
+        if self.backend == "onnx":
+            inputs = self.processors[name](images=images, return_tensors="np")
+            return np.ascontiguousarray(inputs["pixel_values"], dtype=np.float32)
+
+        inputs = self.processors[name](images=images, return_tensors="pt")
+        return inputs["pixel_values"].contiguous()
+
+    def predict_proba(self, name, images=None, pixel_values=None, cache=None):
+        """Returns an (N, num_labels) numpy array of class probabilities."""
+        import torch
+        from quantization import autocast_context
+
+        model = self.models[name]
+        if pixel_values is None:
+            pixel_values = cache.get(name) if cache is not None else self.preprocess(name, images)
+
+        if name in self.sessions:
+            import onnx_backend
+            logits = self.sessions[name].run(None, {"pixel_values": pixel_values})[0].astype(np.float32)
+            if self.activations[name] == "sigmoid":
+                return onnx_backend.sigmoid(logits)
+            return onnx_backend.softmax(logits)
+
+        with torch.inference_mode(), autocast_context(self.precisions.get(name, "fp32")):
+            logits = model(pixel_values=pixel_values.to(model.dtype)).logits.float()
+            if self.activations[name] == "sigmoid":
+                probs = torch.sigmoid(logits)
+            else:
+                probs = torch.softmax(logits, dim=-1)
+        return probs.cpu().numpy()
+
+    def ai_probs_from_proba(self, name, probs):
+        """
+        Vectorised equivalent of ai_prob_from_pipeline_output:
+        take the top class; its score if it is an AI label, otherwise 1 - score.
+        """
+        top_idx = probs.argmax(axis=1)
+        top_score = probs[np.arange(len(probs)), top_idx]
+        top_is_ai = self.ai_masks[name][top_idx]
+        return np.where(top_is_ai, top_score, 1.0 - top_score)
+
+    def predict_ai_probs(self, name, images=None, pixel_values=None, cache=None):
+        probs = self.predict_proba(name, images=images, pixel_values=pixel_values, cache=cache)
+        return self.ai_probs_from_proba(name, probs)
+
+
+class PreprocessCache:
+    """
+    Per-batch pixel tensors shared by models with the same preprocessing fingerprint.
+    Each view is resized/normalised once per group instead of once per model.
+    Safe to share between model worker threads: each group is computed once.
+    """
+
+    def __init__(self, engine, images):
+        self.engine = engine
+        self.images = images
+        self.tensors = {}
+        self.costs = {}
+        self.hits = 0
+        self.misses = 0
+        self.preprocess_time = 0.0
+        self.saved_time = 0.0
+        self._lock = threading.Lock()
+        self._group_locks = {}
+
+    def get(self, name):
+        fp = self.engine.fingerprints[name]
+        with self._lock:
+            group_lock = self._group_locks.setdefault(fp, threading.Lock())
+
+        with group_lock:
+            if fp in self.tensors:
+                # Every hit skips one full preprocessing pass of this group
+                with self._lock:
+                    self.hits += 1
+                    self.saved_time += self.costs[fp]
+                return self.tensors[fp]
+
+            t0 = time.perf_counter()
+            pixel_values = self.engine.preprocess(name, self.images)
+            elapsed = time.perf_counter() - t0
+
+            with self._lock:
+                self.misses += 1
+                self.preprocess_time += elapsed
+                self.costs[fp] = elapsed
+            self.tensors[fp] = pixel_values
+            return pixel_values
@@ -4,6 +4,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from PIL import Image
 from pydantic import BaseModel
 import io
+import asyncio
+import threading
 import time
 import random
 import hashlib
@@ -12,8 +14,13 @@ import numpy as np
 import base64
 from model_manager import ModelManager
 from forensic_engine import ForensicEngine
-from metadata_engine import MetadataEngine
+from metadata_engine import MetadataEngine, EXTRACTION_PROFILES
+from resource_governor import CoreGovernor
+from result_cache import ResultCache, DEFAULT_CACHE_PATH, content_key, pipeline_fingerprint
+from single_flight import SingleFlight
+from quantization import parse_precision_config
 import auth_utils # [NEW] Import Auth Utils
+import os
 
 class EmailRequest(BaseModel):
     email: str
@@ -33,15 +40,87 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Split CPU cores between ML, forensics and ExifTool
+governor = CoreGovernor(
+    total_cores=int(os.environ["CPU_CORES"]) if os.environ.get("CPU_CORES") else None,
+    model_parallelism=int(os.environ["MODEL_PARALLELISM"]) if os.environ.get("MODEL_PARALLELISM") else None
+)
+print(f"Core Governor: {governor.summary()}", flush=True)
+
 # Load Model Manager (Global)
 print("Initializing Model Manager...", flush=True)
-model_manager = ModelManager()
+# Views from concurrent /analyze calls are merged into shared per-model batches
+# ENSEMBLE_EXECUTION=sharded moves the detectors into worker processes
+model_manager = ModelManager(enable_batching=True, max_batch_size=64, max_wait_ms=15, pipeline_batch_size=16,
+                             engine="direct", governor=governor,
+                             execution=os.environ.get("ENSEMBLE_EXECUTION", "in_process"),
+                             num_workers=int(os.environ["ENSEMBLE_WORKERS"]) if os.environ.get("ENSEMBLE_WORKERS") else None,
+                             shard_strategy=os.environ.get("ENSEMBLE_SHARD_STRATEGY", "per_model"),
+                             precision=parse_precision_config(os.environ.get("MODEL_PRECISION")),
+                             backend=os.environ.get("INFERENCE_BACKEND", "torch"),
+                             cascade=os.environ.get("ENSEMBLE_CASCADE", "0") == "1",
+                             cascade_margin=float(os.environ.get("CASCADE_MARGIN", "0")),
+                             patch_mode=os.environ.get("PATCH_MODE", "grid"),
+                             view_mode=os.environ.get("VIEW_MODE", "pil"))
 
 print("Initializing Forensic Engine (v2.0)...", flush=True)
-forensic_engine = ForensicEngine()
+# Forensic steps run concurrently on FORENSIC_STEP_WORKERS threads (default: the governor's forensic share)
+forensic_engine = ForensicEngine(
+    num_threads=governor.forensic_cores,
+    step_workers=int(os.environ["FORENSIC_STEP_WORKERS"]) if os.environ.get("FORENSIC_STEP_WORKERS") else governor.forensic_cores,
+    fft_max_pixels=int(os.environ["FFT_MAX_PIXELS"]) if os.environ.get("FFT_MAX_PIXELS") else None,
+    kernels=os.environ.get("FORENSIC_KERNELS", "opencv"),
+    detail=os.environ.get("FORENSIC_DETAIL", "full")
+)
 print("Initializing Metadata Engine...", flush=True)
-metadata_engine = MetadataEngine()
+# Persistent ExifTool workers (EXIFTOOL_POOL=0 falls back to one process per request)
+metadata_engine = MetadataEngine(
+    max_concurrent=int(os.environ["EXIFTOOL_WORKERS"]) if os.environ.get("EXIFTOOL_WORKERS") else governor.exif_workers,
+    use_pool=os.environ.get("EXIFTOOL_POOL", "1") == "1",
+    call_timeout=float(os.environ.get("EXIFTOOL_TIMEOUT", "30")),
+    fast_path=os.environ.get("METADATA_FAST_PATH", "1") == "1",
+    quick_profile_bytes=int(os.environ.get("METADATA_QUICK_BYTES", str(200 * 1024 * 1024)))
+)
+
+
+# [NEW] Finished reports cached by content hash (RESULT_CACHE=0 disables)
+result_cache = None
+if os.environ.get("RESULT_CACHE", "1") == "1":
+    result_cache = ResultCache(
+        path=os.environ.get("RESULT_CACHE_PATH", DEFAULT_CACHE_PATH),
+        memory_entries=int(os.environ.get("RESULT_CACHE_MEMORY_ENTRIES", "256")),
+        max_bytes=int(float(os.environ.get("RESULT_CACHE_MAX_MB", "512")) * 1024 * 1024),
+        ttl_s=float(os.environ.get("RESULT_CACHE_TTL_HOURS", "168")) * 3600
+    )
 
+# [NEW] fast_verdict mode (per request via ?fast_verdict=, default from FAST_VERDICT)
+FAST_VERDICT_DEFAULT = os.environ.get("FAST_VERDICT", "0") == "1"
+fast_verdict_stats = {"requests": 0, "short_circuited": 0}
+fast_verdict_lock = threading.Lock()
+
+# In-progress /analyze runs by (content key, pipeline version)
+analysis_flights = SingleFlight()
+
+# Fusion thresholds used by /analyze (part of the pipeline version)
+FUSION_THRESHOLDS = {
+    "patch_ai_count": 5,         # > N AI patches with a conflict -> localized manipulation
+    "forensic_suspicious": 0.5,  # mild artifacts
+    "forensic_strong_ai": 0.8,   # clear artificial patterns (grids, 0 noise)
+    "ml_trust": 95.0             # ML confidence that survives a clean forensic pass
+}
+# Bump when the verdict logic changes in a way the settings below do not capture
+PIPELINE_REVISION = 1
+
+def pipeline_version():
+    """Fingerprint of everything that shapes a report; cached reports only match the same version."""
+    return pipeline_fingerprint({
+        "revision": PIPELINE_REVISION,
+        "thresholds": FUSION_THRESHOLDS,
+        "models": model_manager.pipeline_config(),
+        "forensic": {"fft_max_pixels": forensic_engine.fft.max_pixels, "kernels": forensic_engine.kernels},
+        "signatures": metadata_engine.signatures.stats()["version"],
+        "metadata": {"fast_path": metadata_engine.fast_path, "quick_profile_bytes": metadata_engine.quick_profile_bytes}
+    })
 
 
 @app.get("/")
@@ -54,6 +133,47 @@ async def root():
         "total_models": len(model_manager.model_names)
     }
 
+@app.get("/metrics")
+async def metrics():
+    return {
+        "model_manager": model_manager.get_runtime_stats(),
+        "metadata": metadata_engine.get_runtime_stats(),
+        "result_cache": result_cache.stats() if result_cache is not None else {"enabled": False},
+        "single_flight": analysis_flights.stats(),
+        "fast_verdict": {
+            "default": FAST_VERDICT_DEFAULT,
+            **fast_verdict_stats,
+            "short_circuit_rate": round(fast_verdict_stats["short_circuited"] / fast_verdict_stats["requests"], 4)
+            if fast_verdict_stats["requests"] else None
+        }
+    }
+
+@app.get("/admin/cache")
+async def cache_stats():
+    if result_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, "current_version": pipeline_version(), **result_cache.stats()}
+
+@app.post("/admin/cache/invalidate")
+async def invalidate_cache(version: str = None, stale_only: bool = False):
+    # version=<v>: drop that pipeline version; stale_only: drop every version but the current one; neither: drop all
+    if result_cache is None:
+        raise HTTPException(status_code=400, detail="Result cache disabled")
+    if version:
+        removed = result_cache.invalidate(version=version)
+    elif stale_only:
+        removed = result_cache.invalidate(keep_version=pipeline_version())
+    else:
+        removed = result_cache.invalidate()
+    return {"removed": removed, **result_cache.stats()}
+
+@app.post("/admin/signatures/reload")
+async def reload_signatures():
+    # signatures.json is also picked up automatically when its mtime changes
+    if not metadata_engine.signatures.reload():
+        raise HTTPException(status_code=400, detail=f"Signature file invalid: {metadata_engine.signatures.last_error}")
+    return metadata_engine.signatures.stats()
+
 @app.post("/auth/request-otp")
 async def request_otp(data: EmailRequest):
     code = auth_utils.generate_otp(data.email)
@@ -72,24 +192,22 @@ async def verify_otp(data: VerifyRequest):
         raise HTTPException(status_code=400, detail="Invalid or expired OTP")
 
 def extract_frames_from_video(video_bytes, num_frames=5, file_ext=".mp4"):
-    import tempfile
-    import os
+    from memory_file import memory_path
     
     # Ensure extension starts with dot
     if not file_ext.startswith("."):
         file_ext = "." + file_ext
         
-    with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as tfile:
-        tfile.write(video_bytes)
-        temp_filename = tfile.name
-    
+    # Decoded straight from memory (memfd on Linux), no temp copy on disk
+    with memory_path(video_bytes, suffix=file_ext) as video_path:
+        return _read_video_frames(video_path, num_frames)
+
+def _read_video_frames(video_path, num_frames):
     # [FIX] Add explicit backend preference if needed, but default is usually best.
     # We suppress log/warnings by just handling the read loop carefully.
-    cap = cv2.VideoCapture(temp_filename)
+    cap = cv2.VideoCapture(video_path)
     
     if not cap.isOpened():
-        try: os.unlink(temp_filename) 
-        except: pass
         return None
 
     total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
@@ -119,24 +237,189 @@ def extract_frames_from_video(video_bytes, num_frames=5, file_ext=".mp4"):
              count += 1
                 
     cap.release()
-    try:
-        os.unlink(temp_filename)
-    except:
-        pass
         
     if not frames: return None
     return frames
 
+def analysis_key(sha256, metadata_profile=None, fast_verdict=False, forensic_detail="full"):
+    """Result-cache key: content hash plus the request options that change the report."""
+    key = f"{sha256}:{metadata_profile}" if metadata_profile else sha256
+    if forensic_detail != "full":
+        key = f"{key}:{forensic_detail}"
+    return f"{key}:fast" if fast_verdict else key
+
+def _check_forensic_detail(forensic_detail):
+    """Request value (or the FORENSIC_DETAIL default) -> validated forensic output mode."""
+    if forensic_detail is None:
+        return forensic_engine.detail
+    if forensic_detail not in ForensicEngine.OUTPUTS:
+        raise HTTPException(status_code=400, detail=f"forensic_detail must be one of {list(ForensicEngine.OUTPUTS)}")
+    return forensic_detail
+
+def _cacheable(report):
+    """
+    Only complete reports are cached. An ExifTool timeout/restart, a forensic exception or a
+    model that is still loading (or restarting/erroring in a shard worker) is transient;
+    caching its report would pin the degraded verdict for the whole TTL.
+    """
+    if "error" in report:
+        return False
+    metadata_report = report.get("metadata_report")
+    if not metadata_report or "error" in metadata_report:
+        return False
+    # Short circuits never run ML or forensics
+    if report.get("short_circuit"):
+        return True
+    # Every detector must have contributed (cascade skips are decided, not degraded)
+    if any(m.get("status") not in ("Active", "Skipped") for m in report.get("detailedModels") or []):
+        return False
+    if report.get("modelConsensus", {}).get("totalModels", 0) < len(model_manager.model_names):
+        return False
+    # ForensicEngine returns {} on failure (forensic_metrics is then missing)
+    return bool(report.get("forensic_metrics"))
+
+def _metadata_override(metadata_report):
+    """(verdict, confidence, explanation) when metadata alone decides the verdict, else None."""
+    # If metadata explicitly names an AI tool, we trust it 100% (HIGHEST PRIORITY)
+    # Safety check: ensure metadata_report is valid (not an error dict)
+    if metadata_report and "ai_indicators" in metadata_report:
+        if metadata_report['ai_indicators']['ai_software_signature'] == 'Yes':
+            tool_name = metadata_report['software_trace'].get('ai_tool_name', 'Unknown AI Tool')
+            return "AI Generated", 99.0, f"Metadata Override: {tool_name} detected"
+
+    conclusion = (metadata_report or {}).get('metadata_based_conclusion', {})
+    # If NO AI signature is found, but Make and Model are present, flag as 99% Real
+    if conclusion.get('has_make_model') == "Yes":
+        return "Real / Authentic", 99.0, "Metadata Override: Camera Make and Model detected in raw metadata"
+    # If no AI text is found, but perfect camera specs are present, we trust it as Real.
+    if conclusion.get('metadata_reliability') == "Very High":
+        return "Real / Authentic", 99.0, "Metadata Override: High-quality camera data verified"
+    return None
+
+def _metadata_only_response(override, metadata_report):
+    """Report for a fast_verdict short circuit: ML and forensic sections were never run."""
+    final_verdict, final_conf, fusion_explanation = override
+    skipped = "not evaluated"
+    return {
+        "classification": final_verdict,
+        "prediction": final_verdict, # Legacy
+        "ai_probability": round(final_conf, 1),
+        "confidence": round(final_conf, 2), # Legacy
+        "confidence_level": "High",
+        # Sections that never ran are null (the UI hides or guards them)
+        "detailed_steps": {step: None for step in (
+            "step1_ensemble", "step2_camera", "step3_multiscale", "step4_patches", "step5_frequency",
+            "step6_color", "step7_physics", "step8_clip", "step9_structure")},
+        "patch_consistency": skipped,
+        "conflict_detected": skipped,
+        "suspected_regions": skipped,
+        "formatted_report": f"""
+- Global AI Probability: {round(final_conf, 1)}%
+- Decided by metadata (ML and forensic analysis not evaluated)
+- Final Classification: {final_verdict}
+        """.strip(),
+        "modelConsensus": {"totalModels": 0, "aiVotes": 0, "realVotes": 0, "agreement": 0},
+        "detailedModels": [],
+        "mlAnalysis": {"transferLearningScore": skipped, "featureBasedScore": skipped, "confidence": skipped},
+        "video_analysis": None,
+        "metadata_report": metadata_report,
+        "score_breakdown": {
+            "ml_confidence": skipped,
+            "forensic_confidence": skipped,
+            "fusion_reason": fusion_explanation
+        },
+        "short_circuit": True,
+        "timing": {"ml": None},
+        "processing_time": "Done"
+    }
+
+@app.api_route("/analysis/{sha256}", methods=["GET", "HEAD"])
+async def get_analysis(sha256: str, metadata_profile: str = None, fast_verdict: bool = None,
+                       forensic_detail: str = None):
+    # [NEW] Hash-first protocol: clients ask for a stored report before uploading the bytes.
+    # 404 means "not analyzed under the current pipeline version" -> POST /analyze
+    sha256 = sha256.lower()
+    if len(sha256) != 64 or any(c not in "0123456789abcdef" for c in sha256):
+        raise HTTPException(status_code=400, detail="Expected a hex SHA-256 digest")
+    if result_cache is None:
+        raise HTTPException(status_code=404, detail="Result cache disabled")
+    cache_key = analysis_key(sha256, metadata_profile, FAST_VERDICT_DEFAULT if fast_verdict is None else fast_verdict,
+                             _check_forensic_detail(forensic_detail))
+    version = pipeline_version()
+    # Counted as a probe: a miss here is normally followed by the upload's own lookup
+    cached = await asyncio.to_thread(result_cache.get, cache_key, version, True)
+    if cached is None:
+        raise HTTPException(status_code=404, detail="No stored analysis for this content")
+    cached["cache"] = {"hit": True, "sha256": sha256, "version": version}
+    return cached
+
 @app.post("/analyze")
-async def analyze_content(file: UploadFile = File(...)):
+async def analyze_content(file: UploadFile = File(...), metadata_profile: str = None, fast_verdict: bool = None,
+                          forensic_detail: str = None):
     # ----------------------------------------------------
     # Phase 0: Preparation
     # ----------------------------------------------------
+    # metadata_profile: full | quick | signatures-only (default: by file size, see METADATA_QUICK_BYTES)
+    if metadata_profile and metadata_profile not in EXTRACTION_PROFILES:
+        raise HTTPException(status_code=400, detail=f"metadata_profile must be one of {list(EXTRACTION_PROFILES)}")
+    # fast_verdict: metadata first, skip ML/forensics when it decides (default: FAST_VERDICT)
+    if fast_verdict is None:
+        fast_verdict = FAST_VERDICT_DEFAULT
+    # forensic_detail: aggregate (only the fusion score's metrics) | full (detailed_steps) (default: FORENSIC_DETAIL)
+    forensic_detail = _check_forensic_detail(forensic_detail)
     content = await file.read()
+
+    # [NEW] Same bytes + same pipeline version -> stored report, no engine runs
+    sha256 = content_key(content)
+    cache_key = analysis_key(sha256, metadata_profile, fast_verdict, forensic_detail)
+    version = pipeline_version()
+    if result_cache is not None:
+        cached = await asyncio.to_thread(result_cache.get, cache_key, version)
+        if cached is not None:
+            cached["cache"] = {"hit": True, "sha256": sha256, "version": version}
+            return cached
+
+    # [NEW] Concurrent uploads of the same bytes share one run (single flight)
+    async def compute():
+        report = await _run_analysis(content, file.content_type, file.filename, metadata_profile, fast_verdict,
+                                     forensic_detail)
+        if result_cache is not None:
+            if _cacheable(report):
+                await asyncio.to_thread(result_cache.put, cache_key, version, report)
+            else:
+                print(f"Result cache: not storing {sha256[:12]} (an engine failed or returned nothing)")
+        return report
+
+    report, shared = await analysis_flights.run((cache_key, version), compute)
+    report = dict(report)  # every waiter gets its own top-level copy
+    report["cache"] = {"hit": False, "shared": shared, "sha256": sha256, "version": version}
+    return report
+
+
+async def _run_analysis(content, content_type, filename, metadata_profile=None, fast_verdict=False,
+                        forensic_detail="full"):
     file_hash = hashlib.md5(content).hexdigest()
     random.seed(int(file_hash, 16))
     
-    is_video = file.content_type.startswith("video")
+    is_video = content_type.startswith("video")
+    file_ext = os.path.splitext(filename or "")[1].lower()
+
+    def run_metadata():
+        return metadata_engine.analyze(content, is_video=is_video, file_ext=file_ext or None,
+                                       mime_type=content_type, profile=metadata_profile)
+
+    # [NEW] fast_verdict: the cheap metadata stage runs first; an override skips ML and forensics
+    metadata_first = None
+    if fast_verdict:
+        metadata_first = await asyncio.to_thread(run_metadata)
+        override = _metadata_override(metadata_first)
+        with fast_verdict_lock:
+            fast_verdict_stats["requests"] += 1
+            if override is not None:
+                fast_verdict_stats["short_circuited"] += 1
+        if override is not None:
+            print(f"Fast verdict: {override[2]} (ML and forensics skipped)")
+            return _metadata_only_response(override, metadata_first)
     
     video_analysis = []
     
@@ -144,10 +427,7 @@ async def analyze_content(file: UploadFile = File(...)):
     # Phase 1: Image vs Video Logic
     # ----------------------------------------------------
     if is_video:
-        import os
-        ext = os.path.splitext(file.filename)[1]
-        if not ext: ext = ".mp4"
-        pil_images = extract_frames_from_video(content, num_frames=5, file_ext=ext)
+        pil_images = extract_frames_from_video(content, num_frames=5, file_ext=file_ext or ".mp4")
         if not pil_images:
              raise HTTPException(status_code=400, detail="Could not extract frames from video")
         
@@ -182,18 +462,21 @@ async def analyze_content(file: UploadFile = File(...)):
         # ----------------------------------------------------
         # Phase 2: Execution (Deep Analysis on Main Image)
         # ----------------------------------------------------
-        import asyncio
         print("Running Analysis Engines Concurrently (ML, Forensic, Metadata)...")
         
         # Run in parallel threads to avoid blocking event loop
         # ML and Forensic are CPU heavy, Metadata is I/O heavy (subprocess)
         
         task_ml = asyncio.to_thread(model_manager.predict_full_suite, pil_image)
-        task_forensic = asyncio.to_thread(forensic_engine.analyze, pil_image)
-        task_metadata = asyncio.to_thread(metadata_engine.analyze, content, is_video=is_video)
-        
-        # Gather results
-        ml_report, forensic_report, metadata_report = await asyncio.gather(task_ml, task_forensic, task_metadata)
+        task_forensic = asyncio.to_thread(forensic_engine.analyze, pil_image, forensic_detail)
+        if metadata_first is not None:
+            # fast_verdict already ran metadata and found no override
+            ml_report, forensic_report = await asyncio.gather(task_ml, task_forensic)
+            metadata_report = metadata_first
+        else:
+            task_metadata = asyncio.to_thread(run_metadata)
+            # Gather results
+            ml_report, forensic_report, metadata_report = await asyncio.gather(task_ml, task_forensic, task_metadata)
         
         print("All engines finished processing.")
 
@@ -228,42 +511,14 @@ async def analyze_content(file: UploadFile = File(...)):
         # 3. Final Fusion (Balanced Decision Matrix)
         # ------------------------------------------
         
-        # [NEW] Check for Metadata Override FIRST
-        # If metadata explicitly names an AI tool, we trust it 100%
-        has_ai_signature = False
+        # [NEW] Check for Metadata Override FIRST (AI signature > Make/Model > Very High reliability)
         fusion_explanation = "Standard Analysis"
-
-        # Safety check: ensure metadata_report is valid (not an error dict)
-        if metadata_report and "ai_indicators" in metadata_report:
-            if metadata_report['ai_indicators']['ai_software_signature'] == 'Yes':
-                has_ai_signature = True
-                tool_name = metadata_report['software_trace'].get('ai_tool_name', 'Unknown AI Tool')
-                fusion_explanation = f"Metadata Override: {tool_name} detected"
-        
-        
-        # [NEW] Check for Metadata Override (AI Signatures) - HIGHEST PRIORITY
-        # If metadata explicitly names an AI tool, we trust it 100%
-        if has_ai_signature:
-             final_verdict = "AI Generated"
-             final_conf = 99.0
-             # fusion_explanation already set
-        
-        # [NEW] Check for Make/Model in Raw Metadata (User Request) - SECOND PRIORITY
-        # If NO AI signature is found, but Make and Model are present, flag as 99% Real
-        elif metadata_report and metadata_report.get('metadata_based_conclusion', {}).get('has_make_model') == "Yes":
-             final_verdict = "Real / Authentic"
-             final_conf = 99.0
-             fusion_explanation = "Metadata Override: Camera Make and Model detected in raw metadata"
-
-        # [NEW] Check for High-Quality Real Metadata
-        # If no AI text is found, but perfect camera specs are present, we trust it as Real.
-        elif metadata_report.get('metadata_based_conclusion', {}).get('metadata_reliability') == "Very High":
-             final_verdict = "Real / Authentic"
-             final_conf = 99.0
-             fusion_explanation = "Metadata Override: High-quality camera data verified"
+        override = _metadata_override(metadata_report)
+        if override is not None:
+             final_verdict, final_conf, fusion_explanation = override
              
         # [REFINED] Check for Global vs Local Conflict (Patch Threshold)
-        elif ml_report.get('patches', {}).get('conflict_detected') == "Yes" and ml_report.get('patches', {}).get('ai_patch_count', 0) > 5:
+        elif ml_report.get('patches', {}).get('conflict_detected') == "Yes" and ml_report.get('patches', {}).get('ai_patch_count', 0) > FUSION_THRESHOLDS["patch_ai_count"]:
              # Significant localized manipulation detected (> 5 AI patches)
              final_verdict = "AI Generated"
              final_conf = 85.0
@@ -288,8 +543,8 @@ async def analyze_content(file: UploadFile = File(...)):
             # ml_is_ai is already calculated above (including specific vote overrides)
             
             # Forensic thresholds
-            forensic_is_suspicious = forensic_score > 0.5  # Mild artifacts
-            forensic_is_strong_ai = forensic_score > 0.8  # Clear artificial patterns (grids, 0 noise)
+            forensic_is_suspicious = forensic_score > FUSION_THRESHOLDS["forensic_suspicious"]  # Mild artifacts
+            forensic_is_strong_ai = forensic_score > FUSION_THRESHOLDS["forensic_strong_ai"]  # Clear artificial patterns (grids, 0 noise)
     
             if ml_is_ai and forensic_is_suspicious:
                 # AGREEMENT: Both say AI (Strongest Case)
@@ -307,7 +562,7 @@ async def analyze_content(file: UploadFile = File(...)):
                  # CONFLICT: ML says AI, but Camera/Physics look Real.
                  # Logic: ML might be overfitting. 
                  fusion_explanation = "Conflict: ML detected AI but Forensics passed (Weak Signal)"
-                 if ml_conf > 95.0:
+                 if ml_conf > FUSION_THRESHOLDS["ml_trust"]:
                      # ML is super confident, trust it but penalize
                      final_verdict = "AI Generated"
                      final_conf = ml_conf - 10 
@@ -393,6 +648,12 @@ async def analyze_content(file: UploadFile = File(...)):
                 "forensic_confidence": round(forensic_score * 100, 1),
                 "fusion_reason": fusion_explanation
             },
+            # [NEW] Which forensic metrics ran for this forensic_detail and which were skipped
+            "forensic_metrics": forensic_report.get('metrics'),
+            "timing": {
+                "ml": ml_report.get('timing'),
+                "forensic": forensic_report.get('timing')
+            },
             "processing_time": "Done"
         }
     except Exception as e:
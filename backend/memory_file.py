@@ -0,0 +1,45 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+
+def memfd_supported():
+    return hasattr(os, "memfd_create") and os.path.isdir(f"/proc/{os.getpid()}/fd")
+
+
+def _write_all(fd, data):
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+@contextmanager
+def memory_path(data, suffix=""):
+    """
+    Yields a path whose contents are `data`, without writing to disk.
+    - Linux: an anonymous memfd, exposed as /proc/<pid>/fd/<n>. The path stays valid
+      for child processes (ExifTool) and for cv2/FFmpeg while the context is open.
+    - Elsewhere: a NamedTemporaryFile with the real suffix (removed on exit).
+    """
+    if memfd_supported():
+        # The memfd name only shows up in /proc listings; it keeps the real extension for debugging
+        fd = os.memfd_create(f"upload{suffix}", getattr(os, "MFD_CLOEXEC", 0))
+        try:
+            _write_all(fd, data)
+            os.lseek(fd, 0, os.SEEK_SET)
+            yield f"/proc/{os.getpid()}/fd/{fd}"
+        finally:
+            os.close(fd)
+        return
+
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as t:
+        t.write(data)
+        path = t.name
+    try:
+        yield path
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
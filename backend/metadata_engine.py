@@ -5,6 +5,31 @@ import json
 import datetime
 import re
 import shutil
+import threading
+import time
+from tag_index import TagIndex
+
+# ExifTool arguments per extraction profile (always combined with -json -G)
+# full: every tag incl. unknown ones (original behaviour)
+# quick: -fast2 (no scan past the media data) + the tags the report and verdict use
+# signatures-only: -fast2 + only the fields AI/editing signatures are found in
+SIGNATURE_TAGS = [
+    "Software", "CreatorTool", "HistorySoftwareAgent", "ProcessingSoftware", "Comment", "UserComment",
+    "ImageDescription", "Artist", "Make", "Model", "Encoder", "CompressorName", "HandlerDescription",
+    "XMP:all", "JUMBF:all", "PNG:all"
+]
+QUICK_TAGS = SIGNATURE_TAGS + [
+    "FileType", "MIMEType", "FileSize", "ImageWidth", "ImageHeight", "SourceImageWidth", "SourceImageHeight",
+    "ColorSpace", "ProfileDescription", "BitDepth", "BitsPerSample", "LensModel", "LensInfo", "LensID",
+    "DateTimeOriginal", "CreateDate", "CreationDate", "GPSPosition", "GPSLatitude", "ExposureTime", "ISO",
+    "FNumber", "FocalLength", "ApplicationRecordVersion", "MajorBrand"
+]
+EXTRACTION_PROFILES = {
+    "full": ["-a", "-u", "-g1"],
+    "quick": ["-fast2", "-a", "-g1"] + [f"-{t}" for t in QUICK_TAGS],
+    "signatures-only": ["-fast2", "-a", "-g1"] + [f"-{t}" for t in SIGNATURE_TAGS]
+}
+
 
 class MetadataEngine:
     """
@@ -13,31 +38,40 @@ class MetadataEngine:
     - Maps ExifTool output to unified report structure.
     - Scans metadata values for AI signatures.
     """
-    def __init__(self):
-        self.ai_signatures = [
-            "Stable Diffusion", "Midjourney", "DALL-E", "Imagine", "Leonard.ai",
-            "Adobe Firefly", "Bing Image Creator", "Gencraft", "DreamStudio",
-            "Photoshop AI", "Generative Fill", "AI-Generated",
-            "sd-webui", "ComfyUI", "Automatic1111", "SwarmUI", "Fooocus",
-            "NovelAI", "TrinArt", "Waifu Diffusion", "Wonder", "Starryai",
-            "civitai", "huggingface", "SDXL",
-            "c2pa", "content credentials", "provenance", "synthesized",
-            "diffusion", "latent", "neural network", "generative ai",
-            # Specific Models including Text Models often in metadata
-            "gpt", "openai", "chatgpt", "gemini", "claude", "llama", "mistral",
-            # User Requested (Legacy/Other)
-            "picasa"
-        ]
-        
-        self.editing_signatures = [
-            "Photoshop", "GIMP", "Lightroom", "Canva", "PicsArt", "Snapseed",
-            "Affinity Photo", "Paint.NET", "Krita", "After Effects", "Premiere",
-            "Ezgif", "ImageMagick", "Lavf", "GoPro"
-        ]
+    def __init__(self, max_concurrent=None, use_pool=True, call_timeout=30, fast_path=True,
+                 signatures_path=None, quick_profile_bytes=200 * 1024 * 1024):
+        # Caps parallel ExifTool processes (set by the CoreGovernor)
+        self._exif_slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent else None
+        self.max_concurrent = max_concurrent
+        self.use_pool = use_pool
+        self.call_timeout = call_timeout
+        self._pool = None
+
+        # In-process JPEG/PNG/WebP parser; ExifTool only handles what it does not cover
+        self.fast_path = fast_path
+        self._stats_lock = threading.Lock()
+        self.extractions = {"native": 0, "exiftool": 0}
+        self.fallback_reasons = {}
+
+        # Uploads at least this large use the "quick" profile unless the request picks one
+        self.quick_profile_bytes = quick_profile_bytes
+        self.profile_stats = {}  # profile -> {"count", "time_s", "bytes_read", "bytes_measured"}
+
+        # AI / editing signatures: versioned signatures.json, compiled into one automaton, hot-reloaded
+        from signature_matcher import SignatureDatabase, DEFAULT_SIGNATURES_PATH
+        self.signatures = SignatureDatabase(signatures_path or DEFAULT_SIGNATURES_PATH)
 
         # Locate ExifTool
         self.exiftool_path = self._find_exiftool()
 
+    @property
+    def ai_signatures(self):
+        return self.signatures.names("ai")
+
+    @property
+    def editing_signatures(self):
+        return self.signatures.names("editing")
+
     def _find_exiftool(self):
         # Look for the user-provided folder in project root (assuming we are in backend/)
         # Project structure:
@@ -60,23 +94,124 @@ class MetadataEngine:
         print("WARNING: ExifTool not found in expected paths.")
         return None
 
-    def analyze(self, file_path_or_bytes, is_video=False):
-        temp_file = None
-        file_path = None
-        
+    def _get_pool(self):
+        # Persistent `-stay_open` workers, one per concurrency slot
+        if self._pool is None:
+            from exiftool_pool import ExifToolPool
+            self._pool = ExifToolPool(self.exiftool_path, size=self.max_concurrent or 2, timeout=self.call_timeout)
+        return self._pool
+
+    def _run_exiftool(self, args, input_bytes=None):
+        """
+        Returns (stdout, error message or None, bytes read) for `exiftool <args>`.
+        input_bytes: file content streamed to ExifTool's stdin (args must end with "-").
+        Bytes read come from the pool worker's /proc/<pid>/io (None for one-shot processes).
+        """
+        if self.use_pool:
+            try:
+                stdout, stderr, bytes_read = self._get_pool().run(["-charset", "filename=utf8"] + args)
+            except (OSError, RuntimeError) as e:  # incl. TimeoutError, failed worker start
+                return "", str(e), None
+            return stdout, (stderr or "no output") if not stdout.strip() else None, bytes_read
+
+        cmd = [self.exiftool_path] + args
+        if self._exif_slots is not None:
+            with self._exif_slots:
+                result = subprocess.run(cmd, input=input_bytes, capture_output=True, timeout=self.call_timeout)
+        else:
+            result = subprocess.run(cmd, input=input_bytes, capture_output=True, timeout=self.call_timeout)
+        stdout = result.stdout.decode('utf-8', errors='ignore')
+        if result.returncode != 0 and not stdout:
+            return "", result.stderr.decode('utf-8', errors='ignore'), None
+        return stdout, None, None
+
+    def pool_stats(self):
+        return self._pool.stats() if self._pool is not None else {"enabled": self.use_pool, "started": False}
+
+    def get_runtime_stats(self):
+        with self._stats_lock:
+            return {
+                "exiftool_pool": self.pool_stats(),
+                "signatures": self.signatures.stats(),
+                "fast_path": self.fast_path,
+                "extractions": dict(self.extractions),
+                "fallback_reasons": dict(self.fallback_reasons),
+                "profiles": {
+                    name: {
+                        "count": st["count"],
+                        "avg_time_s": round(st["time_s"] / st["count"], 4),
+                        "avg_bytes_read": int(st["bytes_read"] / st["bytes_measured"]) if st["bytes_measured"] else None
+                    }
+                    for name, st in self.profile_stats.items()
+                }
+            }
+
+    def select_profile(self, requested, size):
+        if requested:
+            if requested not in EXTRACTION_PROFILES:
+                raise ValueError(f"Unknown metadata profile '{requested}' (use one of {list(EXTRACTION_PROFILES)})")
+            return requested
+        return "quick" if size >= self.quick_profile_bytes else "full"
+
+    def _record_extraction(self, report, profile, extractor, elapsed, bytes_read):
+        report['extraction'] = {
+            "profile": profile,
+            "extractor": extractor,
+            "time_s": round(elapsed, 4),
+            "bytes_read": bytes_read
+        }
+        with self._stats_lock:
+            st = self.profile_stats.setdefault(profile, {"count": 0, "time_s": 0.0, "bytes_read": 0, "bytes_measured": 0})
+            st["count"] += 1
+            st["time_s"] += elapsed
+            if bytes_read is not None:
+                st["bytes_read"] += bytes_read
+                st["bytes_measured"] += 1
+        return report
+
+    def _count(self, extractor, reason=None):
+        with self._stats_lock:
+            self.extractions[extractor] += 1
+            if reason:
+                self.fallback_reasons[reason] = self.fallback_reasons.get(reason, 0) + 1
+
+    def _fast_extract(self, content, stats=None):
+        """Flattened Group:Tag dict from the native parser, or (None, reason) to use ExifTool."""
+        import fast_metadata
         try:
-            # Handle bytes/paths
-            if isinstance(file_path_or_bytes, bytes):
-                import tempfile
-                suffix = ".bin" # ExifTool handles binary, but extension helps if known
-                with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as t:
-                    t.write(file_path_or_bytes)
-                    temp_file = t.name
-                file_path = temp_file
-            else:
-                file_path = file_path_or_bytes
-                if not os.path.exists(file_path):
-                     return {"error": "File not found"}
+            return fast_metadata.parse(content, stats), None
+        except fast_metadata.Unsupported as e:
+            return None, str(e).split(":")[0]
+
+    def analyze(self, file_path_or_bytes, is_video=False, file_ext=None, mime_type=None, profile=None):
+        """
+        file_path_or_bytes: a path, or the upload's bytes (never written to disk).
+        file_ext / mime_type: what the client sent; ExifTool still detects the format
+        from the content, these fill in the report when it cannot.
+        profile: "full" | "quick" | "signatures-only"; None picks by file size.
+        """
+        try:
+            if not isinstance(file_path_or_bytes, bytes) and not os.path.exists(file_path_or_bytes):
+                return {"error": "File not found"}
+
+            size = len(file_path_or_bytes) if isinstance(file_path_or_bytes, bytes) else os.path.getsize(file_path_or_bytes)
+            profile = self.select_profile(profile, size)
+            t0 = time.perf_counter()
+            reason = None
+            if self.fast_path and not is_video:
+                if isinstance(file_path_or_bytes, bytes):
+                    content, label = file_path_or_bytes, f"<upload{file_ext or ''}>"
+                else:
+                    with open(file_path_or_bytes, "rb") as f:
+                        content, label = f.read(), file_path_or_bytes
+                parse_stats = {}
+                raw_data, reason = self._fast_extract(content, parse_stats)
+                if raw_data is not None:
+                    self._count("native")
+                    report = self._process_exiftool_data(raw_data, label, is_video=is_video)
+                    self._record_extraction(report, profile, "native", time.perf_counter() - t0,
+                                            parse_stats.get("bytes_read"))
+                    return self._apply_client_type(report, file_ext, mime_type)
 
             if not self.exiftool_path:
                 return {"error": "ExifTool executable not found on server."}
@@ -87,36 +222,48 @@ class MetadataEngine:
             # -a: Duplicate tags allowed
             # -u: Unknown tags allowed
             # -g1: Group by specific family 1 (e.g. IFD0, ExifIFD)
-            cmd = [self.exiftool_path, "-json", "-G", "-a", "-u", "-g1", file_path]
-            
-            # Using shell=True for windows .exe sometimes helps, but list is safer usually. 
-            # For "exiftool(-k).exe", the parenthesis might need care if shell=True. 
-            # subprocess.run with list args handles spaces/chars well on Windows.
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', errors='ignore')
+            # -fast2 / tag lists: see EXTRACTION_PROFILES
+            args = ["-json", "-G"] + EXTRACTION_PROFILES[profile]
+            if not isinstance(file_path_or_bytes, bytes):
+                file_path = file_path_or_bytes
+                stdout, error, bytes_read = self._run_exiftool(args + [file_path])
+            elif self.use_pool:
+                # Pool workers read commands from stdin, so the bytes go through a memfd path
+                from memory_file import memory_path
+                with memory_path(file_path_or_bytes, suffix=file_ext or "") as file_path:
+                    stdout, error, bytes_read = self._run_exiftool(args + [file_path])
+            else:
+                file_path = f"<upload{file_ext or ''}>"
+                stdout, error, bytes_read = self._run_exiftool(args + ["-"], input_bytes=file_path_or_bytes)
             
-            if result.returncode != 0 and not result.stdout:
-                return {"error": f"ExifTool failed: {result.stderr}"}
+            if error is not None:
+                return {"error": f"ExifTool failed: {error}"}
             
             try:
-                metadata_list = json.loads(result.stdout)
+                metadata_list = json.loads(stdout)
                 if not metadata_list: return {"error": "Empty metadata extraction"}
                 metadata = metadata_list[0] # ExifTool returns a list of objects (one per file)
             except json.JSONDecodeError:
                  return {"error": "Failed to parse ExifTool output"}
 
-            return self._process_exiftool_data(metadata, file_path, is_video=is_video)
+            self._count("exiftool", reason)
+            report = self._process_exiftool_data(metadata, file_path, is_video=is_video)
+            self._record_extraction(report, profile, "exiftool", time.perf_counter() - t0, bytes_read)
+            return self._apply_client_type(report, file_ext, mime_type)
 
         except Exception as e:
             import traceback
             traceback.print_exc()
             return {"error": str(e), "metadata_reliability": "Low"}
-        finally:
-            if temp_file and os.path.exists(temp_file):
-                try:
-                    os.remove(temp_file)
-                except:
-                    pass
+
+    def _apply_client_type(self, report, file_ext, mime_type):
+        # The client's type only fills gaps; the parsers identify formats from content
+        overview = report.get('file_overview', {})
+        if mime_type and overview.get('media_type') == "Unknown":
+            overview['media_type'] = mime_type
+        if file_ext and overview.get('file_format') == "Unknown":
+            overview['file_format'] = file_ext.lstrip(".").upper()
+        return report
 
     def _process_exiftool_data(self, raw_data, file_path, is_video=False):
         # [NEW] Flatten Metadata if Nested (due to -g/g1 flags)
@@ -145,25 +292,10 @@ class MetadataEngine:
         
         report = self._init_report_structure()
         
-        # Helper to find keys case-insensitively or via group
-        # Helper to find keys case-insensitively or via group
-        def get_val(keys, default="Unknown"):
-            if isinstance(keys, str): keys = [keys]
-            for k in keys:
-                # 1. Direct Exact Match
-                if k in raw_data: return str(raw_data[k])
-                
-                # 2. Case-Insensitive Match
-                for clean_key in raw_data.keys():
-                    if clean_key.lower() == k.lower():
-                        return str(raw_data[clean_key])
-
-                # 3. Suffix Match (e.g. 'Model' finds 'EXIF:Model')
-                for rk in raw_data.keys():
-                    if rk.endswith(f":{k}") or rk.split(":")[-1] == k:
-                         return str(raw_data[rk])
-            
-            return default
+        # Exact / case-insensitive / suffix lookups via an index built once per file
+        # (e.g. 'Model' finds 'IFD0:Model'; EXIF groups win over XMP/container copies)
+        index = TagIndex(raw_data)
+        get_val = index.get
 
         # 1. File Overview
         report['file_overview']['media_type'] = get_val(["MIMEType", "FileType"], "Unknown")
@@ -196,32 +328,15 @@ class MetadataEngine:
         report['software_trace']['capturing_software'] = software_candidates[0] if software_candidates else "Unknown"
         
         # Scan EVERYTHING (Keys and Values) for signatures
-        detected_ai = []
-        detected_edit = []
-        
-        # Convert entire raw data to string to catch keys (e.g. 'C2PA') and values
-        # logic: if "c2pa" matches a key like "XMP-c2pa:...", we want to catch it.
-        # [FIX] Filter out SourceFile and Directory to avoid flagging file paths
-        filtered_data = {k: v for k, v in raw_data.items() if k not in ["SourceFile", "Directory", "ExifToolVersion", "FilePermissions"]}
-        
-        try:
-            all_text_dump = json.dumps(filtered_data, default=str).lower()
-        except:
-            # Fallback if json dump fails (rare)
-            all_text_dump = str(filtered_data).lower()
-            
-        print(f"[DEBUG] AI Scan Dump Length: {len(all_text_dump)}")
-        
-        for sig in self.ai_signatures:
-            if sig.lower() in all_text_dump:
-                detected_ai.append(sig)
-                
-        for sig in self.editing_signatures:
-             if sig.lower() in all_text_dump:
-                 detected_edit.append(sig)
-
-        detected_ai = list(set(detected_ai))
-        detected_edit = list(set(detected_edit))
+        # One automaton pass per tag name/value; catches keys like "XMP-c2pa:..." too.
+        # SourceFile, Directory etc. are skipped so file paths are not flagged.
+        matches = self.signatures.match(raw_data)
+        detected_ai = list(matches.get("ai", {}))
+        detected_edit = list(matches.get("editing", {}))
+        report['software_trace']['signature_matches'] = [
+            {"category": category, "signature": sig, "tags": tags}
+            for category, sigs in matches.items() for sig, tags in sigs.items()
+        ]
 
         if detected_ai:
              print(f"[DEBUG] DETECTED AI SIGNATURES: {detected_ai}")
@@ -263,25 +378,22 @@ class MetadataEngine:
         # User Rule: If Make + Model are present in raw metadata -> 99% Real
         # We search RAW keys directly to ensure we don't miss anything due to different naming conventions.
         
-        has_make = False
-        has_model = False
-        
-        # Aggressively scan all raw keys
-        for key, val in raw_data.items():
-            k_lower = key.lower()
-            val_str = str(val).strip()
-            
+        # Aggressively scan all raw keys (only those whose name mentions make/model)
+        def has_value(key):
             # Skip empty values or "Unknown"
-            if not val_str or val_str.lower() == "unknown":
-                continue
-                
-            # Check for Make
-            if "make" in k_lower and "lens" not in k_lower and "note" not in k_lower:
-                has_make = True
-                
-            # Check for Model (exclude LensModel, ColorModel, etc.)
-            if "model" in k_lower and "lens" not in k_lower and "color" not in k_lower and "release" not in k_lower:
-                has_model = True
+            val_str = str(raw_data[key]).strip()
+            return bool(val_str) and val_str.lower() != "unknown"
+
+        # Check for Make
+        has_make = any(
+            has_value(key) for key in index.keys_containing("make")
+            if "lens" not in key.lower() and "note" not in key.lower()
+        )
+        # Check for Model (exclude LensModel, ColorModel, etc.)
+        has_model = any(
+            has_value(key) for key in index.keys_containing("model")
+            if not any(x in key.lower() for x in ("lens", "color", "release"))
+        )
         
         # Check extraction fallback if raw scan missed (double safety)
         if not has_make:
@@ -297,9 +409,9 @@ class MetadataEngine:
         else:
              report['metadata_based_conclusion']['has_make_model'] = "No"
         
-        report['metadata_completeness']['exif_metadata'] = "Present" if any("EXIF:" in k for k in raw_data.keys()) else "Missing"
-        report['metadata_completeness']['xmp_metadata'] = "Present" if any("XMP:" in k for k in raw_data.keys()) else "Missing"
-        report['metadata_completeness']['icc_profile'] = "Present" if any("ICC_Profile:" in k for k in raw_data.keys()) else "Missing"
+        report['metadata_completeness']['exif_metadata'] = "Present" if index.any_key_contains("EXIF:") else "Missing"
+        report['metadata_completeness']['xmp_metadata'] = "Present" if index.any_key_contains("XMP:") else "Missing"
+        report['metadata_completeness']['icc_profile'] = "Present" if index.any_key_contains("ICC_Profile:") else "Missing"
 
         # 5. Consistency Check (Simple)
         make = report['camera_info']['device_make']
@@ -7,26 +7,58 @@ import numpy as np
 import math
 import logging
 import time
+from inference_engine import DirectInferenceEngine, ai_prob_from_pipeline_output
+
+
+DETECTOR_MODEL_NAMES = [
+    "umm-maybe/AI-image-detector",
+    "prithivMLmods/Deep-Fake-Detector-v2-Model",
+    "prithivMLmods/deepfake-detector-model-v1",
+    "Ateeqq/ai-vs-human-image-detector",
+    "jacoballessio/ai-image-detect-distilled",
+    "Hemg/AI-VS-REAL-IMAGE-DETECTION",
+    "dima806/ai_vs_real_image_detection",
+    "Organika/sdxl-detector",
+    "Wvolf/ViT_Deepfake_Detection",
+    "Nahrawy/AIorNot",
+    "XenArcAI/AIRealNet"
+]
+
+# A patch voting AI above this average confidence counts as a localized AI hotspot
+PATCH_HOTSPOT_CONFIDENCE = 80.0
 
 
 class ModelManager:
 
-    def __init__(self):
+    def __init__(self, enable_batching=False, max_batch_size=64, max_wait_ms=15, pipeline_batch_size=4,
+                 engine="pipeline", governor=None, execution="in_process", num_workers=None,
+                 shard_strategy="per_model", precision="fp32", backend="torch", cascade=False,
+                 cascade_margin=0.0, patch_mode="grid", patch_view_budget=19, view_mode="pil"):
         self.models = {}
+        self.pipeline_batch_size = pipeline_batch_size
+
+        # "pipeline": transformers.pipeline per detector (legacy)
+        # "direct": DirectInferenceEngine (stacked tensors, full probability vectors)
+        self.engine = engine
+        # "fp32" | "int8" | "bf16", or a per-model dict (direct engine only)
+        self.precision = precision
+        # "torch" | "onnx" execution backend for the direct engine and CLIP
+        self.backend = backend
+        # "pil": views are PIL resizes/crops (legacy)
+        # "array": views come from one decoded array (ViewBuilder) and skip PIL on the direct engine
+        self.view_mode = view_mode
+        self.inference_engine = None
+        if engine == "direct":
+            self.inference_engine = DirectInferenceEngine(
+                precision=precision, backend=backend,
+                intra_threads=governor.threads_per_model if governor is not None else 1,
+                native_preprocess=(view_mode == "array")
+            )
 
-        self.model_names = [
-            "umm-maybe/AI-image-detector",
-            "prithivMLmods/Deep-Fake-Detector-v2-Model",
-            "prithivMLmods/deepfake-detector-model-v1",
-            "Ateeqq/ai-vs-human-image-detector",
-            "jacoballessio/ai-image-detect-distilled",
-            "Hemg/AI-VS-REAL-IMAGE-DETECTION",
-            "dima806/ai_vs_real_image_detection",
-            "Organika/sdxl-detector",
-            "Wvolf/ViT_Deepfake_Detection",
-            "Nahrawy/AIorNot",
-            "XenArcAI/AIRealNet"
-        ]
+        self.model_names = list(DETECTOR_MODEL_NAMES)
+
+        # Enhanced weighting
+        self.model_weights = {name: 1.0 for name in self.model_names}
         
         # Initialize dictionary
         for name in self.model_names:
@@ -37,7 +69,46 @@ class ModelManager:
         # CLIP for Semantic Drift
         self.clip_model = None
         self.clip_processor = None
+        self.clip_onnx = None
         self.clip_status = "Pending"
+
+        # Parallel per-model execution (optional, sized by the CoreGovernor)
+        self.governor = governor
+        self.model_executor = None
+        if governor is not None and governor.model_parallelism > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            self.model_executor = ThreadPoolExecutor(
+                max_workers=governor.model_parallelism,
+                thread_name_prefix="ensemble",
+                initializer=governor.configure_model_worker
+            )
+
+        # "in_process": detectors live in this process
+        # "sharded": detectors live in worker processes (ShardedEnsemble), started by the loader
+        self.execution = execution
+        self.num_workers = num_workers
+        self.shard_strategy = shard_strategy
+        self.sharded = None
+
+        # Patch analysis: "grid" always crops 16 patches, "adaptive" refines only suspicious quadrants
+        self.patch_mode = patch_mode
+        self.patch_view_budget = patch_view_budget
+        self.patch_uncertainty_band = 15.0  # quadrant confidence within 50 +/- band counts as unsure
+
+        # Early-exit cascade (optional): stop running models on a view once its verdict is settled
+        self.cascade = None
+        if cascade:
+            from ensemble_cascade import EnsembleCascade
+            # Grid patches and refined tiles may exit early, but never across the hotspot cut
+            self.cascade = EnsembleCascade(margin=cascade_margin, confidence_thresholds=(PATCH_HOTSPOT_CONFIDENCE,))
+
+        # Cross-request micro-batching (optional)
+        self.batch_scheduler = None
+        if enable_batching:
+            from batch_scheduler import BatchScheduler
+            self.batch_scheduler = BatchScheduler(
+                self._collect_predictions, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms
+            )
         
         self.start_background_loading()
 
@@ -55,13 +126,23 @@ class ModelManager:
             print(f"CRITICAL ERROR: Could not import transformers/torch: {e}")
             return
 
-        
+        if self.governor is not None:
+            # Default for threads outside the model executor (sequential path, CLIP)
+            from resource_governor import set_torch_threads
+            set_torch_threads(self.governor.threads_per_model)
+
+        if self.execution == "sharded":
+            self._start_sharded_workers()
+
         # Load Detection Models
-        for name in self.model_names:
+        for name in (self.model_names if self.sharded is None else []):
             try:
                 print(f"Loading {name}...", flush=True)
                 self.loading_status[name] = "Loading"
-                self.models[name] = pipeline("image-classification", model=name)
+                if self.inference_engine is not None:
+                    self.models[name] = self.inference_engine.load(name)
+                else:
+                    self.models[name] = pipeline("image-classification", model=name)
                 self.loading_status[name] = "Ready"
                 print(f"Loaded {name} successfully.", flush=True)
             except Exception as e:
@@ -71,8 +152,14 @@ class ModelManager:
         # Load CLIP
         try:
             print("Loading CLIP (openai/clip-vit-base-patch32)...", flush=True)
-            self.clip_model = CLIPModel.from_pretrained("openai/clip-vit-base-patch32")
-            self.clip_processor = CLIPProcessor.from_pretrained("openai/clip-vit-base-patch32")
+            if self.backend == "onnx":
+                from onnx_backend import OnnxClip
+                clip = OnnxClip(intra_threads=self.governor.threads_per_model if self.governor is not None else 1)
+                clip.load()
+                self.clip_onnx = clip
+            else:
+                self.clip_model = CLIPModel.from_pretrained("openai/clip-vit-base-patch32")
+                self.clip_processor = CLIPProcessor.from_pretrained("openai/clip-vit-base-patch32")
             self.clip_status = "Ready"
             print("CLIP Loaded.", flush=True)
         except Exception as e:
@@ -81,45 +168,65 @@ class ModelManager:
             
         print("Background model loading complete.", flush=True)
 
-    def predict_full_suite(self, image):
+    def _start_sharded_workers(self):
+        from sharded_ensemble import ShardedEnsemble
+
+        def on_status(name, status):
+            self.loading_status[name] = status
+
+        threads = self.governor.threads_per_model if self.governor is not None else 1
+        self.sharded = ShardedEnsemble(
+            self.model_names, num_workers=self.num_workers, strategy=self.shard_strategy,
+            engine=self.engine, threads_per_worker=threads, on_status=on_status,
+            precision=self.precision, backend=self.backend
+        )
+        print(f"Starting {len(self.sharded.workers)} ensemble worker processes...", flush=True)
+        self.sharded.start()
+
+    def predict_full_suite(self, image, patch_mode=None):
         """
         Executes Steps 1, 3, 4, 8 of the pipeline.
         Optimized with Batch Processing.
+        patch_mode: "grid" (fixed 4x4) or "adaptive" (2x2 coarse pass, refine suspicious quadrants).
         """
+        patch_mode = patch_mode or self.patch_mode
+
         # Prepare all execution targets
         # 0: Original
         # 1: 50% Resize
         # 2: 25% Resize
-        # 3-18: 16 Patches (4x4)
+        # 3-18: 16 Patches (4x4)  |  adaptive: 3-6: 4 Quadrants (2x2)
         
         # 1. Prepare Images
-        w, h = image.size
-        img_50 = image.resize((int(w*0.5), int(h*0.5)))
-        img_25 = image.resize((int(w*0.25), int(h*0.25)))
+        if self.view_mode == "array":
+            from view_builder import ViewBuilder
+            source = ViewBuilder(image)
+            img_50, img_25 = source.pyramid()
+            original = source.base
+        else:
+            source = image
+            w, h = image.size
+            img_50 = image.resize((int(w*0.5), int(h*0.5)))
+            img_25 = image.resize((int(w*0.25), int(h*0.25)))
+            original = image
         
         # Grid Split (3-18)
-        grid_size = 4
-        pw, ph = w // grid_size, h // grid_size
-        patches_imgs = []
-        patch_meta = [] # Store row/col info
-        
-        for i in range(grid_size):
-            for j in range(grid_size):
-                left = j * pw
-                upper = i * ph
-                right = left + pw
-                lower = upper + ph
-                p_img = image.crop((left, upper, right, lower))
-                patches_imgs.append(p_img)
-                patch_meta.append({"row": i, "col": j})
+        if patch_mode == "adaptive":
+            patches_imgs, patch_meta = self._crop_cells(source, [(r, c, 2) for r in (0, 2) for c in (0, 2)])
+        else:
+            patches_imgs, patch_meta = self._crop_cells(source, [(r, c, 1) for r in range(4) for c in range(4)])
                 
         # Combine all for batch inference
-        all_images = [image, img_50, img_25] + patches_imgs
+        all_images = [original, img_50, img_25] + patches_imgs
         
         # 2. Batch Inference
         # Returns list of result dicts properly formatted
         print(f"Running batch inference on {len(all_images)} image views...", flush=True)
-        batch_results = self._run_ensemble_batch(all_images)
+        # Views whose exact scores are read downstream always see every model: the original feeds
+        # fusion (votes, average confidence), the pyramid the multiscale variance, and adaptive
+        # quadrants are ranked for refinement by their confidence
+        full_views = [0, 1, 2] + (list(range(3, len(all_images))) if patch_mode == "adaptive" else [])
+        batch_results, timing = self._run_ensemble_batch_timed(all_images, full_views=full_views)
         
         base_results = batch_results[0]
         res_50 = batch_results[1]
@@ -136,8 +243,18 @@ class ModelManager:
         # Verify patch count matches
         if len(patch_results_list) != len(patch_meta):
             print("Error: Patch result count mismatch")
+
+        if patch_mode == "adaptive":
+            patch_results_list, patch_meta, refine_timing = self._refine_patches(
+                source, patch_results_list, patch_meta, base_results['summary']
+            )
+            timing = self._merge_timing([timing, refine_timing])
             
         patch_conflicts = self._analyze_patches_from_results(patch_results_list, patch_meta, base_results['summary']['consensus'])
+        patch_conflicts["patch_mode"] = patch_mode
+        patch_conflicts["views_evaluated"] = timing["views"]
+        if self.view_mode == "array":
+            timing["view_memory"] = source.memory_stats(all_images)
 
         # 8. CLIP Semantic Drift (Single image for now, can be batched but usually fast)
         clip_drift = self._analyze_semantic_drift(image)
@@ -152,9 +269,86 @@ class ModelManager:
                 "status": "Stable" if variance < 20 else "Unstable (AI Sign)"
             },
             "patches": patch_conflicts,
-            "semantic_drift": clip_drift
+            "semantic_drift": clip_drift,
+            "timing": timing
         }
 
+    def _crop_cells(self, image, cells, grid_size=4):
+        """
+        Crops regions of the 4x4 grid. Each cell is (row, col, span): span=1 is one
+        grid cell, span=2 a quadrant. Boxes line up exactly with the fixed-grid crops.
+        A ViewBuilder source returns zero-copy array slices instead of PIL crops.
+        """
+        if hasattr(image, "cells"):
+            return image.cells(cells, grid_size)
+        w, h = image.size
+        pw, ph = w // grid_size, h // grid_size
+        imgs, meta = [], []
+        for row, col, span in cells:
+            left = col * pw
+            upper = row * ph
+            imgs.append(image.crop((left, upper, left + pw * span, upper + ph * span)))
+            meta.append({"row": row, "col": col, "span": span})
+        return imgs, meta
+
+    def _refine_patches(self, image, quadrant_results, quadrant_meta, global_summary):
+        """
+        Adaptive (quadtree) patch pass.
+        Suspicious quadrants - verdict disagrees with the global consensus, or the
+        ensemble is unsure - are split into their four grid cells and re-run with the
+        full ensemble, most suspicious first, while the view budget allows.
+        Returns 16 cell results in 4x4 row-major order (unrefined quadrants fill their
+        four cells with the coarse result), their meta, and the refinement timing.
+        """
+        global_consensus = global_summary['consensus']
+        global_conf = global_summary['average_confidence']
+
+        def suspicion(res):
+            conf = res['summary']['average_confidence']
+            disagrees = res['summary']['consensus'] != global_consensus
+            uncertain = abs(conf - 50.0) < self.patch_uncertainty_band
+            if not (disagrees or uncertain):
+                return None
+            return abs(conf - global_conf) + (100.0 if disagrees else 0.0)
+
+        candidates = []
+        for res, meta in zip(quadrant_results, quadrant_meta):
+            score = suspicion(res)
+            if score is not None:
+                candidates.append((score, meta))
+        candidates.sort(key=lambda x: x[0], reverse=True)
+
+        views_left = self.patch_view_budget - 3 - len(quadrant_results)
+        refine = []
+        for _, meta in candidates:
+            if views_left < 4:
+                break
+            refine.append((meta['row'], meta['col']))
+            views_left -= 4
+
+        cells = [(r + dr, c + dc, 1) for r, c in refine for dr in (0, 1) for dc in (0, 1)]
+        refined = {}
+        timing = {"views": 0, "ensemble_s": 0.0, "preprocess_s": 0.0, "preprocess_saved_s": 0.0}
+        if cells:
+            print(f"Adaptive patches: refining {len(refine)} suspicious quadrant(s) into {len(cells)} tiles...", flush=True)
+            imgs, meta = self._crop_cells(image, cells)
+            results, timing = self._run_ensemble_batch_timed(imgs)
+            for res, m in zip(results, meta):
+                refined[(m['row'], m['col'])] = res
+
+        # Expand back to the 4x4 grid shape the report (and UI) expects
+        quadrant_by_origin = {(m['row'], m['col']): r for r, m in zip(quadrant_results, quadrant_meta)}
+        cell_results, cell_meta = [], []
+        for row in range(4):
+            for col in range(4):
+                if (row, col) in refined:
+                    cell_results.append(refined[(row, col)])
+                    cell_meta.append({"row": row, "col": col, "level": "fine"})
+                else:
+                    cell_results.append(quadrant_by_origin[(row - row % 2, col - col % 2)])
+                    cell_meta.append({"row": row, "col": col, "level": "coarse"})
+        return cell_results, cell_meta, timing
+
     def _analyze_patches_from_results(self, results_list, meta_list, global_consensus):
         """
         Analyzes pre-computed patch results.
@@ -185,6 +379,8 @@ class ModelManager:
                 "confidence": conf,
                 "verdict": verdict
             })
+            if 'level' in meta:
+                patch_detailed[-1]['level'] = meta['level']
 
         # 2. Statistics
         total_patches = len(results_list)
@@ -205,7 +401,7 @@ class ModelManager:
             elif patch_variance > 300:
                  consistency_level = "Medium"
         else:
-            hotspots = [p for p in patch_detailed if p['verdict'] == "AI Generated" and p['confidence'] > 80]
+            hotspots = [p for p in patch_detailed if p['verdict'] == "AI Generated" and p['confidence'] > PATCH_HOTSPOT_CONFIDENCE]
             if len(hotspots) >= 2:
                 conflict_detected = True
                 consistency_level = "Low"
@@ -227,58 +423,196 @@ class ModelManager:
         Runs all models on a list of images.
         Returns a list of summary dictionaries (one per image).
         """
+        summaries, _ = self._run_ensemble_batch_timed(images)
+        return summaries
+
+    def _run_ensemble_batch_timed(self, images, full_views=()):
+        """
+        Same as _run_ensemble_batch, plus the timing breakdown for these images.
+        `full_views` are indices of views the cascade must run every model on.
+        """
+        if self.batch_scheduler is not None:
+            # Merged with views from concurrent requests; we get our own slice back
+            entries = self.batch_scheduler.submit(images, full_views)
+        else:
+            entries = self._collect_predictions(images, full_views)
+
+        summaries = self._summarize_predictions([e['results'] for e in entries])
+        return summaries, self._merge_timing([e['timing'] for e in entries])
+
+    def _collect_predictions(self, images, full_views=()):
+        """
+        Runs every model once over `images` (the cascade may skip models except on `full_views`).
+        Returns one entry per image: its raw per-model results and its share of the batch timing.
+        """
         num_images = len(images)
         results_per_image = [ [] for _ in range(num_images) ]
+        batch_start = time.perf_counter()
+
+        # Views are preprocessed once per fingerprint group and shared across models
+        cache = None
+        if self.inference_engine is not None:
+            from inference_engine import PreprocessCache
+            cache = PreprocessCache(self.inference_engine, images)
         
-        # Enhanced weighting
-        model_weights = {name: 1.0 for name in self.model_names} 
-        
-        # Iterate MODELS (Outer Loop)
-        for name in self.model_names:
-            pipe = self.models.get(name)
-            status = self.loading_status.get(name, "Inactive")
-            
-            if pipe is None:
-                # Fill error/inactive for all images for this model
-                for i in range(num_images):
-                    results_per_image[i].append({
-                        "model": name, "verdict": status, "confidence": 0.0, "status": "Inactive"
-                    })
+        # Iterate MODELS (Outer Loop) - optionally several models at once
+        if self.sharded is not None:
+            # Worker processes run their models concurrently on one shared-memory copy of the views
+            scores = self.sharded.predict(images)
+            per_model = [self._results_from_scores(name, images, scores.get(name)) for name in self.model_names]
+        elif self.cascade is not None:
+            # Sequential by design: each model's scores decide which views the next one sees
+            per_model = self._run_cascade(images, cache, full_views)
+        elif self.model_executor is not None:
+            per_model = list(self.model_executor.map(lambda n: self._run_model(n, images, cache), self.model_names))
+        else:
+            per_model = [self._run_model(name, images, cache) for name in self.model_names]
+
+        # Merge in model_names order so results are identical to the sequential path
+        for model_results in per_model:
+            for i, res in enumerate(model_results):
+                results_per_image[i].append(res)
+
+        # Batch timing is apportioned evenly across views (a request may own only a slice)
+        total = time.perf_counter() - batch_start
+        preprocess = cache.preprocess_time if cache else 0.0
+        saved = cache.saved_time if cache else 0.0
+        view_timing = {
+            "views": 1,
+            "ensemble_s": total / max(num_images, 1),
+            "preprocess_s": preprocess / max(num_images, 1),
+            "preprocess_saved_s": saved / max(num_images, 1),
+        }
+        return [{"results": r, "timing": dict(view_timing)} for r in results_per_image]
+
+    def _run_model(self, name, images, cache=None):
+        """Runs one detector over all images. Returns one result dict per image."""
+        pipe = self.models.get(name)
+        status = self.loading_status.get(name, "Inactive")
+
+        if pipe is None:
+            # Fill error/inactive for all images for this model
+            return [{"model": name, "verdict": status, "confidence": 0.0, "status": "Inactive"} for _ in images]
+
+        try:
+            # Batch Predict
+            ai_probs = self._predict_ai_probs(name, pipe, images, cache=cache)
+        except Exception as e:
+            print(f"Error running {name} batch: {e}")
+            return [{"model": name, "verdict": "Error", "confidence": 0.0, "status": "Error"} for _ in images]
+
+        return self._results_from_probs(name, ai_probs)
+
+    def _run_cascade(self, images, cache=None, full_views=()):
+        """
+        Runs models in cascade order, each only on views whose consensus is still open.
+        Views in `full_views` are never exited early: their votes and average confidence
+        (not just the consensus) must match a full run.
+        Returns per-model result lists in model_names order; skipped pairs are "Skipped (decided)".
+        """
+        n = len(images)
+        full_views = set(full_views)
+        order = self.cascade.order(self.model_names)
+        runnable = [name for name in order if self.models.get(name) is not None]
+
+        weighted_sum = [0.0] * n
+        weight = [0.0] * n
+        remaining = sum(self.model_weights.get(name, 1.0) for name in runnable)
+        undecided = list(range(n))
+        by_model = {}
+        ran = []       # (name, view index, ai_prob)
+        skipped = []   # model name per skipped model/view pair
+
+        for name in order:
+            if name not in runnable:
+                by_model[name] = self._run_model(name, images)  # Inactive placeholders
                 continue
-                
-            try:
-                # Batch Predict
-                preds_batch = pipe(images, batch_size=4)
-                
-                # Process each image's prediction
-                for i, preds in enumerate(preds_batch):
-                    # Handle if preds is list (top_k) or dict
-                    top = preds[0] if isinstance(preds, list) else preds
-                    
-                    label = top['label'].lower()
-                    score = top['score']
-                    
-                    ai_labels = ['ai', 'fake', 'artificial', 'generated', 'deepfake', 'synthetic', '0']
-                    is_ai = any(x in label for x in ai_labels)
-                    ai_prob = score if is_ai else (1.0 - score)
-                    verdict = "AI" if ai_prob > 0.5 else "Real"
-                    
-                    results_per_image[i].append({
-                        "model": name,
-                        "verdict": verdict,
-                        "confidence": float(round(ai_prob * 100, 2)),
-                        "status": "Active",
-                        "raw_score": ai_prob, # for weighted calc
-                        "weight": model_weights.get(name, 1.0)
-                    })
-                    
-            except Exception as e:
-                print(f"Error running {name} batch: {e}")
-                for i in range(num_images):
-                    results_per_image[i].append({
-                        "model": name, "verdict": "Error", "confidence": 0.0, "status": "Error"
-                    })
 
+            w = self.model_weights.get(name, 1.0)
+            remaining -= w
+            results = [{"model": name, "verdict": "Skipped (decided)", "confidence": 0.0, "status": "Skipped"}
+                       for _ in range(n)]
+            skipped.extend([name] * (n - len(undecided)))
+
+            if undecided:
+                t0 = time.perf_counter()
+                try:
+                    ai_probs = self._predict_ai_probs(name, self.models[name], [images[i] for i in undecided],
+                                                      cache=cache, indices=undecided)
+                    for i, res in zip(undecided, self._results_from_probs(name, ai_probs)):
+                        results[i] = res
+                        weighted_sum[i] += res['raw_score'] * w
+                        weight[i] += w
+                        ran.append((name, i, res['raw_score']))
+                except Exception as e:
+                    print(f"Error running {name} batch: {e}")
+                    for i in undecided:
+                        results[i] = {"model": name, "verdict": "Error", "confidence": 0.0, "status": "Error"}
+                self.cascade.record_latency(name, time.perf_counter() - t0, len(undecided))
+
+                undecided = [i for i in undecided
+                             if i in full_views or not self.cascade.is_decided(weighted_sum[i], weight[i], remaining)]
+            by_model[name] = results
+
+        # Learn which models agree with the verdict they contributed to
+        final_ai = [weight[i] > 0 and weighted_sum[i] / weight[i] > 0.5 for i in range(n)]
+        agreements = [(name, (p > 0.5) == final_ai[i]) for name, i, p in ran]
+        views_early = sum(1 for i in range(n) if any(r[i]['status'] == "Skipped" for r in by_model.values()))
+        self.cascade.record_batch(agreements, skipped, n, views_early)
+
+        return [by_model[name] for name in self.model_names]
+
+    def _results_from_scores(self, name, images, scores):
+        """Per-image results for one model from a sharded worker reply (array, error string or None)."""
+        if scores is None:
+            status = self.loading_status.get(name, "Inactive")
+            return [{"model": name, "verdict": status, "confidence": 0.0, "status": "Inactive"} for _ in images]
+        if isinstance(scores, str):
+            print(f"Error running {name} batch: {scores}")
+            return [{"model": name, "verdict": "Error", "confidence": 0.0, "status": "Error"} for _ in images]
+        return self._results_from_probs(name, scores)
+
+    def _results_from_probs(self, name, ai_probs):
+        results = []
+        for ai_prob in ai_probs:
+            ai_prob = float(ai_prob)
+            verdict = "AI" if ai_prob > 0.5 else "Real"
+            results.append({
+                "model": name,
+                "verdict": verdict,
+                "confidence": float(round(ai_prob * 100, 2)),
+                "status": "Active",
+                "raw_score": ai_prob, # for weighted calc
+                "weight": self.model_weights.get(name, 1.0)
+            })
+        return results
+
+    def _merge_timing(self, timings):
+        merged = {"views": 0, "ensemble_s": 0.0, "preprocess_s": 0.0, "preprocess_saved_s": 0.0}
+        for t in timings:
+            for k in merged:
+                merged[k] += t.get(k, 0)
+        for k in ["ensemble_s", "preprocess_s", "preprocess_saved_s"]:
+            merged[k] = round(merged[k], 4)
+        return merged
+
+    def _predict_ai_probs(self, name, pipe, images, cache=None, indices=None):
+        """
+        Returns one AI probability per image for a single detector.
+        `indices` selects rows of the cached batch tensor when `images` is a subset of it.
+        """
+        if self.inference_engine is not None:
+            if cache is not None and indices is not None:
+                return self.inference_engine.predict_ai_probs(name, pixel_values=cache.get(name)[indices])
+            return self.inference_engine.predict_ai_probs(name, images, cache=cache)
+
+        # transformers.pipeline needs PIL input
+        images = [Image.fromarray(np.ascontiguousarray(im)) if isinstance(im, np.ndarray) else im for im in images]
+        preds_batch = pipe(images, batch_size=self.pipeline_batch_size)
+        return [ai_prob_from_pipeline_output(preds) for preds in preds_batch]
+
+    def _summarize_predictions(self, results_per_image):
+        """Builds the ensemble summary for each image from its per-model results."""
         # Summarize for each image
         final_summaries = []
         for img_results in results_per_image:
@@ -342,10 +676,14 @@ class ModelManager:
             # But we don't know the class.
             # Alternative: Image vs "AI generated image" vs "Real photo"
             
-            inputs = self.clip_processor(text=["a real photo", "an ai generated image"], images=image, return_tensors="pt", padding=True)
-            outputs = self.clip_model(**inputs)
-            logits_per_image = outputs.logits_per_image # this is the image-text similarity score
-            probs = logits_per_image.softmax(dim=1) 
+            prompts = ["a real photo", "an ai generated image"]
+            if self.clip_onnx is not None:
+                probs = self.clip_onnx.probs(image, prompts)
+            else:
+                inputs = self.clip_processor(text=prompts, images=image, return_tensors="pt", padding=True)
+                outputs = self.clip_model(**inputs)
+                logits_per_image = outputs.logits_per_image # this is the image-text similarity score
+                probs = logits_per_image.softmax(dim=1) 
             
             ai_score = float(probs[0][1]) # Index 1 is "ai generated"
             
@@ -356,6 +694,35 @@ class ModelManager:
         except Exception as e:
             return {"score": 0, "verdict": f"Error: {str(e)}"}
 
+    def pipeline_config(self):
+        """Settings that change predictions (part of the result-cache version)."""
+        return {
+            "models": list(self.model_names),
+            "weights": dict(self.model_weights),
+            "engine": self.engine,
+            "precision": self.precision,
+            "backend": self.backend,
+            "cascade_margin": self.cascade.margin if self.cascade is not None else None,
+            "patch_mode": self.patch_mode,
+            "patch_view_budget": self.patch_view_budget,
+            "view_mode": self.view_mode
+        }
+
+    def get_runtime_stats(self):
+        stats = {
+            "engine": self.engine,
+            "view_mode": self.view_mode,
+            "precision": dict(self.inference_engine.precisions) if self.inference_engine is not None else "fp32",
+            "backend": self.backend,
+            "governor": self.governor.summary() if self.governor is not None else None,
+            "sharded": self.sharded.stats() if self.sharded is not None else None,
+            "cascade": self.cascade.stats() if self.cascade is not None else None,
+            "batching": self.batch_scheduler.stats() if self.batch_scheduler is not None else {"enabled": False}
+        }
+        if self.inference_engine is not None:
+            stats["preprocess_groups"] = self.inference_engine.preprocess_groups()
+        return stats
+
     # Backwards compatibility proxy
     def predict(self, image):
         return self._run_ensemble(image)
@@ -0,0 +1,166 @@
+# import torch, onnxruntime # Lazy loaded (see ModelManager)
+import os
+import re
+import json
+import numpy as np
+
+# Exported graphs are cached here, keyed by model name + revision
+DEFAULT_EXPORT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "model_cache", "onnx")
+OPSET = 17
+
+
+def _export_path(cache_dir, name, revision, part):
+    safe = re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+    return os.path.join(cache_dir, f"{safe}__{revision or 'main'}__{part}.onnx")
+
+
+def model_revision(name):
+    from transformers import AutoConfig
+    return getattr(AutoConfig.from_pretrained(name), "_commit_hash", None)
+
+
+def create_session(path, intra_threads=1):
+    """InferenceSession with full graph optimizations and a sized CPU thread pool."""
+    import onnxruntime as ort
+    so = ort.SessionOptions()
+    so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    so.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    so.intra_op_num_threads = max(1, intra_threads)
+    so.inter_op_num_threads = 1
+    return ort.InferenceSession(path, sess_options=so, providers=["CPUExecutionProvider"])
+
+
+def _export(module, dummy_inputs, input_names, output_names, path):
+    import torch
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    dynamic_axes = {n: {0: "batch"} for n in input_names + output_names}
+    with torch.inference_mode():
+        torch.onnx.export(
+            module, dummy_inputs, tmp_path,
+            input_names=input_names, output_names=output_names,
+            dynamic_axes=dynamic_axes, opset_version=OPSET
+        )
+    os.replace(tmp_path, path)  # never leave a half-written export behind
+
+
+def load_classifier_session(name, processor, revision, cache_dir=DEFAULT_EXPORT_DIR, intra_threads=1):
+    """Exports the detector on first use, then loads it from the cache."""
+    path = _export_path(cache_dir, name, revision, "classifier")
+    if not os.path.exists(path):
+        import torch
+        from transformers import AutoModelForImageClassification
+
+        print(f"Exporting {name} to ONNX (first run, will be cached)...", flush=True)
+        model = AutoModelForImageClassification.from_pretrained(name)
+        model.eval()
+
+        class _LogitsOnly(torch.nn.Module):
+            def __init__(self, m):
+                super().__init__()
+                self.m = m
+
+            def forward(self, pixel_values):
+                return self.m(pixel_values=pixel_values).logits
+
+        dummy = processor(images=np.zeros((256, 256, 3), dtype=np.uint8), return_tensors="pt")["pixel_values"]
+        _export(_LogitsOnly(model), (dummy,), ["pixel_values"], ["logits"], path)
+        del model
+
+    return create_session(path, intra_threads)
+
+
+class OnnxClip:
+    """
+    CLIP semantic-drift scorer on ONNX Runtime.
+    Image and text encoders are exported separately; text embeddings for the
+    fixed prompts are computed once and reused for every request.
+    """
+
+    def __init__(self, model_name="openai/clip-vit-base-patch32", cache_dir=DEFAULT_EXPORT_DIR, intra_threads=1):
+        self.model_name = model_name
+        self.cache_dir = cache_dir
+        self.intra_threads = intra_threads
+        self.processor = None
+        self.image_session = None
+        self.text_session = None
+        self.logit_scale = None
+        self._text_cache = {}
+
+    def load(self):
+        from transformers import CLIPProcessor
+        revision = model_revision(self.model_name)
+        image_path = _export_path(self.cache_dir, self.model_name, revision, "clip_image")
+        text_path = _export_path(self.cache_dir, self.model_name, revision, "clip_text")
+        meta_path = _export_path(self.cache_dir, self.model_name, revision, "clip_meta").replace(".onnx", ".json")
+
+        self.processor = CLIPProcessor.from_pretrained(self.model_name)
+        if not (os.path.exists(image_path) and os.path.exists(text_path) and os.path.exists(meta_path)):
+            self._export(image_path, text_path, meta_path)
+
+        with open(meta_path) as f:
+            self.logit_scale = json.load(f)["logit_scale"]
+        self.image_session = create_session(image_path, self.intra_threads)
+        self.text_session = create_session(text_path, self.intra_threads)
+
+    def _export(self, image_path, text_path, meta_path):
+        import torch
+        from transformers import CLIPModel
+
+        print(f"Exporting {self.model_name} encoders to ONNX (first run, will be cached)...", flush=True)
+        model = CLIPModel.from_pretrained(self.model_name)
+        model.eval()
+
+        class _ImageEncoder(torch.nn.Module):
+            def __init__(self, m):
+                super().__init__()
+                self.m = m
+
+            def forward(self, pixel_values):
+                return self.m.get_image_features(pixel_values=pixel_values)
+
+        class _TextEncoder(torch.nn.Module):
+            def __init__(self, m):
+                super().__init__()
+                self.m = m
+
+            def forward(self, input_ids, attention_mask):
+                return self.m.get_text_features(input_ids=input_ids, attention_mask=attention_mask)
+
+        img_in = self.processor(images=np.zeros((224, 224, 3), dtype=np.uint8), return_tensors="pt")["pixel_values"]
+        txt_in = self.processor(text=["a real photo", "an ai generated image"], return_tensors="pt", padding=True)
+
+        _export(_ImageEncoder(model), (img_in,), ["pixel_values"], ["image_embeds"], image_path)
+        _export(_TextEncoder(model), (txt_in["input_ids"], txt_in["attention_mask"]),
+                ["input_ids", "attention_mask"], ["text_embeds"], text_path)
+        with open(meta_path, "w") as f:
+            json.dump({"logit_scale": float(model.logit_scale.exp().item())}, f)
+
+    def _text_embeds(self, prompts):
+        key = tuple(prompts)
+        if key not in self._text_cache:
+            txt = self.processor(text=list(prompts), return_tensors="np", padding=True)
+            emb = self.text_session.run(None, {
+                "input_ids": txt["input_ids"].astype(np.int64),
+                "attention_mask": txt["attention_mask"].astype(np.int64)
+            })[0]
+            self._text_cache[key] = emb / np.linalg.norm(emb, axis=-1, keepdims=True)
+        return self._text_cache[key]
+
+    def probs(self, image, prompts):
+        """Softmax over prompts, same as CLIPModel(...).logits_per_image.softmax(dim=1)."""
+        px = self.processor(images=image, return_tensors="np")["pixel_values"].astype(np.float32)
+        img = self.image_session.run(None, {"pixel_values": px})[0]
+        img = img / np.linalg.norm(img, axis=-1, keepdims=True)
+        logits = self.logit_scale * img @ self._text_embeds(prompts).T
+        return softmax(logits)
+
+
+def softmax(logits):
+    z = logits - logits.max(axis=-1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+def sigmoid(logits):
+    return 1.0 / (1.0 + np.exp(-logits))
@@ -0,0 +1,77 @@
+# import torch # Lazy loaded (see ModelManager)
+import os
+import re
+import json
+
+PRECISIONS = ["fp32", "int8", "bf16"]
+
+# Quantized detectors are cached here so later startups skip re-quantizing
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "model_cache", "quantized")
+
+
+def parse_precision_config(value):
+    """
+    Accepts "int8" (all models) or a JSON object like
+    {"default": "fp32", "Organika/sdxl-detector": "int8"}.
+    """
+    if not value:
+        return "fp32"
+    value = value.strip()
+    if value.startswith("{"):
+        return json.loads(value)
+    return value
+
+
+def resolve_precision(precision, name):
+    if isinstance(precision, dict):
+        mode = precision.get(name, precision.get("default", "fp32"))
+    else:
+        mode = precision or "fp32"
+    if mode not in PRECISIONS:
+        print(f"Unknown precision '{mode}' for {name}, using fp32")
+        mode = "fp32"
+    return mode
+
+
+def _cache_path(cache_dir, name, revision):
+    import torch
+    safe = re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+    torch_ver = torch.__version__.split("+")[0]
+    return os.path.join(cache_dir, f"{safe}__{revision or 'main'}__torch{torch_ver}.pt")
+
+
+def load_cached_int8(name, revision, cache_dir=DEFAULT_CACHE_DIR):
+    """Returns the cached quantized module, or None if there is no usable cache entry."""
+    import torch
+    path = _cache_path(cache_dir, name, revision)
+    if not os.path.exists(path):
+        return None
+    try:
+        model = torch.load(path, weights_only=False)
+        model.eval()
+        return model
+    except Exception as e:
+        print(f"Ignoring unreadable int8 cache for {name}: {e}")
+        return None
+
+
+def quantize_int8(model, name, revision, cache_dir=DEFAULT_CACHE_DIR):
+    """Dynamic int8 quantization of all nn.Linear layers, saved to the on-disk cache."""
+    import torch
+    qmodel = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    qmodel.eval()
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        torch.save(qmodel, _cache_path(cache_dir, name, revision))
+    except Exception as e:
+        print(f"Could not cache int8 model for {name}: {e}")
+    return qmodel
+
+
+def autocast_context(mode):
+    """bf16 autocast for "bf16", otherwise a no-op context."""
+    import contextlib
+    import torch
+    if mode == "bf16":
+        return torch.autocast("cpu", dtype=torch.bfloat16)
+    return contextlib.nullcontext()
@@ -0,0 +1,94 @@
+import os
+import sys
+import json
+import time
+import argparse
+from PIL import Image
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from model_manager import DETECTOR_MODEL_NAMES
+from inference_engine import DirectInferenceEngine
+from quantization import PRECISIONS
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".webp", ".bmp")
+
+
+def load_images(folder, limit=None):
+    paths = sorted(
+        os.path.join(folder, f) for f in os.listdir(folder) if f.lower().endswith(IMAGE_EXTS)
+    )[:limit]
+    images = []
+    for p in paths:
+        try:
+            images.append(Image.open(p).convert("RGB"))
+        except Exception as e:
+            print(f"Skipping {p}: {e}")
+    return images
+
+
+def measure_model(name, images, modes):
+    """Returns {mode: (ai_probs, seconds)} for one detector."""
+    out = {}
+    for mode in modes:
+        engine = DirectInferenceEngine()
+        try:
+            engine.load(name, precision=mode)
+        except Exception as e:
+            print(f"  {mode}: load failed ({e})")
+            continue
+        t0 = time.perf_counter()
+        probs = engine.predict_ai_probs(name, images)
+        out[mode] = (np.asarray(probs, dtype=np.float64), time.perf_counter() - t0)
+        del engine
+    return out
+
+
+def drift_report(folder, model_names, modes, limit=None):
+    images = load_images(folder, limit)
+    if not images:
+        print(f"No images found in {folder}")
+        return {}
+    print(f"Comparing precisions {modes} on {len(images)} images\n")
+
+    report = {}
+    for name in model_names:
+        print(f"{name}")
+        runs = measure_model(name, images, modes)
+        if "fp32" not in runs:
+            print("  no fp32 baseline, skipped")
+            continue
+
+        base, base_time = runs["fp32"]
+        report[name] = {}
+        for mode, (probs, secs) in runs.items():
+            diff = np.abs(probs - base)
+            flips = int(np.sum((probs > 0.5) != (base > 0.5)))
+            report[name][mode] = {
+                "mean_abs_drift": float(diff.mean()),
+                "max_abs_drift": float(diff.max()),
+                "verdict_flips": flips,
+                "speedup_vs_fp32": round(base_time / secs, 2) if secs > 0 else None
+            }
+            print(f"  {mode:>5}: mean |d ai_prob|={diff.mean():.4f}  max={diff.max():.4f}  "
+                  f"flips={flips}/{len(images)}  speedup={base_time / secs:.2f}x")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-model ai_prob drift between fp32, int8 and bf16.")
+    parser.add_argument("folder", help="Folder of local test images")
+    parser.add_argument("--models", nargs="*", default=DETECTOR_MODEL_NAMES)
+    parser.add_argument("--modes", nargs="*", default=PRECISIONS)
+    parser.add_argument("--limit", type=int, default=None, help="Max images to use")
+    parser.add_argument("--json", help="Write the report to this JSON file")
+    args = parser.parse_args()
+
+    modes = ["fp32"] + [m for m in args.modes if m != "fp32"]
+    result = drift_report(args.folder, args.models, modes, args.limit)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nReport written to {args.json}")
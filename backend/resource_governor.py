@@ -0,0 +1,58 @@
+import os
+import threading
+
+
+class CoreGovernor:
+    """
+    Splits the machine's CPU cores between the three engines so they do not oversubscribe it.
+    - ML: `model_parallelism` detectors run at once, each with its own slice of intra-op threads.
+    - Forensics: OpenCV thread pool size for ForensicEngine.analyze.
+    - ExifTool: max concurrent ExifTool workers.
+    """
+
+    def __init__(self, total_cores=None, ml_share=0.7, forensic_share=0.2, model_parallelism=None):
+        self.total_cores = max(1, total_cores or os.cpu_count() or 1)
+
+        self.ml_cores = max(1, int(self.total_cores * ml_share))
+        self.forensic_cores = max(1, int(self.total_cores * forensic_share))
+        # ExifTool is mostly I/O + Perl startup; it gets what is left (at least one)
+        self.exif_workers = max(1, self.total_cores - self.ml_cores - self.forensic_cores)
+
+        # Default: one model per ~4 ML cores (small ViTs don't scale past a few threads each)
+        if model_parallelism is None:
+            model_parallelism = max(1, self.ml_cores // 4)
+        self.model_parallelism = max(1, min(model_parallelism, self.ml_cores))
+        self.threads_per_model = max(1, self.ml_cores // self.model_parallelism)
+
+    def configure_model_worker(self):
+        """
+        Executor initializer for ML worker threads.
+        torch.set_num_threads sets the OpenMP thread count of the calling thread,
+        so each worker gets its own intra-op slice.
+        """
+        set_torch_threads(self.threads_per_model)
+
+    def summary(self):
+        return {
+            "total_cores": self.total_cores,
+            "ml_cores": self.ml_cores,
+            "model_parallelism": self.model_parallelism,
+            "threads_per_model": self.threads_per_model,
+            "forensic_cores": self.forensic_cores,
+            "exif_workers": self.exif_workers
+        }
+
+
+_interop_configured = threading.Event()
+
+
+def set_torch_threads(num_threads):
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+        # Inter-op pool can only be sized once, before any parallel work starts
+        if not _interop_configured.is_set():
+            _interop_configured.set()
+            torch.set_num_interop_threads(1)
+    except Exception as e:
+        print(f"CoreGovernor: could not set torch threads: {e}")
@@ -0,0 +1,203 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "model_cache", "results.sqlite3")
+
+
+def content_key(content):
+    """Strong content hash of the upload (hex sha256)."""
+    return hashlib.sha256(content).hexdigest()
+
+
+def pipeline_fingerprint(config):
+    """Short stable hash of everything that changes a report (models, thresholds, signature version...)."""
+    blob = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+
+class ResultCache:
+    """
+    Two-tier cache of finished /analyze reports keyed by (content sha256, pipeline version).
+    - Tier 1: bounded in-memory LRU (`memory_entries` reports).
+    - Tier 2: SQLite file with TTL (`ttl_s`) and size-based eviction (`max_bytes`,
+      least recently used rows go first).
+    A report cached under an older pipeline version is never returned for the current one.
+    Probe lookups (hash-first GET /analysis, usually followed by an upload on a miss) are
+    counted apart so a fresh upload does not count as two misses in `hit_ratio`.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, memory_entries=256, max_bytes=512 * 1024 * 1024,
+                 ttl_s=7 * 24 * 3600):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # (key, version) -> (stored_at, report)
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0,
+                         "probe_hits": 0, "probe_misses": 0}
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT NOT NULL, version TEXT NOT NULL, report TEXT NOT NULL, size INTEGER NOT NULL,"
+            " stored_at REAL NOT NULL, accessed_at REAL NOT NULL, PRIMARY KEY (key, version))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed_at)")
+        self._db.commit()
+
+    def _expired(self, stored_at, now):
+        return self.ttl_s is not None and now - stored_at > self.ttl_s
+
+    def _remember(self, entry_id, stored_at, report):
+        self._memory[entry_id] = (stored_at, report)
+        self._memory.move_to_end(entry_id)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key, version, probe=False):
+        """Stored report for (key, version) as a fresh top-level dict, or None."""
+        report = self._lookup(key, version, probe)
+        if probe:
+            self._count("probe_misses" if report is None else "probe_hits")
+        return report
+
+    def _count(self, counter):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def _lookup(self, key, version, probe):
+        entry_id = (key, version)
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(entry_id)
+            if cached is not None:
+                if not self._expired(cached[0], now):
+                    self._memory.move_to_end(entry_id)
+                    if not probe:
+                        self.counters["memory_hits"] += 1
+                    return dict(cached[1])
+                del self._memory[entry_id]
+
+            row = self._db.execute(
+                "SELECT report, stored_at FROM results WHERE key = ? AND version = ?", entry_id
+            ).fetchone()
+            if row is None:
+                if not probe:
+                    self.counters["misses"] += 1
+                return None
+            if self._expired(row[1], now):
+                self._db.execute("DELETE FROM results WHERE key = ? AND version = ?", entry_id)
+                self._db.commit()
+                self.counters["expired"] += 1
+                if not probe:
+                    self.counters["misses"] += 1
+                return None
+
+            self._db.execute("UPDATE results SET accessed_at = ? WHERE key = ? AND version = ?", (now,) + entry_id)
+            self._db.commit()
+            report = json.loads(row[0])
+            self._remember(entry_id, row[1], report)
+            if not probe:
+                self.counters["disk_hits"] += 1
+            return dict(report)
+
+    def put(self, key, version, report):
+        """
+        Stores a finished report. Returns False (and leaves the report uncached) when it is
+        not JSON-serializable or the SQLite write fails; the caller's analysis stands either way.
+        """
+        try:
+            blob = json.dumps(report)
+        except (TypeError, ValueError) as e:
+            print(f"Result cache: report not serializable, not storing: {e}")
+            return False
+        now = time.time()
+        with self._lock:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, version, report, size, stored_at, accessed_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)", (key, version, blob, len(blob), now, now)
+                )
+                self._evict(now)
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"Result cache: write failed, not storing: {e}")
+                self._db.rollback()
+                return False
+            self._remember((key, version), now, dict(report))
+            self.counters["stores"] += 1
+            return True
+
+    def _evict(self, now):
+        if self.ttl_s is not None:
+            cur = self._db.execute("DELETE FROM results WHERE stored_at < ?", (now - self.ttl_s,))
+            self.counters["expired"] += cur.rowcount
+        if self.max_bytes is None:
+            return
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        victims = []
+        for key, version, size in self._db.execute("SELECT key, version, size FROM results ORDER BY accessed_at"):
+            if total <= self.max_bytes:
+                break
+            victims.append((key, version))
+            total -= size
+        self._db.executemany("DELETE FROM results WHERE key = ? AND version = ?", victims)
+        for entry_id in victims:
+            self._memory.pop(entry_id, None)
+        self.counters["evictions"] += len(victims)
+
+    def invalidate(self, version=None, keep_version=None):
+        """
+        Drops cached reports. version: only that pipeline version; keep_version: every
+        version except that one; neither: everything. Returns the number of rows removed.
+        """
+        with self._lock:
+            if version is not None:
+                cur = self._db.execute("DELETE FROM results WHERE version = ?", (version,))
+                match = lambda v: v == version
+            elif keep_version is not None:
+                cur = self._db.execute("DELETE FROM results WHERE version != ?", (keep_version,))
+                match = lambda v: v != keep_version
+            else:
+                cur = self._db.execute("DELETE FROM results")
+                match = lambda v: True
+            self._db.commit()
+            for entry_id in [e for e in self._memory if match(e[1])]:
+                del self._memory[entry_id]
+            return cur.rowcount
+
+    def stats(self):
+        with self._lock:
+            rows, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+            versions = dict(self._db.execute("SELECT version, COUNT(*) FROM results GROUP BY version").fetchall())
+            hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+            lookups = hits + self.counters["misses"]
+            probes = self.counters["probe_hits"] + self.counters["probe_misses"]
+            return {
+                "path": self.path,
+                "memory_entries": len(self._memory),
+                "memory_capacity": self.memory_entries,
+                "disk_entries": rows,
+                "disk_bytes": size,
+                "max_bytes": self.max_bytes,
+                "ttl_s": self.ttl_s,
+                "versions": versions,
+                "hit_ratio": round(hits / lookups, 4) if lookups else None,
+                "probe_hit_ratio": round(self.counters["probe_hits"] / probes, 4) if probes else None,
+                **self.counters
+            }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
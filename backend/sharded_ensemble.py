@@ -0,0 +1,339 @@
+import os
+import sys
+import subprocess
+import threading
+import time
+import atexit
+import json
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+from multiprocessing.connection import Listener, Client
+import numpy as np
+
+# Rough fp32 footprint used when a model's weights are not in the local HF cache yet
+DEFAULT_MODEL_BYTES = 350 * 1024 * 1024
+
+
+def estimate_model_bytes(name):
+    """Size of the model's cached weight file, or DEFAULT_MODEL_BYTES if unknown."""
+    try:
+        from huggingface_hub import try_to_load_from_cache
+        for filename in ["model.safetensors", "pytorch_model.bin"]:
+            path = try_to_load_from_cache(name, filename)
+            if isinstance(path, str) and os.path.exists(path):
+                return os.path.getsize(path)
+    except Exception:
+        pass
+    return DEFAULT_MODEL_BYTES
+
+
+def plan_shards(model_names, num_workers=None, strategy="per_model", model_bytes=None):
+    """
+    Splits the ensemble across worker processes.
+    - "per_model": one model per process.
+    - "memory": `num_workers` processes, greedy bin-packing by model size so heaps stay balanced.
+    """
+    if strategy == "per_model" or not num_workers or num_workers >= len(model_names):
+        return [[name] for name in model_names]
+
+    sizes = model_bytes or {name: estimate_model_bytes(name) for name in model_names}
+    shards = [[] for _ in range(num_workers)]
+    loads = [0] * num_workers
+    for name in sorted(model_names, key=lambda n: sizes.get(n, DEFAULT_MODEL_BYTES), reverse=True):
+        idx = loads.index(min(loads))
+        shards[idx].append(name)
+        loads[idx] += sizes.get(name, DEFAULT_MODEL_BYTES)
+    return [s for s in shards if s]
+
+
+def pack_views(images):
+    """
+    Copies all views into one shared-memory uint8 block.
+    Returns (shm, layout) where layout is [(offset, height, width), ...].
+    """
+    arrays = []
+    for img in images:
+        if hasattr(img, "mode") and img.mode != "RGB":
+            img = img.convert("RGB")
+        arrays.append(np.asarray(img, dtype=np.uint8))
+
+    total = sum(a.nbytes for a in arrays)
+    shm = shared_memory.SharedMemory(create=True, size=max(total, 1))
+    layout = []
+    offset = 0
+    for a in arrays:
+        h, w = a.shape[:2]
+        dst = np.ndarray((h, w, 3), dtype=np.uint8, buffer=shm.buf, offset=offset)
+        dst[...] = a.reshape(h, w, 3)
+        layout.append((offset, h, w))
+        offset += a.nbytes
+    return shm, layout
+
+
+class _ShardWorker:
+    """One worker process holding a subset of the detectors."""
+
+    def __init__(self, shard_id, model_names, engine, threads, on_status, timeout, precision="fp32",
+                 backend="torch", start_timeout=600):
+        self.shard_id = shard_id
+        self.precision = precision
+        self.backend = backend
+        self.model_names = model_names
+        self.engine = engine
+        self.threads = threads
+        self.on_status = on_status
+        self.timeout = timeout
+        # Connecting + loading the shard's models must finish within this many seconds
+        self.start_timeout = start_timeout
+
+        self.lock = threading.Lock()
+        self.ready = threading.Event()
+        self.proc = None
+        self.conn = None
+        self.listener = None
+        self.restarts = 0
+
+    def start(self):
+        """Launches the process and blocks until its models are loaded."""
+        self.ready.clear()
+        authkey = os.urandom(16)
+        self.listener = Listener(authkey=authkey)
+        cmd = [
+            sys.executable, os.path.abspath(__file__),
+            str(self.listener.address), authkey.hex(), self.engine, str(self.threads),
+            json.dumps(self.precision), self.backend
+        ] + self.model_names
+        self.proc = subprocess.Popen(cmd, cwd=os.path.dirname(os.path.abspath(__file__)))
+
+        deadline = time.monotonic() + self.start_timeout
+        try:
+            self.conn = self._accept(authkey, deadline)
+            while True:
+                # Same deadline / liveness checks while the models load
+                while not self.conn.poll(0.5):
+                    self._check_child(deadline)
+                msg = self.conn.recv()
+                if msg[0] == "status":
+                    self.on_status(msg[1], msg[2])
+                elif msg[0] == "ready":
+                    break
+            self.ready.set()
+        except Exception as e:
+            print(f"Shard {self.shard_id} failed to start: {e}")
+            self.stop()
+            for name in self.model_names:
+                self.on_status(name, "Failed")
+
+    def _check_child(self, deadline):
+        code = self.proc.poll()
+        if code is not None:
+            raise RuntimeError(f"worker exited with code {code} before it was ready")
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"worker not ready within {self.start_timeout}s")
+
+    def _accept(self, authkey, deadline):
+        """listener.accept() that gives up when the child exits or the deadline passes."""
+        result = {}
+
+        def accept():
+            try:
+                result["conn"] = self.listener.accept()
+            except Exception as e:
+                result["error"] = e
+
+        thread = threading.Thread(target=accept, daemon=True)
+        thread.start()
+        try:
+            while thread.is_alive():
+                thread.join(0.2)
+                if thread.is_alive():
+                    self._check_child(deadline)
+        except Exception:
+            # Unblock accept() with a throwaway connection so the thread does not leak
+            try:
+                Client(self.listener.address, authkey=authkey).close()
+            except Exception:
+                pass
+            thread.join(5)
+            if "conn" in result:
+                result["conn"].close()
+            raise
+        if "error" in result:
+            raise result["error"]
+        return result["conn"]
+
+    def alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def predict(self, shm_name, layout):
+        """Returns {model_name: float32 array | error string}, or None while not ready."""
+        if not self.ready.is_set():
+            return None
+
+        with self.lock:
+            try:
+                if not self.alive():
+                    raise RuntimeError("worker process died")
+                self.conn.send(("predict", shm_name, layout))
+                if not self.conn.poll(self.timeout):
+                    raise TimeoutError(f"no response within {self.timeout}s")
+                kind, payload = self.conn.recv()
+                return payload
+            except Exception as e:
+                print(f"Shard {self.shard_id} crashed ({e}); restarting...")
+                self._restart()
+                return {name: f"Worker crashed: {e}" for name in self.model_names}
+
+    def _restart(self):
+        self.ready.clear()
+        self.restarts += 1
+        self.stop()
+        for name in self.model_names:
+            self.on_status(name, "Restarting")
+        threading.Thread(target=self.start, daemon=True).start()
+
+    def stop(self):
+        for closer in [
+            lambda: self.conn.send(("stop",)),
+            lambda: self.conn.close(),
+            lambda: self.listener.close(),
+            lambda: self.proc.kill(),
+        ]:
+            try:
+                closer()
+            except Exception:
+                pass
+
+
+class ShardedEnsemble:
+    """
+    Runs the detector ensemble in a pool of worker processes.
+    - Views go to the workers once per batch through one shared-memory uint8 block.
+    - Workers return compact float32 score arrays, one per model.
+    - A crashed or hung worker is restarted in the background; its models report
+      "Error" for the batch in flight and "Restarting" until they are loaded again.
+    """
+
+    def __init__(self, model_names, num_workers=None, strategy="per_model", engine="direct",
+                 threads_per_worker=1, on_status=None, timeout=120, precision="fp32", backend="torch",
+                 start_timeout=600):
+        self.shards = plan_shards(model_names, num_workers, strategy)
+        self.workers = [
+            _ShardWorker(i, names, engine, threads_per_worker, on_status or (lambda n, s: None), timeout,
+                         precision=precision, backend=backend, start_timeout=start_timeout)
+            for i, names in enumerate(self.shards)
+        ]
+        self._executor = ThreadPoolExecutor(max_workers=len(self.workers), thread_name_prefix="shard")
+        atexit.register(self.close)
+
+    def start(self):
+        """Starts all workers in parallel and waits until each has loaded its models."""
+        # Own threads, so predict() calls are not queued behind model loading
+        threads = [threading.Thread(target=w.start, daemon=True) for w in self.workers]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    def predict(self, images):
+        """Returns {model_name: float32 array | error string} for every ready model."""
+        shm, layout = pack_views(images)
+        try:
+            replies = list(self._executor.map(lambda w: w.predict(shm.name, layout), self.workers))
+        finally:
+            shm.close()
+            shm.unlink()
+
+        scores = {}
+        for reply in replies:
+            if reply:
+                scores.update(reply)
+        return scores
+
+    def stats(self):
+        return {
+            "workers": len(self.workers),
+            "alive": sum(1 for w in self.workers if w.alive()),
+            "restarts": sum(w.restarts for w in self.workers),
+            "shards": self.shards
+        }
+
+    def close(self):
+        for w in self.workers:
+            w.stop()
+
+
+def _attach_shared_memory(name):
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        # The parent owns the block; don't let this process's tracker unlink it
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+    return shm
+
+
+def _worker_main(address, authkey, engine, threads, precision, backend, model_names):
+    conn = Client(address, authkey=authkey)
+
+    import torch
+    torch.set_num_threads(threads)
+
+    runners = {}
+    direct = None
+    if engine == "direct":
+        from inference_engine import DirectInferenceEngine
+        direct = DirectInferenceEngine(precision=precision, backend=backend, intra_threads=threads)
+    else:
+        from transformers import pipeline
+
+    for name in model_names:
+        conn.send(("status", name, "Loading"))
+        try:
+            runners[name] = direct.load(name) if direct is not None else pipeline("image-classification", model=name)
+            conn.send(("status", name, "Ready"))
+        except Exception as e:
+            print(f"[shard] Failed to load {name}: {e}", flush=True)
+            conn.send(("status", name, "Failed"))
+    conn.send(("ready",))
+
+    from inference_engine import PreprocessCache, ai_prob_from_pipeline_output
+    from PIL import Image
+
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            break
+        if msg[0] == "stop":
+            break
+
+        _, shm_name, layout = msg
+        shm = _attach_shared_memory(shm_name)
+        scores = {}
+        views = [np.ndarray((h, w, 3), dtype=np.uint8, buffer=shm.buf, offset=off) for off, h, w in layout]
+        cache = PreprocessCache(direct, views) if direct is not None else None
+        pil_views = None if direct is not None else [Image.fromarray(v.copy()) for v in views]
+        for name, runner in runners.items():
+            try:
+                if direct is not None:
+                    probs = direct.predict_ai_probs(name, cache=cache)
+                else:
+                    probs = [ai_prob_from_pipeline_output(p) for p in runner(pil_views, batch_size=4)]
+                scores[name] = np.asarray(probs, dtype=np.float32)
+            except Exception as e:
+                scores[name] = f"Error: {e}"
+
+        # Release every view of the block before closing it
+        del views, cache, pil_views
+        shm.close()
+        conn.send(("result", scores))
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    # python sharded_ensemble.py <address> <authkey hex> <engine> <threads> <precision json> <backend> <models...>
+    _worker_main(sys.argv[1], bytes.fromhex(sys.argv[2]), sys.argv[3], int(sys.argv[4]),
+                 json.loads(sys.argv[5]), sys.argv[6], sys.argv[7:])
@@ -0,0 +1,186 @@
+import os
+import json
+import time
+import threading
+from collections import deque
+
+DEFAULT_SIGNATURES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "signatures.json")
+
+# Tags that hold file-system details, not content (never scanned)
+IGNORED_TAGS = ["SourceFile", "Directory", "ExifToolVersion", "FilePermissions"]
+
+
+class AhoCorasick:
+    """
+    Case-insensitive multi-pattern matcher: one pass over the text finds every pattern.
+    Uses pyahocorasick when installed, otherwise a pure-Python automaton.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = [p.lower() for p in patterns]
+        self._native = None
+        try:
+            import ahocorasick
+            automaton = ahocorasick.Automaton()
+            for idx, p in enumerate(self.patterns):
+                if p:
+                    automaton.add_word(p, idx)
+            automaton.make_automaton()
+            self._native = automaton
+        except ImportError:
+            self._build()
+
+    def _build(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [()]
+        for idx, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            node = 0
+            for ch in pattern:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(())
+                    self.goto[node][ch] = nxt
+                node = nxt
+            self.out[node] += (idx,)
+
+        # Breadth-first failure links; outputs are merged along them
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[child] = self.goto[f].get(ch, 0)
+                self.out[child] += self.out[self.fail[child]]
+
+    def search(self, text):
+        """Set of pattern indices occurring in `text`."""
+        text = text.lower()
+        if self._native is not None:
+            return {idx for _, idx in self._native.iter(text)}
+
+        goto, fail, out = self.goto, self.fail, self.out
+        found = set()
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
+
+
+class SignatureDatabase:
+    """
+    Versioned signature list (signatures.json) compiled into one automaton.
+    - Categories ("ai", "editing", ...) map to lists of strings or {"pattern", "name"} entries.
+    - The file is re-read when its mtime changes (checked at most every `check_interval`
+      seconds) or on reload(); a broken file keeps the previous version active.
+    """
+
+    def __init__(self, path=DEFAULT_SIGNATURES_PATH, check_interval=1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._state = None  # (version, automaton, [(category, name)], {category: [names]})
+        self._mtime = None
+        self._last_check = 0.0
+        self.loaded_at = None
+        self.reloads = 0
+        self.last_error = None
+        if not self.reload():
+            self._state = self._compile({})  # run with no signatures rather than fail startup
+
+    def reload(self):
+        """Loads the file now. Returns True if the new version is active."""
+        with self._lock:
+            try:
+                mtime = os.path.getmtime(self.path)
+                with open(self.path, encoding="utf-8") as f:
+                    doc = json.load(f)
+                self._state = self._compile(doc)
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Signature database not reloaded ({self.path}): {e}")
+                return False
+            self._mtime = mtime
+            self.loaded_at = time.time()
+            self.reloads += 1
+            self.last_error = None
+            print(f"Loaded signature database v{self._state[0]}: {len(self._state[2])} patterns")
+            return True
+
+    def _compile(self, doc):
+        entries, by_category = [], {}
+        for category, items in doc.items():
+            if category == "version" or category.startswith("_") or not isinstance(items, list):
+                continue
+            for item in items:
+                pattern, name = (item["pattern"], item.get("name", item["pattern"])) if isinstance(item, dict) else (item, item)
+                entries.append((category, name, pattern))
+                by_category.setdefault(category, []).append(name)
+        automaton = AhoCorasick([p for _, _, p in entries])
+        return doc.get("version"), automaton, [(c, n) for c, n, _ in entries], by_category
+
+    def maybe_reload(self):
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        try:
+            changed = os.path.getmtime(self.path) != self._mtime
+        except OSError:
+            return
+        if changed:
+            self.reload()
+
+    def names(self, category):
+        return list(self._state[3].get(category, []))
+
+    def match(self, raw_data):
+        """
+        Scans every tag name and value once.
+        Returns {category: {signature_name: [matching tags]}}, in database order.
+        """
+        self.maybe_reload()
+        _, automaton, entries, _ = self._state
+
+        hits = {}
+        for key, value in raw_data.items():
+            if key in IGNORED_TAGS:
+                continue
+            if isinstance(value, list):
+                value = " ".join(str(v) for v in value)
+            for text in (key, str(value)):
+                for idx in automaton.search(text):
+                    hits.setdefault(idx, [])
+                    if key not in hits[idx]:
+                        hits[idx].append(key)
+
+        result = {}
+        for idx in sorted(hits):
+            category, name = entries[idx]
+            tags = result.setdefault(category, {}).setdefault(name, [])
+            tags.extend(t for t in hits[idx] if t not in tags)
+        return result
+
+    def stats(self):
+        version, _, entries, by_category = self._state
+        return {
+            "path": self.path,
+            "version": version,
+            "patterns": len(entries),
+            "categories": {c: len(n) for c, n in by_category.items()},
+            "loaded_at": self.loaded_at,
+            "reloads": self.reloads,
+            "last_error": self.last_error
+        }
@@ -0,0 +1,69 @@
+import asyncio
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    De-duplicates concurrent calls with the same key: the first caller starts the work,
+    callers arriving while it runs await the same task.
+    - Errors reach every waiter; the key is released when the task finishes, so the
+      next call after a failure starts fresh.
+    - A cancelled waiter only stops waiting. The shared task is cancelled (and its key
+      released) once the last waiter is gone; threads already running via to_thread still
+      finish in the background.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self.counters = {"started": 0, "shared": 0, "errors": 0, "cancelled_waiters": 0, "cancelled_flights": 0}
+
+    async def run(self, key, factory):
+        """
+        factory: zero-argument callable returning the coroutine to run for `key`.
+        Returns (result, shared) where shared is True if another caller's work was reused.
+        """
+        flight = self._flights.get(key)
+        shared = flight is not None
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(factory()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda task: self._finished(key, flight))
+            self.counters["started"] += 1
+        else:
+            self.counters["shared"] += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task), shared
+        except asyncio.CancelledError:
+            if flight.task.cancelled():
+                raise
+            if not flight.task.done():
+                # This caller was cancelled, not the shared work
+                self.counters["cancelled_waiters"] += 1
+                if flight.waiters == 1:
+                    # Release the key now: a call arriving before the task has unwound
+                    # must start a fresh run, not join the one being cancelled
+                    if self._flights.get(key) is flight:
+                        del self._flights[key]
+                    flight.task.cancel()
+                    self.counters["cancelled_flights"] += 1
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _finished(self, key, flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.task.cancelled() and flight.task.exception() is not None:
+            self.counters["errors"] += 1
+
+    def stats(self):
+        return {"in_flight": len(self._flights), **self.counters}
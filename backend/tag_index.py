@@ -0,0 +1,93 @@
+# When several groups carry the same tag, the first group listed wins
+# (camera-written EXIF before container/XMP copies). Unlisted groups follow in file order.
+GROUP_PRIORITY = [
+    "IFD0", "ExifIFD", "GPS", "InteropIFD", "SubIFD", "IFD1",
+    "File", "System", "PNG", "RIFF", "QuickTime", "Track1", "Track2",
+    "IPTC", "ICC_Profile", "Photoshop", "JFIF"
+]
+
+
+class TagIndex:
+    """
+    Lookup structure over a flattened {"Group:Tag": value} dict, built once per file.
+    - exact keys, lowercased keys, and every ":"-suffix ("Make", "Android:Make")
+      mapped to its fully qualified keys in group-priority order.
+    - get() follows the same rules as the old linear get_val scans:
+      exact match, then case-insensitive full key, then suffix match.
+    """
+
+    def __init__(self, raw_data, group_priority=GROUP_PRIORITY):
+        self.raw = raw_data
+        rank = {g: i for i, g in enumerate(group_priority)}
+        ordered = sorted(
+            enumerate(raw_data),
+            key=lambda item: (rank.get(item[1].split(":", 1)[0], len(rank)) if ":" in item[1] else -1, item[0])
+        )
+        self.keys = [k for _, k in ordered]
+
+        self._lower = {}
+        self._suffix = {}
+        for key in self.keys:
+            self._lower.setdefault(key.lower(), key)
+            parts = key.split(":")
+            for i in range(1, len(parts)):
+                self._suffix.setdefault(":".join(parts[i:]), []).append(key)
+        self._contains_cache = {}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, name):
+        """Fully qualified key for `name`, or None."""
+        if name in self.raw:
+            return name
+        key = self._lower.get(name.lower())
+        if key is not None:
+            return key
+        matches = self._suffix.get(name)
+        return matches[0] if matches else None
+
+    def get(self, keys, default="Unknown"):
+        """First found value (as str) among `keys`, or `default`."""
+        if isinstance(keys, str):
+            keys = [keys]
+        for name in keys:
+            key = self.lookup(name)
+            if key is not None:
+                return str(self.raw[key])
+        return default
+
+    def find_all(self, name):
+        """Every fully qualified key whose tag (or tag path) is `name`, in priority order."""
+        return list(self._suffix.get(name, []))
+
+    def keys_containing(self, text):
+        """Keys whose lowercased name contains `text` (cached per query)."""
+        text = text.lower()
+        if text not in self._contains_cache:
+            self._contains_cache[text] = [k for k in self.keys if text in k.lower()]
+        return self._contains_cache[text]
+
+    def any_key_contains(self, text, case_sensitive=True):
+        if case_sensitive:
+            return any(text in k for k in self.keys_containing(text))
+        return bool(self.keys_containing(text))
+
+    def items(self):
+        return ((k, self.raw[k]) for k in self.keys)
+
+
+def legacy_get_val(raw_data, keys, default="Unknown"):
+    """The original linear lookup, kept for the benchmark and parity checks."""
+    if isinstance(keys, str):
+        keys = [keys]
+    for k in keys:
+        if k in raw_data:
+            return str(raw_data[k])
+        for clean_key in raw_data.keys():
+            if clean_key.lower() == k.lower():
+                return str(raw_data[clean_key])
+        for rk in raw_data.keys():
+            if rk.endswith(f":{k}") or rk.split(":")[-1] == k:
+                return str(raw_data[rk])
+    return default
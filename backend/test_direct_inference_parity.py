@@ -0,0 +1,69 @@
+import os
+import sys
+from PIL import Image
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from model_manager import DETECTOR_MODEL_NAMES
+from inference_engine import DirectInferenceEngine, ai_prob_from_pipeline_output
+
+# Max allowed difference in ai_prob between pipeline and direct engine
+PARITY_TOLERANCE = 1e-4
+
+
+def build_views():
+    """Original + two resizes + a few crops, like predict_full_suite."""
+    test_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_v2.jpg")
+    if os.path.exists(test_file):
+        base = Image.open(test_file).convert("RGB")
+    else:
+        base = Image.fromarray(np.random.RandomState(0).randint(0, 255, (512, 512, 3), dtype=np.uint8))
+
+    w, h = base.size
+    views = [base, base.resize((w // 2, h // 2)), base.resize((w // 4, h // 4))]
+    views += [base.crop((0, 0, w // 4, h // 4)), base.crop((w // 2, h // 2, 3 * w // 4, 3 * h // 4))]
+    return views
+
+
+def test_direct_inference_parity(model_names=None):
+    from transformers import pipeline
+
+    print("--- Direct Inference Parity Test ---")
+    model_names = model_names or DETECTOR_MODEL_NAMES
+    views = build_views()
+    engine = DirectInferenceEngine()
+    failures = []
+    compared = 0
+
+    for name in model_names:
+        print(f"Checking {name}...")
+        try:
+            pipe = pipeline("image-classification", model=name)
+            engine.load(name)
+        except Exception as e:
+            print(f"  SKIP: could not load ({e})")
+            continue
+
+        compared += 1
+        expected = np.array([ai_prob_from_pipeline_output(p) for p in pipe(views, batch_size=4)])
+        actual = engine.predict_ai_probs(name, views)
+
+        max_diff = float(np.max(np.abs(expected - actual)))
+        verdicts_match = bool(np.all((expected > 0.5) == (actual > 0.5)))
+        print(f"  max |diff| = {max_diff:.2e}, verdicts match: {verdicts_match}")
+
+        if max_diff > PARITY_TOLERANCE or not verdicts_match:
+            failures.append(name)
+
+    # Offline or uncached weights skip every model; that is not a pass
+    assert compared, "FAIL: no model could be loaded, nothing was compared"
+    if failures:
+        print(f"FAIL: parity mismatch for {failures}")
+    else:
+        print(f"SUCCESS: direct engine matches pipeline outputs ({compared}/{len(model_names)} models compared).")
+    assert not failures
+
+
+if __name__ == "__main__":
+    test_direct_inference_parity(sys.argv[1:] or None)
@@ -0,0 +1,79 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from model_manager import ModelManager, PATCH_HOTSPOT_CONFIDENCE
+from ensemble_cascade import EnsembleCascade
+from batch_scheduler import BatchScheduler
+
+# AI probability per model for each view; views are plain ints standing in for images.
+# Every view is settled "Real" after three models, but the later models push the
+# original view's votes and average confidence around without flipping it.
+SCORES = {
+    "m0": [0.05, 0.05, 0.05],
+    "m1": [0.05, 0.05, 0.05],
+    "m2": [0.05, 0.05, 0.05],
+    "m3": [0.90, 0.90, 0.90],
+    "m4": [0.90, 0.90, 0.90],
+}
+
+
+class FakeManager(ModelManager):
+    """ModelManager wired to fixed scores: no model downloads, no inference engine."""
+
+    def __init__(self, cascade=True, batching=False):
+        self.model_names = list(SCORES)
+        self.models = {name: name for name in SCORES}
+        self.model_weights = {name: 1.0 for name in SCORES}
+        self.loading_status = {name: "Loaded" for name in SCORES}
+        self.inference_engine = None
+        self.sharded = None
+        self.model_executor = None
+        self.cascade = EnsembleCascade() if cascade else None
+        self.batch_scheduler = BatchScheduler(self._collect_predictions) if batching else None
+        # Fixed order so the cheap, confident "Real" models run first
+        if self.cascade is not None:
+            self.cascade.order = lambda names: list(names)
+
+    def _predict_ai_probs(self, name, pipe, images, cache=None, indices=None):
+        return [SCORES[name][view] for view in images]
+
+
+def summaries(manager, full_views):
+    results, _ = manager._run_ensemble_batch_timed([0, 1, 2], full_views=full_views)
+    return [r["summary"] for r in results]
+
+
+def test_ensemble_cascade():
+    print("--- Ensemble Cascade Test (full views vs early exit) ---")
+    full = summaries(FakeManager(cascade=False), [0])
+
+    for batching in (False, True):
+        manager = FakeManager(batching=batching)
+        cascaded = summaries(manager, [0])
+        print(f"  batching={batching}: original {cascaded[0]} | exited {cascaded[1]}")
+
+        # Fusion reads votes, model count and average confidence of the original view
+        assert cascaded[0] == full[0], (cascaded[0], full[0])
+        # Other views may exit early, but never with a different consensus
+        for view in (1, 2):
+            assert cascaded[view]["consensus"] == full[view]["consensus"]
+            assert cascaded[view]["total_models"] == 3
+        assert manager.cascade.stats()["model_runs_skipped"] == 4
+
+    # Three confident AI votes with two models left settle the consensus (worst case 60%),
+    # but a patch could still end on either side of the hotspot cut
+    assert EnsembleCascade().is_decided(3.0, 3.0, 2.0)
+    assert not EnsembleCascade(confidence_thresholds=(PATCH_HOTSPOT_CONFIDENCE,)).is_decided(3.0, 3.0, 2.0)
+    assert EnsembleCascade(confidence_thresholds=(PATCH_HOTSPOT_CONFIDENCE,)).is_decided(5.0, 5.0, 1.0)
+
+    # Without a full view every view is allowed to exit early
+    manager = FakeManager()
+    assert summaries(manager, [])[0]["total_models"] == 3
+    assert manager.cascade.stats()["model_runs_skipped"] == 6
+    print("SUCCESS: the original view matches a full ensemble run; other views keep their consensus.")
+
+
+if __name__ == "__main__":
+    test_ensemble_cascade()
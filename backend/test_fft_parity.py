@@ -0,0 +1,108 @@
+import os
+import sys
+import numpy as np
+import cv2
+import pywt
+from PIL import Image
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from forensic_engine import ForensicEngine
+from forensic_context import ForensicContext
+from fft_engine import legacy_fft_energy
+
+CORPUS_EXTS = (".jpg", ".jpeg", ".png", ".webp")
+FFT_THRESHOLD = 175
+DWT_THRESHOLD = 0.0002
+# Tiled estimates closer than this to the FFT threshold are reported, not asserted
+TILED_MARGIN = 3.0
+
+
+def legacy_frequency(gray):
+    """fft_verdict / dwt_verdict exactly as the engine computed them before FFTEngine."""
+    fft_energy = legacy_fft_energy(gray)
+    LL, (LH, HL, HH) = pywt.dwt2(gray, 'haar')
+    e_HH = np.sum(HH**2)
+    hh_ratio = e_HH / (np.sum(LL**2) + np.sum(LH**2) + np.sum(HL**2) + e_HH + 1e-7)
+    return {
+        "fft_energy": fft_energy,
+        "fft_verdict": "Artificial/Regular" if fft_energy > FFT_THRESHOLD else "Natural",
+        "dwt_verdict": "Synthetic Dropoff" if hh_ratio < DWT_THRESHOLD else "Natural Detail"
+    }
+
+
+def pink_noise(rows, cols, beta, rng):
+    fr = np.fft.fftfreq(rows)[:, None]
+    fc = np.fft.rfftfreq(cols)[None, :]
+    f = np.sqrt(fr**2 + fc**2)
+    f[0, 0] = 1
+    spec = (rng.normal(size=f.shape) + 1j * rng.normal(size=f.shape)) / f**beta
+    x = np.fft.irfft2(spec, s=(rows, cols))
+    return np.clip((x - x.mean()) / x.std() * 40 + 128, 0, 255).astype(np.uint8)
+
+
+def synthetic_corpus(seed=0):
+    """Gray images on both sides of both thresholds, odd/even/tiny sizes."""
+    rng = np.random.default_rng(seed)
+    yield "flat_48x40", np.full((40, 48), 128, np.uint8)
+    yield "noise_61x97", rng.integers(0, 256, (61, 97), dtype=np.uint8)
+    yield "gradient_480x640", np.tile(np.linspace(0, 255, 640, dtype=np.float32), (480, 1)).astype(np.uint8)
+    for rows, cols, beta in [(480, 640, 1.0), (1201, 1599, 1.3), (3000, 4000, 1.0), (3000, 4000, 0.6)]:
+        yield f"pink{beta}_{rows}x{cols}", pink_noise(rows, cols, beta, rng)
+    grid = pink_noise(2448, 3264, 1.0, rng).astype(np.int16)
+    grid[::8, :] += 30
+    grid[:, ::8] += 30
+    yield "grid_2448x3264", np.clip(grid, 0, 255).astype(np.uint8)
+    yield "noise_3000x4000", rng.integers(0, 256, (3000, 4000), dtype=np.uint8)
+
+
+def file_corpus(corpus_dir):
+    for name in sorted(os.listdir(corpus_dir)):
+        if name.lower().endswith(CORPUS_EXTS):
+            with Image.open(os.path.join(corpus_dir, name)) as img:
+                yield name, cv2.cvtColor(np.array(img.convert("RGB")), cv2.COLOR_RGB2GRAY)
+
+
+def engine_frequency(engine, gray):
+    ctx = ForensicContext(Image.fromarray(np.dstack([gray] * 3)))
+    assert np.array_equal(ctx.gray_u8, gray)
+    return {**engine._metric_fft(ctx), **engine._metric_dwt(ctx)}
+
+
+def test_fft_parity(corpus_dir=None):
+    print("--- FFT Engine Parity Test ---")
+    corpus_dir = corpus_dir or os.path.dirname(os.path.abspath(__file__))
+    exact = ForensicEngine()
+    tiled = ForensicEngine(fft_max_pixels=2_000_000)
+    failures, borderline = [], []
+
+    for name, gray in list(file_corpus(corpus_dir)) + list(synthetic_corpus()):
+        ref = legacy_frequency(gray)
+        got = engine_frequency(exact, gray)
+        est = engine_frequency(tiled, gray)
+        print(f"  {name:20s} legacy {ref['fft_energy']:9.3f} | exact {got['fft_energy'] - ref['fft_energy']:+.1e} "
+              f"| {est['fft_mode']} {est['fft_energy'] - ref['fft_energy']:+7.3f} | {ref['fft_verdict']}, {ref['dwt_verdict']}")
+
+        for key in ("fft_verdict", "dwt_verdict"):
+            if got[key] != ref[key]:
+                failures.append(f"{name}: exact {key} {got[key]!r} != {ref[key]!r}")
+        # float32 rounding; spectra with exact zeros (e.g. perfectly repeating rows) sit on the
+        # 1e-7 floor in float64 and differ most, far below the threshold
+        if abs(got["fft_energy"] - ref["fft_energy"]) > 5e-3 * max(1.0, abs(ref["fft_energy"])):
+            failures.append(f"{name}: exact fft_energy {got['fft_energy']} != {ref['fft_energy']}")
+        if est["fft_verdict"] != ref["fft_verdict"]:
+            if abs(ref["fft_energy"] - FFT_THRESHOLD) > TILED_MARGIN:
+                failures.append(f"{name}: tiled fft_verdict {est['fft_verdict']!r} != {ref['fft_verdict']!r}")
+            else:
+                borderline.append(name)
+
+    if borderline:
+        print(f"Within {TILED_MARGIN} of the threshold, tiled verdict differs: {', '.join(borderline)}")
+    for f in failures:
+        print(f"  FAIL {f}")
+    assert not failures
+    print("SUCCESS: FFT engine reproduces fft_verdict / dwt_verdict.")
+
+
+if __name__ == "__main__":
+    test_fft_parity(sys.argv[1] if len(sys.argv) > 1 else None)
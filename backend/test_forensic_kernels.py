@@ -0,0 +1,79 @@
+import os
+import sys
+import numpy as np
+from PIL import Image
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from forensic_engine import ForensicEngine
+from forensic_context import ForensicContext
+from test_fft_parity import CORPUS_EXTS, pink_noise
+
+# Saturation is the same formula in float32 vs float64
+SAT_TOLERANCE = 1e-6
+# OpenCV's Canny rounds gradient directions to 4 sectors where skimage interpolates,
+# so single edge pixels differ; the density stays within a few percent
+EDGE_REL_TOLERANCE = 0.06
+EDGE_ABS_TOLERANCE = 2e-3
+
+
+def synthetic_corpus(seed=0):
+    """RGB images: flat, black, gray, saturated, smooth and textured, odd sizes."""
+    rng = np.random.default_rng(seed)
+    yield "black_40x48", np.zeros((40, 48, 3), np.uint8)
+    yield "flat_61x97", np.full((61, 97, 3), (200, 40, 90), np.uint8)
+    gray = pink_noise(480, 640, 1.0, rng)
+    yield "gray_pink_480x640", np.dstack([gray] * 3)
+    x = np.linspace(0, 255, 640, dtype=np.float32)
+    yield "gradient_480x640", np.dstack([np.tile(x, (480, 1)), np.tile(x[::-1], (480, 1)),
+                                         np.full((480, 640), 128, np.float32)]).astype(np.uint8)
+    for rows, cols, beta in [(480, 640, 1.0), (1201, 1599, 1.3), (1201, 1599, 0.6)]:
+        yield f"pink{beta}_{rows}x{cols}", np.dstack([pink_noise(rows, cols, beta, rng) for _ in range(3)])
+    vivid = np.dstack([pink_noise(1024, 768, 1.0, rng), np.zeros((1024, 768), np.uint8),
+                       255 - pink_noise(1024, 768, 1.0, rng)])
+    yield "vivid_1024x768", vivid
+    yield "noise_301x401", rng.integers(0, 256, (301, 401, 3), dtype=np.uint8)
+
+
+def file_corpus(corpus_dir):
+    for name in sorted(os.listdir(corpus_dir)):
+        if name.lower().endswith(CORPUS_EXTS):
+            with Image.open(os.path.join(corpus_dir, name)) as img:
+                yield name, np.array(img.convert("RGB"))
+
+
+def step_metrics(engine, rgb):
+    ctx = ForensicContext(Image.fromarray(rgb))
+    color = engine._metric_saturation(ctx)
+    structure = engine._metric_edges(ctx)
+    return color["sat_mean"], color["sat_verdict"], structure["edge_density"]
+
+
+def test_forensic_kernels(corpus_dir=None):
+    print("--- Forensic Kernels Tolerance Test (opencv vs skimage) ---")
+    corpus_dir = corpus_dir or os.path.dirname(os.path.abspath(__file__))
+    legacy = ForensicEngine(kernels="skimage")
+    fast = ForensicEngine(kernels="opencv")
+    failures = []
+
+    for name, rgb in list(file_corpus(corpus_dir)) + list(synthetic_corpus()):
+        ref_sat, ref_verdict, ref_edges = step_metrics(legacy, rgb)
+        sat, verdict, edges = step_metrics(fast, rgb)
+        print(f"  {name:20s} sat_mean {ref_sat:.6f} ({sat - ref_sat:+.1e}) | "
+              f"edge_density {ref_edges:.5f} vs {edges:.5f} | {ref_verdict}")
+
+        if abs(sat - ref_sat) > SAT_TOLERANCE:
+            failures.append(f"{name}: sat_mean {sat} != {ref_sat}")
+        if verdict != ref_verdict:
+            failures.append(f"{name}: sat_verdict {verdict!r} != {ref_verdict!r}")
+        if abs(edges - ref_edges) > max(EDGE_REL_TOLERANCE * ref_edges, EDGE_ABS_TOLERANCE):
+            failures.append(f"{name}: edge_density {edges} vs {ref_edges}")
+
+    for f in failures:
+        print(f"  FAIL {f}")
+    assert not failures
+    print("SUCCESS: OpenCV kernels stay within tolerance of the skimage implementation.")
+
+
+if __name__ == "__main__":
+    test_forensic_kernels(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,46 @@
+import os
+import sys
+from PIL import Image
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from forensic_engine import ForensicEngine, SKIPPED
+
+
+def test_forensic_metrics(image_path=None):
+    print("--- Forensic Metric Registry Test (aggregate vs full) ---")
+    image_path = image_path or os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_v2.jpg")
+    engine = ForensicEngine()
+    with Image.open(image_path) as img:
+        image = img.convert("RGB")
+
+    full = engine.analyze(image, "full")
+    aggregate = engine.analyze(image, "aggregate")
+    print(f"  full      computed {full['metrics']['computed']}")
+    print(f"  aggregate computed {aggregate['metrics']['computed']}, skipped {aggregate['metrics']['skipped']}")
+
+    # Every metric runs for full detail; aggregate runs only the score and its inputs
+    assert full["metrics"]["skipped"] == []
+    assert aggregate["metrics"]["computed"] == ["camera", "fft", "saturation", "aggregate"]
+    assert aggregate["metrics"]["skipped"] == ["dwt", "ela", "physics", "edges"]
+    assert aggregate["forensic_aggregate_score"] == full["forensic_aggregate_score"]
+
+    # Same report shape; skipped fields are explicit, computed ones match full detail
+    for section in ("camera", "frequency", "color", "physical", "structural"):
+        assert list(aggregate[section]) == list(full[section]), section
+        for field, value in aggregate[section].items():
+            assert value == SKIPPED or value == full[section][field], (section, field)
+    assert aggregate["frequency"]["dwt_verdict"] == SKIPPED
+    assert aggregate["structural"]["edge_density"] == SKIPPED
+    assert set(aggregate["timing"]["steps"]) == {"camera", "fft", "saturation", "aggregate"}
+
+    try:
+        engine.analyze(image, "everything")
+        raise AssertionError("unknown detail accepted")
+    except ValueError:
+        pass
+    print("SUCCESS: aggregate detail computes only the fusion score's metrics.")
+
+
+if __name__ == "__main__":
+    test_forensic_metrics(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,182 @@
+import os
+import io
+import sys
+import json
+import tempfile
+import subprocess
+from PIL import Image
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import fast_metadata
+from metadata_engine import MetadataEngine
+
+CORPUS_EXTS = (".jpg", ".jpeg", ".png", ".webp")
+
+# Report fields the fast path must reproduce exactly
+REPORT_FIELDS = [
+    ("camera_info", "device_make"), ("camera_info", "device_model"), ("camera_info", "capture_timestamp"),
+    ("camera_info", "gps_location"), ("software_trace", "capturing_software"),
+    ("software_trace", "ai_tool_detected"), ("software_trace", "ai_tool_name"),
+    ("software_trace", "editing_software"), ("metadata_based_conclusion", "metadata_reliability"),
+    ("metadata_based_conclusion", "has_make_model"), ("metadata_based_conclusion", "ai_generated_likelihood"),
+    ("metadata_completeness", "xmp_metadata"), ("metadata_completeness", "icc_profile")
+]
+
+
+# ExifTool groups the fast path does not reproduce: file/system properties, composites,
+# and numeric headers (ICC-header, ICC-chrm, ... and WebP frame headers)
+KNOWN_DIFFERENCE_GROUPS = {"File", "System", "ExifTool", "Composite", "RIFF"}
+
+
+def known_difference(key):
+    group, sep, name = key.partition(":")
+    if not sep:
+        return True  # SourceFile
+    if group in KNOWN_DIFFERENCE_GROUPS or group.startswith("ICC-"):
+        return True
+    # Only text-valued ICC tags can carry a signature; curves and matrices are skipped
+    return group == "ICC_Profile" and name not in fast_metadata.ICC_TEXT_TAGS.values()
+
+
+def flatten(d, parent_key=""):
+    out = {}
+    for k, v in d.items():
+        key = f"{parent_key}:{k}" if parent_key else k
+        if isinstance(v, dict):
+            out.update(flatten(v, key))
+        else:
+            out[key] = v
+    return out
+
+
+def exiftool_tags(engine, path):
+    cmd = [engine.exiftool_path, "-json", "-G", "-a", "-u", "-g1", path]
+    result = subprocess.run(cmd, capture_output=True, text=True, encoding="utf-8", errors="ignore")
+    return flatten(json.loads(result.stdout)[0])
+
+
+def normalize(v):
+    if isinstance(v, list):
+        return [normalize(x) for x in v]
+    return str(v).strip()
+
+
+def check_file(engine, path):
+    """Returns (status, problems) where status is "native", "fallback" or "mismatch"."""
+    with open(path, "rb") as f:
+        content = f.read()
+    try:
+        fast = fast_metadata.parse(content)
+    except fast_metadata.Unsupported as e:
+        return "fallback", [str(e)]
+
+    reference = exiftool_tags(engine, path)
+    problems = []
+
+    # 1. Every tag the fast path emits must match ExifTool's value
+    for key, value in fast.items():
+        if key not in reference:
+            problems.append(f"extra tag {key}")
+        elif normalize(value) != normalize(reference[key]):
+            problems.append(f"{key}: fast={value!r} exiftool={reference[key]!r}")
+
+    # 2. Every ExifTool tag must appear natively (otherwise the file should have fallen back)
+    for key in reference:
+        if key not in fast and not known_difference(key):
+            problems.append(f"missing tag {key}={reference[key]!r}")
+
+    # 3. The report built from either source must agree on the fields that drive the verdict
+    fast_report = engine._process_exiftool_data(fast, path)
+    ref_report = engine._process_exiftool_data(reference, path)
+    for section, field in REPORT_FIELDS:
+        a, b = fast_report[section].get(field), ref_report[section].get(field)
+        if section == "software_trace" and field in ("ai_tool_name", "editing_software"):
+            a, b = sorted(str(a).split(", ")), sorted(str(b).split(", "))
+        if a != b:
+            problems.append(f"report {section}.{field}: fast={a!r} exiftool={b!r}")
+
+    return ("mismatch" if problems else "native"), problems
+
+
+def jpeg_with_exif(tags):
+    exif = Image.Exif()
+    for tag_id, value in tags.items():
+        exif[tag_id] = value
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), (90, 120, 150)).save(buffer, "JPEG", exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+# AI signatures in EXIF tags: covered ones must be emitted natively, uncovered ones must
+# make the fast path fall back to ExifTool instead of being dropped
+SIGNATURE_CASES = [
+    ("covered_hostcomputer_xpcomment", True, {
+        0x0110: "Workstation", 0x013c: "ComfyUI workstation",
+        0x9c9c: "Stable Diffusion".encode("utf-16-le") + b"\x00\x00"}),
+    ("uncovered_documentname", False, {0x0110: "Workstation", 0x010d: "Stable Diffusion"})
+]
+
+
+def check_signature_cases(engine):
+    """Returns (cases, problems); ExifTool is only needed for the fallback verdict."""
+    problems, cases = [], []
+    for name, covered, exif_tags in SIGNATURE_CASES:
+        content = jpeg_with_exif(exif_tags)
+        try:
+            fast_metadata.parse(content)
+            native = True
+        except fast_metadata.Unsupported:
+            native = False
+        if native != covered:
+            problems.append(f"{name}: native={native}, expected {covered}")
+        if native or engine.exiftool_path:
+            report = engine.analyze(content, file_ext=".jpg")
+            if report.get("ai_indicators", {}).get("ai_software_signature") != "Yes":
+                problems.append(f"{name}: signature not detected ({report.get('extraction')})")
+        cases.append((name, content))
+    return cases, problems
+
+
+def test_metadata_conformance(corpus_dir=None):
+    print("--- Native Metadata Parser Conformance Test ---")
+    corpus_dir = corpus_dir or os.path.dirname(os.path.abspath(__file__))
+    engine = MetadataEngine(use_pool=False)
+
+    cases, problems = check_signature_cases(engine)
+    for p in problems:
+        print(f"  FAIL {p}")
+    assert not problems
+    print(f"{len(cases)} signature cases: covered tags native, uncovered tags fall back.")
+
+    if not engine.exiftool_path:
+        print("SKIP: ExifTool not found, nothing to compare against.")
+        return
+
+    files = sorted(os.path.join(corpus_dir, f) for f in os.listdir(corpus_dir) if f.lower().endswith(CORPUS_EXTS))
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, content in cases:
+            path = os.path.join(tmp, f"{name}.jpg")
+            with open(path, "wb") as f:
+                f.write(content)
+            files.append(path)
+        counts = {"native": 0, "fallback": 0, "mismatch": 0}
+        for path in files:
+            status, problems = check_file(engine, path)
+            counts[status] += 1
+            if status != "native":
+                print(f"  {status.upper()}: {os.path.basename(path)}")
+                for p in problems[:10]:
+                    print(f"    {p}")
+
+    print(f"{len(files)} files: {counts['native']} native, {counts['fallback']} ExifTool fallback, "
+          f"{counts['mismatch']} mismatched")
+    if counts["mismatch"]:
+        print("FAIL: fast path disagrees with ExifTool.")
+    else:
+        print("SUCCESS: fast path matches ExifTool on every file it handles.")
+    assert not counts["mismatch"]
+
+
+if __name__ == "__main__":
+    test_metadata_conformance(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from result_cache import ResultCache, content_key, pipeline_fingerprint
+
+
+def test_result_cache():
+    print("--- Result Cache Test ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "results.sqlite3")
+        v1 = pipeline_fingerprint({"models": ["a", "b"], "thresholds": {"x": 0.5}})
+        v2 = pipeline_fingerprint({"models": ["a", "b"], "thresholds": {"x": 0.6}})
+        assert v1 != v2 and v1 == pipeline_fingerprint({"thresholds": {"x": 0.5}, "models": ["a", "b"]})
+
+        key = content_key(b"same bytes")
+        cache = ResultCache(path, memory_entries=2, max_bytes=10_000, ttl_s=60)
+        assert cache.get(key, v1) is None
+        cache.put(key, v1, {"classification": "Real / Authentic"})
+
+        # Callers may annotate the returned report without touching the cached copy
+        hit = cache.get(key, v1)
+        hit["cache"] = {"hit": True}
+        assert cache.get(key, v1) == {"classification": "Real / Authentic"}
+        assert cache.get(key, v2) is None, "report leaked across pipeline versions"
+
+        # Unserializable reports and failed writes are reported, not raised
+        assert cache.put(content_key(b"odd"), v1, {"value": object()}) is False
+        assert cache.get(content_key(b"odd"), v1) is None
+
+        # Hash-first probes are counted apart from upload lookups
+        before = dict(cache.counters)
+        assert cache.get(content_key(b"new upload"), v1, probe=True) is None
+        assert cache.get(key, v1, probe=True) == {"classification": "Real / Authentic"}
+        for counter in ("memory_hits", "disk_hits", "misses"):
+            assert cache.counters[counter] == before[counter], counter
+        assert cache.counters["probe_hits"] == 1 and cache.counters["probe_misses"] == 1
+        assert cache.stats()["probe_hit_ratio"] == 0.5
+
+        # Disk tier survives a restart
+        cache.close()
+        cache = ResultCache(path, memory_entries=2, max_bytes=10_000, ttl_s=60)
+        assert cache.get(key, v1) == {"classification": "Real / Authentic"}
+        assert cache.counters["disk_hits"] == 1
+
+        # Size eviction drops the least recently used rows
+        for i in range(40):
+            cache.put(content_key(str(i).encode()), v1, {"payload": "x" * 400})
+        stats = cache.stats()
+        assert stats["disk_bytes"] <= 10_000 and stats["evictions"] > 0
+        assert cache.get(key, v1) is None
+
+        # Invalidation by version
+        cache.put(key, v2, {"classification": "AI Generated"})
+        removed = cache.invalidate(keep_version=v2)
+        assert removed > 0 and cache.get(key, v2) is not None
+        assert cache.invalidate(version=v2) == 1 and cache.get(key, v2) is None
+
+        # A failed SQLite write leaves the cache usable
+        broken = ResultCache(os.path.join(tmp, "broken.sqlite3"))
+        broken._db.execute("DROP TABLE results")
+        assert broken.put(key, v1, {"classification": "Real / Authentic"}) is False
+        broken.close()
+
+        # TTL
+        cache.ttl_s = 0.05
+        cache.put(key, v1, {"classification": "Real / Authentic"})
+        time.sleep(0.1)
+        assert cache.get(key, v1) is None
+        print(cache.stats())
+        cache.close()
+    print("SUCCESS: result cache hits, evicts, expires and invalidates by version.")
+
+
+if __name__ == "__main__":
+    test_result_cache()
@@ -0,0 +1,96 @@
+import os
+import sys
+import asyncio
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from single_flight import SingleFlight
+
+
+async def _sharing(flights):
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"classification": "Real / Authentic"}
+
+    results = await asyncio.gather(*(flights.run("k", work) for _ in range(5)))
+    assert len(calls) == 1, "concurrent callers ran the work more than once"
+    assert [shared for _, shared in results] == [False, True, True, True, True]
+    assert all(report == {"classification": "Real / Authentic"} for report, _ in results)
+
+    # Finished flights release the key: the next call starts fresh
+    await flights.run("k", work)
+    assert len(calls) == 2
+
+
+async def _errors(flights):
+    calls = []
+
+    async def fail():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        raise RuntimeError("engine crashed")
+
+    results = await asyncio.gather(*(flights.run("e", fail) for _ in range(3)), return_exceptions=True)
+    assert len(calls) == 1
+    assert all(isinstance(r, RuntimeError) for r in results), results
+
+    # A failure is not sticky
+    async def ok():
+        return "ok"
+    assert await flights.run("e", ok) == ("ok", False)
+
+
+async def _cancellation(flights):
+    started = []
+
+    async def work(tag):
+        started.append(tag)
+        try:
+            await asyncio.sleep(0.2)
+        except asyncio.CancelledError:
+            # Cleanup still running when the next caller arrives
+            await asyncio.sleep(0.05)
+            raise
+        return tag
+
+    # One of two waiters cancelled: the other still gets the shared result
+    a = asyncio.ensure_future(flights.run("c", lambda: work("a")))
+    b = asyncio.ensure_future(flights.run("c", lambda: work("b")))
+    await asyncio.sleep(0.01)
+    a.cancel()
+    assert await b == ("a", True)
+    assert a.cancelled()
+
+    # Last waiter cancelled: a caller arriving while the task unwinds starts its own run
+    started.clear()
+    first = asyncio.ensure_future(flights.run("c", lambda: work("first")))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    await asyncio.sleep(0)
+    second = await flights.run("c", lambda: work("second"))
+    assert second == ("second", False), second
+    assert started == ["first", "second"]
+    assert first.cancelled()
+
+
+def test_single_flight():
+    print("--- Single Flight Test ---")
+    flights = SingleFlight()
+    asyncio.run(_sharing(flights))
+    print("  sharing: one run per key, every waiter gets the result")
+    asyncio.run(_errors(flights))
+    print("  errors: fanned out to every waiter, next call starts fresh")
+    asyncio.run(_cancellation(flights))
+    print("  cancellation: other waiters unaffected, newcomers never join a cancelled run")
+    stats = flights.stats()
+    print(f"  stats: {stats}")
+    assert stats["in_flight"] == 0
+    assert stats["errors"] == 1 and stats["cancelled_flights"] == 1 and stats["cancelled_waiters"] == 2
+    print("SUCCESS: single flight shares, propagates errors and cancels correctly.")
+
+
+if __name__ == "__main__":
+    test_single_flight()
@@ -1,6 +1,9 @@
 import React, { useState } from 'react';
 import { Upload, Image, Video, CheckCircle, XCircle, AlertCircle, Activity, FileText, Zap, BarChart3, Eye, Grid } from 'lucide-react';
 
+// Hash-first lookups hash the whole file in memory; above this size just upload it
+const HASH_LOOKUP_MAX_BYTES = 64 * 1024 * 1024;
+
 const App = () => {
   const [file, setFile] = useState(null);
   const [preview, setPreview] = useState(null);
@@ -70,12 +73,50 @@ const App = () => {
     }
   };
 
+  // Scores are numbers, or "not evaluated" when a fast verdict skipped ML/forensics
+  const formatPercent = (value) => (typeof value === 'number' ? `${value}%` : value);
+
+  // Verdict badge for a score; skipped scores get a neutral badge instead of a verdict
+  const scoreBadge = (value, highLabel, lowLabel) => {
+    if (typeof value !== 'number') return { className: 'bg-gray-500/20 text-gray-400', label: 'Not evaluated' };
+    return value > 50
+      ? { className: 'bg-red-500/20 text-red-400', label: highLabel }
+      : { className: 'bg-green-500/20 text-green-400', label: lowLabel };
+  };
+
+  // Hex SHA-256 of the file via WebCrypto (null when unavailable, e.g. plain-http origins).
+  // WebCrypto only hashes whole buffers, so large files skip the lookup and upload directly.
+  const hashFile = async (blob) => {
+    try {
+      if (!window.crypto?.subtle || blob.size > HASH_LOOKUP_MAX_BYTES) return null;
+      const digest = await window.crypto.subtle.digest('SHA-256', await blob.arrayBuffer());
+      return Array.from(new Uint8Array(digest)).map((b) => b.toString(16).padStart(2, '0')).join('');
+    } catch (e) {
+      console.warn("Hashing failed, uploading directly:", e);
+      return null;
+    }
+  };
+
   const analyzeContent = async () => {
     if (!file) return;
 
     setAnalyzing(true);
 
     try {
+      // Ask for a stored report by content hash first; upload on a miss or any lookup failure
+      const sha256 = await hashFile(file);
+      if (sha256) {
+        try {
+          const cached = await fetch(`/analysis/${sha256}`);
+          if (cached.ok) {
+            setResults(await cached.json());
+            return;
+          }
+        } catch (e) {
+          console.warn("Stored analysis lookup failed, uploading directly:", e);
+        }
+      }
+
       const formData = new FormData();
       formData.append('file', file);
 
@@ -317,9 +358,9 @@ const App = () => {
                       {/* ML Score */}
                       <div className="bg-black/20 p-4 rounded-lg border border-purple-500/20 text-center">
                         <p className="text-gray-400 text-xs uppercase mb-1">ML Consensus</p>
-                        <p className="text-2xl font-bold text-white mb-1">{results.score_breakdown.ml_confidence}%</p>
-                        <span className={`text-xs px-2 py-0.5 rounded font-bold ${results.score_breakdown.ml_confidence > 50 ? 'bg-red-500/20 text-red-400' : 'bg-green-500/20 text-green-400'}`}>
-                          {results.score_breakdown.ml_confidence > 50 ? "AI Generated" : "Real / Authentic"}
+                        <p className="text-2xl font-bold text-white mb-1">{formatPercent(results.score_breakdown.ml_confidence)}</p>
+                        <span className={`text-xs px-2 py-0.5 rounded font-bold ${scoreBadge(results.score_breakdown.ml_confidence, "AI Generated", "Real / Authentic").className}`}>
+                          {scoreBadge(results.score_breakdown.ml_confidence, "AI Generated", "Real / Authentic").label}
                         </span>
                         <p className="text-xs text-blue-300 mt-2">Based on 11 Models</p>
                       </div>
@@ -328,10 +369,10 @@ const App = () => {
                       <div className="bg-black/20 p-4 rounded-lg border border-purple-500/20 text-center">
                         <p className="text-gray-400 text-xs uppercase mb-1">Forensic Likelihood</p>
                         <p className={`text-2xl font-bold mb-1 ${results.score_breakdown.forensic_confidence > 50 ? 'text-white' : 'text-white'}`}>
-                          {results.score_breakdown.forensic_confidence}%
+                          {formatPercent(results.score_breakdown.forensic_confidence)}
                         </p>
-                        <span className={`text-xs px-2 py-0.5 rounded font-bold ${results.score_breakdown.forensic_confidence > 50 ? 'bg-red-500/20 text-red-400' : 'bg-green-500/20 text-green-400'}`}>
-                          {results.score_breakdown.forensic_confidence > 50 ? "High Artifacts" : "Natural Signals"}
+                        <span className={`text-xs px-2 py-0.5 rounded font-bold ${scoreBadge(results.score_breakdown.forensic_confidence, "High Artifacts", "Natural Signals").className}`}>
+                          {scoreBadge(results.score_breakdown.forensic_confidence, "High Artifacts", "Natural Signals").label}
                         </span>
                         <p className="text-xs text-blue-300 mt-2">Signal Analysis</p>
                       </div>
@@ -391,7 +432,7 @@ const App = () => {
 
                           {/* Grid Overlay */}
                           <div className="absolute inset-0 grid grid-cols-4 grid-rows-4 gap-0.5 p-0.5">
-                            {results.detailed_steps.step4_patches.patch_scores.map((patch) => (
+                            {results.detailed_steps.step4_patches.patch_scores?.map((patch) => (
                               <div
                                 key={patch.id}
                                 className={`relative flex items-center justify-center transition-all duration-300 hover:scale-[1.02] hover:z-10 cursor-help
@@ -437,7 +478,7 @@ const App = () => {
                         <div>
                           <p className="text-gray-400 text-xs uppercase mb-1">Grid Stats</p>
                           <div className="bg-black/20 p-3 rounded-lg border border-purple-500/20 flex justify-between">
-                            <span className="text-xs text-red-300">AI Patches: {results.detailed_steps.step4_patches.ai_patch_ratio.split('/')[0]}</span>
+                            <span className="text-xs text-red-300">AI Patches: {results.detailed_steps.step4_patches.ai_patch_ratio?.split('/')[0]}</span>
                             <span className="text-xs text-gray-400">Total: 16</span>
                           </div>
                         </div>
@@ -501,8 +542,8 @@ const App = () => {
                         <p className="text-gray-400 text-xs mb-1">Multi-Scale Consistency (Steps 1 & 3)</p>
                         <div className="flex justify-between items-center bg-black/20 p-2 rounded">
                           <span>Stability</span>
-                          <span className={results.detailed_steps.step3_multiscale.status.includes('Unstable') ? 'text-red-400 font-bold' : 'text-green-400 font-bold'}>
-                            {results.detailed_steps.step3_multiscale.status}
+                          <span className={results.detailed_steps.step3_multiscale?.status?.includes('Unstable') ? 'text-red-400 font-bold' : 'text-green-400 font-bold'}>
+                            {results.detailed_steps.step3_multiscale?.status || 'Not evaluated'}
                           </span>
                         </div>
                       </div>
@@ -531,10 +572,10 @@ const App = () => {
                         <div className="flex justify-between items-center bg-black/20 p-2 rounded">
                           <span>AI Semantics Score</span>
                           <span className="font-bold text-blue-300">
-                            {results.detailed_steps.step8_clip.clip_ai_score}%
+                            {formatPercent(results.detailed_steps.step8_clip?.clip_ai_score ?? 'not evaluated')}
                           </span>
                         </div>
-                        <p className="text-xs text-gray-500 mt-1">{results.detailed_steps.step8_clip.verdict}</p>
+                        <p className="text-xs text-gray-500 mt-1">{results.detailed_steps.step8_clip?.verdict}</p>
                       </div>
 
                     </div>
@@ -576,11 +617,11 @@ const App = () => {
                   <div className="grid grid-cols-3 gap-4 text-sm">
                     <div>
                       <p className="text-gray-400 mb-1">Transfer Learning</p>
-                      <p className="text-2xl font-bold">{results.mlAnalysis.transferLearningScore}%</p>
+                      <p className="text-2xl font-bold">{formatPercent(results.mlAnalysis.transferLearningScore)}</p>
                     </div>
                     <div>
                       <p className="text-gray-400 mb-1">Feature-Based</p>
-                      <p className="text-2xl font-bold">{results.mlAnalysis.featureBasedScore}%</p>
+                      <p className="text-2xl font-bold">{formatPercent(results.mlAnalysis.featureBasedScore)}</p>
                     </div>
                     <div>
                       <p className="text-gray-400 mb-1">Confidence Level</p>
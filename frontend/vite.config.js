@@ -12,6 +12,10 @@ export default defineConfig({
         target: 'http://127.0.0.1:8000',
         changeOrigin: true
       },
+      '/analysis': {
+        target: 'http://127.0.0.1:8000',
+        changeOrigin: true
+      },
       '/auth': {
         target: 'http://127.0.0.1:8000',
         changeOrigin: true